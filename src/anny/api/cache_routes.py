@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, Security
+from fastapi.responses import PlainTextResponse
 
 from anny.core.cache import QueryCache
-from anny.core.dependencies import get_query_cache, verify_api_key
+from anny.core.dependencies import get_query_cache, get_realtime_cache, verify_api_key
 from anny.core.services import cache_service
 
 router = APIRouter(prefix="/api/cache", tags=["Cache"])
@@ -10,9 +11,23 @@ router = APIRouter(prefix="/api/cache", tags=["Cache"])
 @router.get("/status")
 async def cache_status(
     cache: QueryCache = Depends(get_query_cache),
+    realtime: QueryCache = Depends(get_realtime_cache),
     _: str = Security(verify_api_key),
 ):
-    return cache_service.get_cache_status(cache)
+    return cache_service.get_cache_status(cache, realtime)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def cache_metrics(
+    cache: QueryCache = Depends(get_query_cache),
+    realtime: QueryCache = Depends(get_realtime_cache),
+    _: str = Security(verify_api_key),
+):
+    """Cache counters by API in the Prometheus text format, for scraping."""
+    return PlainTextResponse(
+        cache_service.format_prometheus(cache_service.get_cache_status(cache, realtime)),
+        media_type="text/plain; version=0.0.4",
+    )
 
 
 @router.delete("")
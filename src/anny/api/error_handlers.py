@@ -1,7 +1,16 @@
+import math
+
 from fastapi import Request
 from fastapi.responses import JSONResponse
 
-from anny.core.exceptions import AnnyError, APIError, AuthError, ValidationError
+from anny.core.exceptions import (
+    AnnyError,
+    APIError,
+    AuthError,
+    CapacityError,
+    CircuitOpenError,
+    ValidationError,
+)
 
 
 async def anny_error_handler(request: Request, exc: AnnyError):  # pylint: disable=unused-argument
@@ -12,10 +21,17 @@ async def anny_error_handler(request: Request, exc: AnnyError):  # pylint: disab
         status_code = 401
     elif isinstance(exc, APIError):
         status_code = 502
+    elif isinstance(exc, CapacityError):
+        status_code = 503
     else:
         status_code = 500
 
+    headers = None
+    if isinstance(exc, CircuitOpenError):
+        headers = {"Retry-After": str(math.ceil(exc.retry_after))}
+
     return JSONResponse(
         status_code=status_code,
         content={"error": exc.message},
+        headers=headers,
     )
@@ -1,34 +1,84 @@
+from collections.abc import AsyncGenerator, Iterator
+
 from fastapi import APIRouter, Depends, Query, Security
 from fastapi.responses import StreamingResponse
 
-from anny.clients.ga4 import GA4Client
+from anny.clients.ga4 import AsyncGA4Client
 from anny.clients.search_console import SearchConsoleClient
 from anny.core.cache import QueryCache
 from anny.core.constants import MAX_LIMIT, MAX_ROW_LIMIT
 from anny.core.dependencies import (
-    get_ga4_client,
+    get_async_ga4_client,
+    get_blocking_executor,
     get_query_cache,
     get_search_console_client,
     verify_api_key,
 )
+from anny.core.executor import BlockingExecutor
 from anny.core.services import export_service, ga4_service, search_console_service
 
 router = APIRouter(prefix="/api/export", tags=["Export"])
 
 
-def _stream(data: bytes, filename: str, export_format: str) -> StreamingResponse:
+def _media(filename: str, export_format: str) -> tuple[str, dict]:
     if export_format == "csv":
         media = "text/csv; charset=utf-8"
         filename = f"{filename}.csv"
     else:
         media = "application/json; charset=utf-8"
         filename = f"{filename}.json"
-
-    return StreamingResponse(
-        iter([data]),
-        media_type=media,
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    return media, {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+async def _stream_rows(
+    rows: AsyncGenerator[dict, None] | list[dict], filename: str, export_format: str
+) -> StreamingResponse:
+    """Stream rows through the incremental CSV/JSON encoder.
+
+    rows is either a fetching generator or a result already in memory (a cached
+    ResultSet is encoded from its columns).
+
+    Memory stays constant however many rows are exported: rows are pulled from the
+    source only as the client reads encoded chunks, so a slow download also slows
+    the fetcher. The first chunk is produced before the response starts, so errors
+    on the first page still map to a normal error response instead of a truncated
+    download.
+    """
+    encode = export_service.stream_csv if export_format == "csv" else export_service.stream_json
+    chunks = encode(rows)
+    first = await anext(chunks)
+
+    async def body():
+        try:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            # Stop fetching if the client disconnects mid-download
+            await chunks.aclose()
+            if isinstance(rows, AsyncGenerator):
+                await rows.aclose()
+
+    media, headers = _media(filename, export_format)
+    return StreamingResponse(body(), media_type=media, headers=headers)
+
+
+async def _iter_pages(executor: BlockingExecutor, pages: Iterator[list[dict]]):
+    """Pull pages from a blocking page iterator on the executor and yield their rows."""
+    try:
+        while True:
+            page = await executor.run(next, pages, None)
+            if page is None:
+                return
+            for row in page:
+                yield row
+    finally:
+        close = getattr(pages, "close", None)
+        if close is not None:
+            try:
+                close()
+            except ValueError:
+                pass  # still running on the executor; it is closed when garbage-collected
 
 
 @router.get("/ga4/report")
@@ -37,43 +87,52 @@ async def export_ga4_report(
     dimensions: str = Query("date", max_length=500),
     date_range: str = Query("last_28_days", max_length=50),
     limit: int = Query(10, ge=1, le=100),
+    all_rows: bool = Query(False, description="Export every row, ignoring limit"),
     export_format: str = Query("csv", alias="format", pattern="^(csv|json)$"),
-    client: GA4Client = Depends(get_ga4_client),
+    client: AsyncGA4Client = Depends(get_async_ga4_client),
     cache: QueryCache = Depends(get_query_cache),
     _: str = Security(verify_api_key),
 ):
+    if all_rows:
+        rows = ga4_service.iter_report_async(client, metrics, dimensions, date_range)
+        return await _stream_rows(rows, "ga4-report", export_format)
     limit = max(1, min(limit, MAX_LIMIT))
-    rows = ga4_service.get_report(client, metrics, dimensions, date_range, limit, cache=cache)
-    data = export_service.to_csv(rows) if export_format == "csv" else export_service.to_json(rows)
-    return _stream(data, "ga4-report", export_format)
+    rows = await ga4_service.get_report_async(
+        client, metrics, dimensions, date_range, limit, cache=cache
+    )
+    return await _stream_rows(rows, "ga4-report", export_format)
 
 
 @router.get("/ga4/top-pages")
 async def export_ga4_top_pages(
     date_range: str = Query("last_28_days", max_length=50),
     limit: int = Query(10, ge=1, le=100),
+    all_rows: bool = Query(False, description="Export every page, ignoring limit"),
     export_format: str = Query("csv", alias="format", pattern="^(csv|json)$"),
-    client: GA4Client = Depends(get_ga4_client),
+    client: AsyncGA4Client = Depends(get_async_ga4_client),
     cache: QueryCache = Depends(get_query_cache),
     _: str = Security(verify_api_key),
 ):
+    if all_rows:
+        rows = ga4_service.iter_top_pages_async(client, date_range=date_range)
+        return await _stream_rows(rows, "ga4-top-pages", export_format)
     limit = max(1, min(limit, MAX_LIMIT))
-    rows = ga4_service.get_top_pages(client, date_range=date_range, limit=limit, cache=cache)
-    data = export_service.to_csv(rows) if export_format == "csv" else export_service.to_json(rows)
-    return _stream(data, "ga4-top-pages", export_format)
+    rows = await ga4_service.get_top_pages_async(
+        client, date_range=date_range, limit=limit, cache=cache
+    )
+    return await _stream_rows(rows, "ga4-top-pages", export_format)
 
 
 @router.get("/ga4/traffic-summary")
 async def export_ga4_traffic_summary(
     date_range: str = Query("last_28_days", max_length=50),
     export_format: str = Query("csv", alias="format", pattern="^(csv|json)$"),
-    client: GA4Client = Depends(get_ga4_client),
+    client: AsyncGA4Client = Depends(get_async_ga4_client),
     cache: QueryCache = Depends(get_query_cache),
     _: str = Security(verify_api_key),
 ):
-    rows = ga4_service.get_traffic_summary(client, date_range=date_range, cache=cache)
-    data = export_service.to_csv(rows) if export_format == "csv" else export_service.to_json(rows)
-    return _stream(data, "ga4-traffic-summary", export_format)
+    rows = await ga4_service.get_traffic_summary_async(client, date_range=date_range, cache=cache)
+    return await _stream_rows(rows, "ga4-traffic-summary", export_format)
 
 
 @router.get("/search-console/query")
@@ -81,48 +140,73 @@ async def export_sc_query(
     dimensions: str = Query("query", max_length=500),
     date_range: str = Query("last_28_days", max_length=50),
     row_limit: int = Query(10, ge=1, le=1000),
+    all_rows: bool = Query(False, description="Export every row, ignoring row_limit"),
     export_format: str = Query("csv", alias="format", pattern="^(csv|json)$"),
     client: SearchConsoleClient = Depends(get_search_console_client),
     cache: QueryCache = Depends(get_query_cache),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
+    if all_rows:
+        pages = search_console_service.iter_search_analytics(client, dimensions, date_range)
+        return await _stream_rows(_iter_pages(executor, pages), "sc-query", export_format)
     row_limit = max(1, min(row_limit, MAX_ROW_LIMIT))
-    rows = search_console_service.get_search_analytics(
-        client, dimensions, date_range, row_limit, cache=cache
+    rows = await executor.run(
+        search_console_service.get_search_analytics,
+        client,
+        dimensions,
+        date_range,
+        row_limit,
+        cache=cache,
     )
-    data = export_service.to_csv(rows) if export_format == "csv" else export_service.to_json(rows)
-    return _stream(data, "sc-query", export_format)
+    return await _stream_rows(rows, "sc-query", export_format)
 
 
 @router.get("/search-console/top-queries")
 async def export_sc_top_queries(
     date_range: str = Query("last_28_days", max_length=50),
     limit: int = Query(10, ge=1, le=100),
+    all_rows: bool = Query(False, description="Export every row, ignoring limit"),
     export_format: str = Query("csv", alias="format", pattern="^(csv|json)$"),
     client: SearchConsoleClient = Depends(get_search_console_client),
     cache: QueryCache = Depends(get_query_cache),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
+    if all_rows:
+        pages = search_console_service.iter_search_analytics(client, "query", date_range)
+        return await _stream_rows(_iter_pages(executor, pages), "sc-top-queries", export_format)
     limit = max(1, min(limit, MAX_LIMIT))
-    rows = search_console_service.get_top_queries(
-        client, date_range=date_range, limit=limit, cache=cache
+    rows = await executor.run(
+        search_console_service.get_top_queries,
+        client,
+        date_range=date_range,
+        limit=limit,
+        cache=cache,
     )
-    data = export_service.to_csv(rows) if export_format == "csv" else export_service.to_json(rows)
-    return _stream(data, "sc-top-queries", export_format)
+    return await _stream_rows(rows, "sc-top-queries", export_format)
 
 
 @router.get("/search-console/top-pages")
 async def export_sc_top_pages(
     date_range: str = Query("last_28_days", max_length=50),
     limit: int = Query(10, ge=1, le=100),
+    all_rows: bool = Query(False, description="Export every row, ignoring limit"),
     export_format: str = Query("csv", alias="format", pattern="^(csv|json)$"),
     client: SearchConsoleClient = Depends(get_search_console_client),
     cache: QueryCache = Depends(get_query_cache),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
+    if all_rows:
+        pages = search_console_service.iter_search_analytics(client, "page", date_range)
+        return await _stream_rows(_iter_pages(executor, pages), "sc-top-pages", export_format)
     limit = max(1, min(limit, MAX_LIMIT))
-    rows = search_console_service.get_top_pages(
-        client, date_range=date_range, limit=limit, cache=cache
+    rows = await executor.run(
+        search_console_service.get_top_pages,
+        client,
+        date_range=date_range,
+        limit=limit,
+        cache=cache,
     )
-    data = export_service.to_csv(rows) if export_format == "csv" else export_service.to_json(rows)
-    return _stream(data, "sc-top-pages", export_format)
+    return await _stream_rows(rows, "sc-top-pages", export_format)
@@ -1,9 +1,20 @@
 from fastapi import APIRouter, Depends, Query, Security
 
-from anny.api.models import GA4ReportRequest, GA4ReportResponse
-from anny.clients.ga4 import GA4Client
+from anny.api.models import (
+    GA4BatchRequest,
+    GA4BatchResponse,
+    GA4RealtimeResponse,
+    GA4ReportRequest,
+    GA4ReportResponse,
+)
+from anny.clients.ga4 import AsyncGA4Client
 from anny.core.cache import QueryCache
-from anny.core.dependencies import get_ga4_client, get_query_cache, verify_api_key
+from anny.core.dependencies import (
+    get_async_ga4_client,
+    get_query_cache,
+    get_realtime_cache,
+    verify_api_key,
+)
 from anny.core.services import ga4_service
 
 router = APIRouter(prefix="/api/ga4", tags=["GA4"])
@@ -12,11 +23,11 @@ router = APIRouter(prefix="/api/ga4", tags=["GA4"])
 @router.post("/report", response_model=GA4ReportResponse)
 async def report(
     body: GA4ReportRequest,
-    client: GA4Client = Depends(get_ga4_client),
+    client: AsyncGA4Client = Depends(get_async_ga4_client),
     cache: QueryCache = Depends(get_query_cache),
     _: str = Security(verify_api_key),
 ):
-    rows = ga4_service.get_report(
+    rows = await ga4_service.get_report_async(
         client,
         metrics=body.metrics,
         dimensions=body.dimensions,
@@ -27,35 +38,56 @@ async def report(
     return GA4ReportResponse(rows=rows, row_count=len(rows))
 
 
+@router.post("/batch", response_model=GA4BatchResponse)
+async def batch(
+    body: GA4BatchRequest,
+    client: AsyncGA4Client = Depends(get_async_ga4_client),
+    cache: QueryCache = Depends(get_query_cache),
+    _: str = Security(verify_api_key),
+):
+    results = await ga4_service.batch_reports_async(
+        client, [spec.model_dump() for spec in body.reports], cache=cache
+    )
+    return GA4BatchResponse(
+        reports=[GA4ReportResponse(rows=rows, row_count=len(rows)) for rows in results]
+    )
+
+
 @router.get("/top-pages", response_model=GA4ReportResponse)
 async def top_pages(
     date_range: str = Query("last_28_days", max_length=50),
     limit: int = Query(10, ge=1, le=100),
-    client: GA4Client = Depends(get_ga4_client),
+    client: AsyncGA4Client = Depends(get_async_ga4_client),
     cache: QueryCache = Depends(get_query_cache),
     _: str = Security(verify_api_key),
 ):
-    rows = ga4_service.get_top_pages(client, date_range=date_range, limit=limit, cache=cache)
+    rows = await ga4_service.get_top_pages_async(
+        client, date_range=date_range, limit=limit, cache=cache
+    )
     return GA4ReportResponse(rows=rows, row_count=len(rows))
 
 
 @router.get("/traffic-summary", response_model=GA4ReportResponse)
 async def traffic_summary(
     date_range: str = Query("last_28_days", max_length=50),
-    client: GA4Client = Depends(get_ga4_client),
+    client: AsyncGA4Client = Depends(get_async_ga4_client),
     cache: QueryCache = Depends(get_query_cache),
     _: str = Security(verify_api_key),
 ):
-    rows = ga4_service.get_traffic_summary(client, date_range=date_range, cache=cache)
+    rows = await ga4_service.get_traffic_summary_async(client, date_range=date_range, cache=cache)
     return GA4ReportResponse(rows=rows, row_count=len(rows))
 
 
-@router.get("/realtime", response_model=GA4ReportResponse)
+@router.get("/realtime", response_model=GA4RealtimeResponse)
 async def realtime(
     metrics: str = Query("activeUsers", max_length=500),
     dimensions: str = Query("", max_length=500),
-    client: GA4Client = Depends(get_ga4_client),
+    client: AsyncGA4Client = Depends(get_async_ga4_client),
+    cache: QueryCache = Depends(get_realtime_cache),
     _: str = Security(verify_api_key),
 ):
-    rows = ga4_service.get_realtime_report(client, metrics=metrics, dimensions=dimensions)
-    return GA4ReportResponse(rows=rows, row_count=len(rows))
+    snapshot = await ga4_service.get_realtime_snapshot_async(
+        client, metrics=metrics, dimensions=dimensions, cache=cache
+    )
+    rows = snapshot["rows"]
+    return GA4RealtimeResponse(rows=rows, row_count=len(rows), as_of=snapshot["as_of"])
@@ -1,5 +1,9 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+from anny.core.constants import GA4_MAX_BATCH_REPORTS
+
 
 class GA4ReportRequest(BaseModel):
     metrics: str = Field(
@@ -27,6 +31,29 @@ class GA4ReportResponse(BaseModel):
     row_count: int
 
 
+class GA4RealtimeResponse(GA4ReportResponse):
+    as_of: str = Field(description="UTC time of the GA4 call these rows come from")
+
+
+class GA4BatchReportSpec(GA4ReportRequest):
+    report: Literal["report", "top_pages", "traffic_summary"] = Field(
+        default="report",
+        description="Report type; top_pages and traffic_summary only use date_range (and limit)",
+    )
+
+
+class GA4BatchRequest(BaseModel):
+    reports: list[GA4BatchReportSpec] = Field(
+        min_length=1,
+        max_length=GA4_MAX_BATCH_REPORTS,
+        description="Reports to run together in one batchRunReports call",
+    )
+
+
+class GA4BatchResponse(BaseModel):
+    reports: list[GA4ReportResponse]
+
+
 class SCQueryRequest(BaseModel):
     dimensions: str = Field(
         default="query",
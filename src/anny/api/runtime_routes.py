@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, Security
+
+from anny.core.dependencies import (
+    get_blocking_executor,
+    get_prefetcher,
+    get_quota_scheduler,
+    verify_api_key,
+)
+from anny.core.executor import BlockingExecutor
+from anny.core.prefetch import Prefetcher
+from anny.core.quota import QuotaScheduler
+
+router = APIRouter(prefix="/api/runtime", tags=["Runtime"])
+
+
+@router.get("/executor")
+async def executor_status(
+    executor: BlockingExecutor = Depends(get_blocking_executor),
+    _: str = Security(verify_api_key),
+):
+    """Return queue depth and wait-time metrics for the blocking-call executor."""
+    return executor.status()
+
+
+@router.get("/quota")
+async def quota_status(
+    scheduler: QuotaScheduler = Depends(get_quota_scheduler),
+    _: str = Security(verify_api_key),
+):
+    """Return per-service concurrency, queue, and Google quota headroom."""
+    return scheduler.status()
+
+
+@router.get("/breakers")
+async def breaker_status(
+    scheduler: QuotaScheduler = Depends(get_quota_scheduler),
+    _: str = Security(verify_api_key),
+):
+    """Return each Google service's circuit breaker state."""
+    return scheduler.breaker_status()
+
+
+@router.get("/prefetch")
+async def prefetch_status(
+    prefetcher: Prefetcher = Depends(get_prefetcher),
+    _: str = Security(verify_api_key),
+):
+    """Return cache warm-up passes, jobs run, failures, and the next scheduled pass."""
+    return prefetcher.status()
@@ -8,7 +8,13 @@ from anny.api.models import (
 )
 from anny.clients.search_console import SearchConsoleClient
 from anny.core.cache import QueryCache
-from anny.core.dependencies import get_query_cache, get_search_console_client, verify_api_key
+from anny.core.dependencies import (
+    get_blocking_executor,
+    get_query_cache,
+    get_search_console_client,
+    verify_api_key,
+)
+from anny.core.executor import BlockingExecutor
 from anny.core.services import search_console_service
 
 router = APIRouter(prefix="/api/search-console", tags=["Search Console"])
@@ -19,9 +25,11 @@ async def query(
     body: SCQueryRequest,
     client: SearchConsoleClient = Depends(get_search_console_client),
     cache: QueryCache = Depends(get_query_cache),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
-    rows = search_console_service.get_search_analytics(
+    rows = await executor.run(
+        search_console_service.get_search_analytics,
         client,
         dimensions=body.dimensions,
         date_range=body.date_range,
@@ -37,10 +45,15 @@ async def top_queries(
     limit: int = Query(10, ge=1, le=100),
     client: SearchConsoleClient = Depends(get_search_console_client),
     cache: QueryCache = Depends(get_query_cache),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
-    rows = search_console_service.get_top_queries(
-        client, date_range=date_range, limit=limit, cache=cache
+    rows = await executor.run(
+        search_console_service.get_top_queries,
+        client,
+        date_range=date_range,
+        limit=limit,
+        cache=cache,
     )
     return SCQueryResponse(rows=rows, row_count=len(rows))
 
@@ -51,10 +64,15 @@ async def top_pages(
     limit: int = Query(10, ge=1, le=100),
     client: SearchConsoleClient = Depends(get_search_console_client),
     cache: QueryCache = Depends(get_query_cache),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
-    rows = search_console_service.get_top_pages(
-        client, date_range=date_range, limit=limit, cache=cache
+    rows = await executor.run(
+        search_console_service.get_top_pages,
+        client,
+        date_range=date_range,
+        limit=limit,
+        cache=cache,
     )
     return SCQueryResponse(rows=rows, row_count=len(rows))
 
@@ -64,10 +82,11 @@ async def summary(
     date_range: str = Query("last_28_days", max_length=50),
     client: SearchConsoleClient = Depends(get_search_console_client),
     cache: QueryCache = Depends(get_query_cache),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
-    rows = search_console_service.get_performance_summary(
-        client, date_range=date_range, cache=cache
+    rows = await executor.run(
+        search_console_service.get_performance_summary, client, date_range=date_range, cache=cache
     )
     return SCQueryResponse(rows=rows, row_count=len(rows))
 
@@ -75,9 +94,10 @@ async def summary(
 @router.get("/sitemaps", response_model=SitemapListResponse)
 async def sitemaps(
     client: SearchConsoleClient = Depends(get_search_console_client),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
-    items = search_console_service.get_sitemaps(client)
+    items = await executor.run(search_console_service.get_sitemaps, client)
     return SitemapListResponse(sitemaps=items, count=len(items))
 
 
@@ -85,10 +105,11 @@ async def sitemaps(
 async def sitemap_details(
     feedpath: str,
     client: SearchConsoleClient = Depends(get_search_console_client),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
     if len(feedpath) > 2048:
         raise HTTPException(status_code=400, detail="feedpath too long (max 2048 characters)")
     if not feedpath.startswith(("http://", "https://")):
         raise HTTPException(status_code=400, detail="feedpath must be a valid URL (http/https)")
-    return search_console_service.get_sitemap_details(client, feedpath)
+    return await executor.run(search_console_service.get_sitemap_details, client, feedpath)
@@ -2,7 +2,14 @@ from fastapi import APIRouter, Depends, Query, Security
 
 from anny.api.models import GTMContainerSetupResponse, GTMListResponse
 from anny.clients.tag_manager import TagManagerClient
-from anny.core.dependencies import get_tag_manager_client, verify_api_key
+from anny.core.cache import QueryCache
+from anny.core.dependencies import (
+    get_blocking_executor,
+    get_query_cache,
+    get_tag_manager_client,
+    verify_api_key,
+)
+from anny.core.executor import BlockingExecutor
 from anny.core.services import tag_manager_service
 
 router = APIRouter(prefix="/api/tag-manager", tags=["Tag Manager"])
@@ -11,9 +18,10 @@ router = APIRouter(prefix="/api/tag-manager", tags=["Tag Manager"])
 @router.get("/accounts", response_model=GTMListResponse)
 async def accounts(
     client: TagManagerClient = Depends(get_tag_manager_client),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
-    items = tag_manager_service.get_accounts(client)
+    items = await executor.run(tag_manager_service.get_accounts, client)
     return GTMListResponse(items=items, count=len(items))
 
 
@@ -21,9 +29,10 @@ async def accounts(
 async def containers(
     account_id: str = Query(max_length=50),
     client: TagManagerClient = Depends(get_tag_manager_client),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
-    items = tag_manager_service.get_containers(client, account_id)
+    items = await executor.run(tag_manager_service.get_containers, client, account_id)
     return GTMListResponse(items=items, count=len(items))
 
 
@@ -31,9 +40,10 @@ async def containers(
 async def tags(
     container_path: str = Query(max_length=200),
     client: TagManagerClient = Depends(get_tag_manager_client),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
-    items = tag_manager_service.get_tags(client, container_path)
+    items = await executor.run(tag_manager_service.get_tags, client, container_path)
     return GTMListResponse(items=items, count=len(items))
 
 
@@ -41,9 +51,10 @@ async def tags(
 async def triggers(
     container_path: str = Query(max_length=200),
     client: TagManagerClient = Depends(get_tag_manager_client),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
-    items = tag_manager_service.get_triggers(client, container_path)
+    items = await executor.run(tag_manager_service.get_triggers, client, container_path)
     return GTMListResponse(items=items, count=len(items))
 
 
@@ -51,9 +62,10 @@ async def triggers(
 async def variables(
     container_path: str = Query(max_length=200),
     client: TagManagerClient = Depends(get_tag_manager_client),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
     _: str = Security(verify_api_key),
 ):
-    items = tag_manager_service.get_variables(client, container_path)
+    items = await executor.run(tag_manager_service.get_variables, client, container_path)
     return GTMListResponse(items=items, count=len(items))
 
 
@@ -61,6 +73,10 @@ async def variables(
 async def container_setup(
     container_path: str = Query(max_length=200),
     client: TagManagerClient = Depends(get_tag_manager_client),
+    executor: BlockingExecutor = Depends(get_blocking_executor),
+    cache: QueryCache = Depends(get_query_cache),
     _: str = Security(verify_api_key),
 ):
-    return tag_manager_service.get_container_setup(client, container_path)
+    return await executor.run(
+        tag_manager_service.get_container_setup, client, container_path, cache
+    )
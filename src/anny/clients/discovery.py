@@ -0,0 +1,104 @@
+import logging
+from contextlib import nullcontext
+
+from googleapiclient.discovery import Resource
+from googleapiclient.errors import HttpError
+
+from anny.core.concurrency import raise_failures
+from anny.core.constants import DISCOVERY_BATCH_MAX_REQUESTS
+from anny.core.exceptions import APIError
+from anny.core.quota import QuotaScheduler
+
+logger = logging.getLogger("anny")
+
+
+class DiscoveryClient:
+    """Quota-scheduled single and batched request execution for discovery-based clients.
+
+    Subclasses set service_name and may override _quota_scope().
+    """
+
+    service_name = ""
+
+    def __init__(self, service: Resource, scheduler: QuotaScheduler | None = None):
+        self._service = service
+        self._scheduler = scheduler
+
+    def _quota_scope(self) -> str:
+        return "project"
+
+    def _slot(self, cost: int = 1):
+        if self._scheduler is None:
+            return nullcontext()
+        return self._scheduler.slot(self.service_name, self._quota_scope(), cost)
+
+    def _note_failure(self, exc: HttpError) -> None:
+        if self._scheduler is not None and exc.status_code == 429:
+            self._scheduler.record_exhausted(self.service_name, self._quota_scope())
+
+    def _execute(self, request) -> dict:
+        """Execute a discovery request inside a quota scheduler slot."""
+        with self._slot():
+            try:
+                return request.execute()
+            except HttpError as exc:
+                self._note_failure(exc)
+                raise
+
+    def _execute_batch(self, requests: dict, what: str) -> dict[str, dict | APIError]:
+        """Send requests as multipart BatchHttpRequest calls, one HTTP round trip per chunk.
+
+        Returns each response by name; an item that failed maps to an APIError whose
+        cause is the item's HttpError. A failure of the whole batch call raises APIError.
+        """
+        results: dict[str, dict | APIError] = {}
+
+        def on_response(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
+                return
+            if isinstance(exception, HttpError):
+                self._note_failure(exception)
+                logger.warning(
+                    "%s failed for %s: %s %s",
+                    what,
+                    request_id,
+                    exception.status_code,
+                    exception.reason,
+                )
+            error = APIError(f"{what} failed", service=self.service_name)
+            error.__cause__ = exception
+            results[request_id] = error
+
+        names = list(requests)
+        for start in range(0, len(names), DISCOVERY_BATCH_MAX_REQUESTS):
+            chunk = names[start : start + DISCOVERY_BATCH_MAX_REQUESTS]
+            batch = self._service.new_batch_http_request(callback=on_response)
+            for name in chunk:
+                batch.add(requests[name], request_id=name)
+            with self._slot(cost=len(chunk)):
+                try:
+                    batch.execute()
+                except HttpError as exc:
+                    self._note_failure(exc)
+                    logger.warning("%s batch failed: %s %s", what, exc.status_code, exc.reason)
+                    raise APIError(f"{what} failed", service=self.service_name) from exc
+        return results
+
+    def _execute_all(self, requests: dict, what: str) -> dict[str, dict]:
+        """Execute named requests together, raising if any of them failed.
+
+        A single request is sent on its own; two or more go out as one batch call.
+        """
+        if len(requests) == 1:
+            name, request = next(iter(requests.items()))
+            try:
+                return {name: self._execute(request)}
+            except HttpError as exc:
+                logger.warning("%s failed: %s %s", what, exc.status_code, exc.reason)
+                raise APIError(f"{what} failed", service=self.service_name) from exc
+        results = self._execute_batch(requests, what)
+        failures = {name: r for name, r in results.items() if isinstance(r, APIError)}
+        if failures:
+            raise_failures(failures, len(requests), self.service_name)
+        return results
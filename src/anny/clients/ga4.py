@@ -1,70 +1,131 @@
 import logging
+from collections.abc import AsyncIterator, Iterator
+from contextlib import nullcontext
 
-from google.analytics.data_v1beta import BetaAnalyticsDataClient
+from google.analytics.data_v1beta import BetaAnalyticsDataAsyncClient, BetaAnalyticsDataClient
 from google.analytics.data_v1beta.types import (
+    BatchRunReportsRequest,
+    BatchRunReportsResponse,
     DateRange,
     Dimension,
     Metric,
+    MetricType,
     MinuteRange,
+    OrderBy,
     RunRealtimeReportRequest,
     RunRealtimeReportResponse,
     RunReportRequest,
     RunReportResponse,
 )
-from google.api_core.exceptions import GoogleAPICallError
+from google.api_core.exceptions import GoogleAPICallError, ResourceExhausted
 
+from anny.core.constants import GA4_MAX_PAGE_ROWS
 from anny.core.exceptions import APIError
+from anny.core.quota import QuotaScheduler
+from anny.core.resultset import ResultSet
 
 logger = logging.getLogger("anny")
 
 
-class GA4Client:
-    """Wraps the Google Analytics Data API v1beta."""
+class _GA4Base:
+    """Request building and response flattening shared by the sync and async GA4 clients."""
 
-    def __init__(self, client: BetaAnalyticsDataClient, property_id: str):
+    def __init__(
+        self,
+        client: BetaAnalyticsDataClient | BetaAnalyticsDataAsyncClient,
+        property_id: str,
+        scheduler: QuotaScheduler | None = None,
+    ):
         self._client = client
         self._property_id = property_id
+        self._scheduler = scheduler
 
     @property
     def property_id(self) -> str:
         return self._property_id
 
-    def run_report(
+    def _property_name(self) -> str:
+        return f"properties/{self._property_id.removeprefix('properties/')}"
+
+    def _slot(self):
+        if self._scheduler is None:
+            return nullcontext()
+        return self._scheduler.slot("ga4", self._property_name())
+
+    def _slot_async(self):
+        if self._scheduler is None:
+            return nullcontext()
+        return self._scheduler.slot_async("ga4", self._property_name())
+
+    def _record_quota(self, response) -> None:
+        """Feed the response's propertyQuota block to the scheduler."""
+        if self._scheduler is not None and "property_quota" in response:
+            self._scheduler.record_ga4_quota(self._property_name(), response.property_quota)
+
+    def _record_failure(self, exc: GoogleAPICallError) -> None:
+        if self._scheduler is not None and isinstance(exc, ResourceExhausted):
+            self._scheduler.record_exhausted("ga4", self._property_name())
+
+    def _report_request(
         self,
         metrics: list[str],
         dimensions: list[str],
         start_date: str,
         end_date: str,
-        limit: int = 10,
-    ) -> list[dict]:
-        """Run a GA4 report and return rows as flat dicts."""
+        limit: int,
+        offset: int = 0,
+        order_by: str | None = None,
+    ) -> RunReportRequest:
+        """Build a RunReportRequest; order_by names a metric to sort rows by, descending."""
         request = RunReportRequest(
-            property=f"properties/{self._property_id.removeprefix('properties/')}",
+            property=self._property_name(),
             metrics=[Metric(name=m) for m in metrics],
             dimensions=[Dimension(name=d) for d in dimensions],
             date_ranges=[DateRange(start_date=start_date, end_date=end_date)],
             limit=limit,
+            offset=offset,
+            return_property_quota=True,
         )
+        if order_by:
+            request.order_bys = [
+                OrderBy(metric=OrderBy.MetricOrderBy(metric_name=order_by), desc=True)
+            ]
+        return request
 
-        try:
-            response: RunReportResponse = self._client.run_report(request)
-        except GoogleAPICallError as exc:
-            logger.warning("GA4 report failed: %s", exc.message)
-            raise APIError("GA4 report failed", service="ga4") from exc
+    def _batch_request(self, reports: list[dict]) -> BatchRunReportsRequest:
+        return BatchRunReportsRequest(
+            property=self._property_name(),
+            requests=[
+                self._report_request(
+                    r["metrics"],
+                    r["dimensions"],
+                    r["start_date"],
+                    r["end_date"],
+                    r.get("limit", 10),
+                    order_by=r.get("order_by"),
+                )
+                for r in reports
+            ],
+        )
 
-        logger.info("GA4 report returned %d rows", len(response.rows))
-        return self._flatten_response(response, metrics, dimensions)
+    def _flatten_batch(
+        self, response: BatchRunReportsResponse, reports: list[dict]
+    ) -> list[ResultSet]:
+        results = []
+        for spec, report in zip(reports, response.reports):
+            self._record_quota(report)
+            results.append(self._flatten_response(report, spec["metrics"], spec["dimensions"]))
+        return results
 
-    def run_realtime_report(
+    def _realtime_request(
         self,
         metrics: list[str],
-        dimensions: list[str] | None = None,
-        minute_ranges_start: int = 0,
-        minute_ranges_end: int = 29,
-    ) -> list[dict]:
-        """Run a GA4 realtime report and return rows as flat dicts."""
+        dimensions: list[str] | None,
+        minute_ranges_start: int,
+        minute_ranges_end: int,
+    ) -> RunRealtimeReportRequest:
         request = RunRealtimeReportRequest(
-            property=f"properties/{self._property_id.removeprefix('properties/')}",
+            property=self._property_name(),
             metrics=[Metric(name=m) for m in metrics],
             minute_ranges=[
                 MinuteRange(
@@ -72,30 +133,280 @@ class GA4Client:
                     end_minutes_ago=minute_ranges_start,
                 )
             ],
+            return_property_quota=True,
         )
         if dimensions:
             request.dimensions = [Dimension(name=d) for d in dimensions]
+        return request
+
+    @staticmethod
+    def _metric_decoders(response, count: int) -> list:
+        """int, float, or None (keep the string) for each metric, from metric_headers."""
+        decoders = []
+        for header in list(response.metric_headers)[:count]:
+            if header.type_ == MetricType.TYPE_INTEGER:
+                decoders.append(int)
+            elif header.type_ == MetricType.METRIC_TYPE_UNSPECIFIED:
+                decoders.append(None)
+            else:
+                decoders.append(float)
+        return decoders + [None] * (count - len(decoders))
+
+    @staticmethod
+    def _decode_metric(values: list[str], decoder) -> list:
+        """A metric column decoded as a whole, or left as strings if any value doesn't parse."""
+        if decoder is None:
+            return values
+        try:
+            return list(map(decoder, values))
+        except ValueError:
+            return values
+
+    @classmethod
+    def _flatten_response(
+        cls, response: RunReportResponse, metrics: list[str], dimensions: list[str]
+    ) -> ResultSet:
+        """Convert protobuf RunReportResponse to a ResultSet, dimensions first.
+
+        Metric values are decoded once per column by their metric_headers type:
+        TYPE_INTEGER as int, other numeric types (float, currency, durations,
+        distances) as float.
+        """
+        rows = response.rows
+        columns = {
+            dim: [row.dimension_values[i].value for row in rows] for i, dim in enumerate(dimensions)
+        }
+        decoders = cls._metric_decoders(response, len(metrics))
+        for i, met in enumerate(metrics):
+            values = [row.metric_values[i].value for row in rows]
+            columns[met] = cls._decode_metric(values, decoders[i])
+        return ResultSet.from_columns(columns, dimensions)
+
+    @staticmethod
+    def _next_offset(response: RunReportResponse, offset: int, page_size: int) -> int | None:
+        """Offset of the next page, or None once row_count rows have been read."""
+        offset += len(response.rows)
+        if len(response.rows) < page_size or offset >= response.row_count:
+            return None
+        return offset
+
+
+class GA4Client(_GA4Base):
+    """Wraps the Google Analytics Data API v1beta."""
+
+    def run_report(
+        self,
+        metrics: list[str],
+        dimensions: list[str],
+        start_date: str,
+        end_date: str,
+        limit: int = 10,
+        order_by: str | None = None,
+    ) -> ResultSet:
+        """Run a GA4 report and return its rows."""
+        request = self._report_request(
+            metrics, dimensions, start_date, end_date, limit, order_by=order_by
+        )
+
+        try:
+            with self._slot():
+                response: RunReportResponse = self._client.run_report(request)
+        except GoogleAPICallError as exc:
+            logger.warning("GA4 report failed: %s", exc.message)
+            self._record_failure(exc)
+            raise APIError("GA4 report failed", service="ga4") from exc
+        self._record_quota(response)
+
+        logger.info("GA4 report returned %d rows", len(response.rows))
+        return self._flatten_response(response, metrics, dimensions)
+
+    def iter_report(
+        self,
+        metrics: list[str],
+        dimensions: list[str],
+        start_date: str,
+        end_date: str,
+        page_size: int = GA4_MAX_PAGE_ROWS,
+        order_by: str | None = None,
+    ) -> Iterator[dict]:
+        """Yield every row of a GA4 report, fetching offset/limit pages as needed.
+
+        Follows the response row_count, so reports larger than one page are read in
+        full while only one page is held in memory at a time.
+        """
+        offset = 0
+        while offset is not None:
+            request = self._report_request(
+                metrics, dimensions, start_date, end_date, page_size, offset, order_by
+            )
+            try:
+                with self._slot():
+                    response: RunReportResponse = self._client.run_report(request)
+            except GoogleAPICallError as exc:
+                logger.warning("GA4 report page at offset %d failed: %s", offset, exc.message)
+                self._record_failure(exc)
+                raise APIError("GA4 report failed", service="ga4") from exc
+            self._record_quota(response)
+
+            logger.info(
+                "GA4 report page at offset %d returned %d of %d rows",
+                offset,
+                len(response.rows),
+                response.row_count,
+            )
+            yield from self._flatten_response(response, metrics, dimensions)
+            offset = self._next_offset(response, offset, page_size)
+
+    def batch_run_reports(self, reports: list[dict]) -> list[ResultSet]:
+        """Run up to five reports in one batchRunReports call.
+
+        Each report is a dict of run_report keyword arguments. Returns one ResultSet
+        per report, in the same order.
+        """
+        request = self._batch_request(reports)
 
         try:
-            response: RunRealtimeReportResponse = self._client.run_realtime_report(request)
+            with self._slot():
+                response: BatchRunReportsResponse = self._client.batch_run_reports(request)
+        except GoogleAPICallError as exc:
+            logger.warning("GA4 batch report failed: %s", exc.message)
+            self._record_failure(exc)
+            raise APIError("GA4 batch report failed", service="ga4") from exc
+
+        logger.info("GA4 batch returned %d reports", len(response.reports))
+        return self._flatten_batch(response, reports)
+
+    def run_realtime_report(
+        self,
+        metrics: list[str],
+        dimensions: list[str] | None = None,
+        minute_ranges_start: int = 0,
+        minute_ranges_end: int = 29,
+    ) -> ResultSet:
+        """Run a GA4 realtime report and return its rows."""
+        request = self._realtime_request(
+            metrics, dimensions, minute_ranges_start, minute_ranges_end
+        )
+
+        try:
+            with self._slot():
+                response: RunRealtimeReportResponse = self._client.run_realtime_report(request)
         except GoogleAPICallError as exc:
             logger.warning("GA4 realtime report failed: %s", exc.message)
+            self._record_failure(exc)
             raise APIError("GA4 realtime report failed", service="ga4") from exc
+        self._record_quota(response)
 
         logger.info("GA4 realtime report returned %d rows", len(response.rows))
         return self._flatten_response(response, metrics, dimensions or [])
 
-    @staticmethod
-    def _flatten_response(
-        response: RunReportResponse, metrics: list[str], dimensions: list[str]
-    ) -> list[dict]:
-        """Convert protobuf RunReportResponse to a list of flat dicts."""
-        rows = []
-        for row in response.rows:
-            flat = {}
-            for i, dim in enumerate(dimensions):
-                flat[dim] = row.dimension_values[i].value
-            for i, met in enumerate(metrics):
-                flat[met] = row.metric_values[i].value
-            rows.append(flat)
-        return rows
+
+class AsyncGA4Client(_GA4Base):
+    """Wraps the Google Analytics Data API v1beta over the gRPC asyncio transport.
+
+    The underlying channel is bound to the event loop it is first used on.
+    """
+
+    async def run_report(
+        self,
+        metrics: list[str],
+        dimensions: list[str],
+        start_date: str,
+        end_date: str,
+        limit: int = 10,
+        order_by: str | None = None,
+    ) -> ResultSet:
+        """Run a GA4 report and return its rows."""
+        request = self._report_request(
+            metrics, dimensions, start_date, end_date, limit, order_by=order_by
+        )
+
+        try:
+            async with self._slot_async():
+                response: RunReportResponse = await self._client.run_report(request)
+        except GoogleAPICallError as exc:
+            logger.warning("GA4 report failed: %s", exc.message)
+            self._record_failure(exc)
+            raise APIError("GA4 report failed", service="ga4") from exc
+        self._record_quota(response)
+
+        logger.info("GA4 report returned %d rows", len(response.rows))
+        return self._flatten_response(response, metrics, dimensions)
+
+    async def iter_report(
+        self,
+        metrics: list[str],
+        dimensions: list[str],
+        start_date: str,
+        end_date: str,
+        page_size: int = GA4_MAX_PAGE_ROWS,
+        order_by: str | None = None,
+    ) -> AsyncIterator[dict]:
+        """Yield every row of a GA4 report, fetching offset/limit pages as needed.
+
+        The next page is only requested once the caller has consumed the current one.
+        """
+        offset = 0
+        while offset is not None:
+            request = self._report_request(
+                metrics, dimensions, start_date, end_date, page_size, offset, order_by
+            )
+            try:
+                async with self._slot_async():
+                    response: RunReportResponse = await self._client.run_report(request)
+            except GoogleAPICallError as exc:
+                logger.warning("GA4 report page at offset %d failed: %s", offset, exc.message)
+                self._record_failure(exc)
+                raise APIError("GA4 report failed", service="ga4") from exc
+            self._record_quota(response)
+
+            logger.info(
+                "GA4 report page at offset %d returned %d of %d rows",
+                offset,
+                len(response.rows),
+                response.row_count,
+            )
+            for row in self._flatten_response(response, metrics, dimensions):
+                yield row
+            offset = self._next_offset(response, offset, page_size)
+
+    async def batch_run_reports(self, reports: list[dict]) -> list[ResultSet]:
+        """Run up to five reports in one batchRunReports call."""
+        request = self._batch_request(reports)
+
+        try:
+            async with self._slot_async():
+                response: BatchRunReportsResponse = await self._client.batch_run_reports(request)
+        except GoogleAPICallError as exc:
+            logger.warning("GA4 batch report failed: %s", exc.message)
+            self._record_failure(exc)
+            raise APIError("GA4 batch report failed", service="ga4") from exc
+
+        logger.info("GA4 batch returned %d reports", len(response.reports))
+        return self._flatten_batch(response, reports)
+
+    async def run_realtime_report(
+        self,
+        metrics: list[str],
+        dimensions: list[str] | None = None,
+        minute_ranges_start: int = 0,
+        minute_ranges_end: int = 29,
+    ) -> ResultSet:
+        """Run a GA4 realtime report and return its rows."""
+        request = self._realtime_request(
+            metrics, dimensions, minute_ranges_start, minute_ranges_end
+        )
+
+        try:
+            async with self._slot_async():
+                response: RunRealtimeReportResponse = await self._client.run_realtime_report(
+                    request
+                )
+        except GoogleAPICallError as exc:
+            logger.warning("GA4 realtime report failed: %s", exc.message)
+            self._record_failure(exc)
+            raise APIError("GA4 realtime report failed", service="ga4") from exc
+        self._record_quota(response)
+
+        logger.info("GA4 realtime report returned %d rows", len(response.rows))
+        return self._flatten_response(response, metrics, dimensions or [])
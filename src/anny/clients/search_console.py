@@ -1,20 +1,32 @@
+import contextvars
 import logging
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 
 from googleapiclient.discovery import Resource
 from googleapiclient.errors import HttpError
 
+from anny.clients.discovery import DiscoveryClient
+from anny.core.constants import SEARCH_CONSOLE_MAX_PAGE_ROWS, SEARCH_CONSOLE_PAGES_PER_BATCH
 from anny.core.exceptions import APIError
+from anny.core.quota import QuotaScheduler
+from anny.core.resultset import ResultSet
 
 logger = logging.getLogger("anny")
 
 
-class SearchConsoleClient:
+class SearchConsoleClient(DiscoveryClient):
     """Wraps the Google Search Console API."""
 
-    def __init__(self, service: Resource, site_url: str):
-        self._service = service
+    service_name = "search_console"
+
+    def __init__(self, service: Resource, site_url: str, scheduler: QuotaScheduler | None = None):
+        super().__init__(service, scheduler)
         self._site_url = site_url
 
+    def _quota_scope(self) -> str:
+        return self._site_url
+
     @property
     def site_url(self) -> str:
         return self._site_url
@@ -25,19 +37,12 @@ class SearchConsoleClient:
         end_date: str,
         dimensions: list[str] | None = None,
         row_limit: int = 10,
-    ) -> list[dict]:
+    ) -> ResultSet:
         """Run a Search Console search analytics query."""
-        body = {
-            "startDate": start_date,
-            "endDate": end_date,
-            "rowLimit": row_limit,
-        }
-        if dimensions:
-            body["dimensions"] = dimensions
-
+        body = self._query_body(start_date, end_date, dimensions, row_limit)
         try:
-            response = (
-                self._service.searchanalytics().query(siteUrl=self._site_url, body=body).execute()
+            response = self._execute(
+                self._service.searchanalytics().query(siteUrl=self._site_url, body=body)
             )
         except HttpError as exc:
             logger.warning("Search Console query failed: %s %s", exc.status_code, exc.reason)
@@ -49,10 +54,137 @@ class SearchConsoleClient:
         logger.info("Search Console query returned %d rows", len(response.get("rows", [])))
         return self._flatten_response(response, dimensions or [])
 
+    def iter_query_pages(
+        self,
+        start_date: str,
+        end_date: str,
+        dimensions: list[str] | None = None,
+        page_size: int = SEARCH_CONSOLE_MAX_PAGE_ROWS,
+        prefetch: bool = True,
+        pages_per_batch: int = SEARCH_CONSOLE_PAGES_PER_BATCH,
+    ) -> Iterator[ResultSet]:
+        """Yield every row of a query as startRow pages of up to page_size rows.
+
+        The first page is requested on its own. If it is full, the following pages
+        are requested pages_per_batch at a time, each group in one batch HTTP call.
+        With prefetch, the next group is requested on a background thread while the
+        caller works through the current one, so at most two groups of pages are
+        held in memory at any time.
+        """
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="anny-sc-page")
+
+        def fetch(start_row: int, count: int):
+            ctx = contextvars.copy_context()
+            return pool.submit(
+                ctx.run,
+                self._query_pages,
+                start_date,
+                end_date,
+                dimensions,
+                page_size,
+                start_row,
+                count,
+            )
+
+        try:
+            start_row, count = 0, 1
+            pending = fetch(start_row, count)
+            while pending is not None:
+                pages = pending.result()
+                more = all(
+                    not isinstance(page, APIError) and len(page) == page_size for page in pages
+                )
+                start_row, count = start_row + count * page_size, max(1, pages_per_batch)
+                pending = fetch(start_row, count) if more and prefetch else None
+                for page in pages:
+                    if isinstance(page, APIError):
+                        raise page
+                    if page:
+                        yield page
+                    if len(page) < page_size:
+                        break
+                if more and pending is None:
+                    pending = fetch(start_row, count)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _query_pages(
+        self,
+        start_date: str,
+        end_date: str,
+        dimensions: list[str] | None,
+        page_size: int,
+        start_row: int,
+        count: int,
+    ) -> list[ResultSet | APIError]:
+        """count consecutive pages from start_row, two or more sent as one batch call.
+
+        A page that failed in a batch is returned as its APIError.
+        """
+        if count == 1:
+            return [self._query_page(start_date, end_date, dimensions, page_size, start_row)]
+        starts = range(start_row, start_row + count * page_size, page_size)
+        requests = {}
+        for row in starts:
+            body = self._query_body(start_date, end_date, dimensions, page_size)
+            body["startRow"] = row
+            requests[str(row)] = self._service.searchanalytics().query(
+                siteUrl=self._site_url, body=body
+            )
+        responses = self._execute_batch(requests, "Search Console query")
+        pages = []
+        for row in starts:
+            response = responses[str(row)]
+            if not isinstance(response, APIError):
+                response = self._flatten_response(response, dimensions or [])
+            pages.append(response)
+        logger.info("Search Console batch of %d pages from row %d", count, start_row)
+        return pages
+
+    def _query_page(
+        self,
+        start_date: str,
+        end_date: str,
+        dimensions: list[str] | None,
+        page_size: int,
+        start_row: int,
+    ) -> ResultSet:
+        body = self._query_body(start_date, end_date, dimensions, page_size)
+        body["startRow"] = start_row
+        try:
+            response = self._execute(
+                self._service.searchanalytics().query(siteUrl=self._site_url, body=body)
+            )
+        except HttpError as exc:
+            logger.warning(
+                "Search Console page at row %d failed: %s %s",
+                start_row,
+                exc.status_code,
+                exc.reason,
+            )
+            raise APIError("Search Console query failed", service="search_console") from exc
+
+        rows = self._flatten_response(response, dimensions or [])
+        logger.info("Search Console page at row %d returned %d rows", start_row, len(rows))
+        return rows
+
+    @staticmethod
+    def _query_body(
+        start_date: str, end_date: str, dimensions: list[str] | None, row_limit: int
+    ) -> dict:
+        body = {
+            "startDate": start_date,
+            "endDate": end_date,
+            "rowLimit": row_limit,
+        }
+        if dimensions:
+            body["dimensions"] = dimensions
+        return body
+
     def list_sitemaps(self) -> list[dict]:
         """List all sitemaps for the site."""
         try:
-            response = self._service.sitemaps().list(siteUrl=self._site_url).execute()
+            response = self._execute(self._service.sitemaps().list(siteUrl=self._site_url))
         except HttpError as exc:
             logger.warning("Sitemap list failed: %s %s", exc.status_code, exc.reason)
             raise APIError("Sitemap list failed", service="search_console") from exc
@@ -75,8 +207,8 @@ class SearchConsoleClient:
     def get_sitemap(self, feedpath: str) -> dict:
         """Get details for a specific sitemap."""
         try:
-            response = (
-                self._service.sitemaps().get(siteUrl=self._site_url, feedpath=feedpath).execute()
+            response = self._execute(
+                self._service.sitemaps().get(siteUrl=self._site_url, feedpath=feedpath)
             )
         except HttpError as exc:
             logger.warning("Sitemap get failed: %s %s", exc.status_code, exc.reason)
@@ -103,17 +235,16 @@ class SearchConsoleClient:
         }
 
     @staticmethod
-    def _flatten_response(response: dict, dimensions: list[str]) -> list[dict]:
-        """Convert Search Console API response to flat dicts."""
-        rows = []
-        for row in response.get("rows", []):
-            flat = {}
-            keys = row.get("keys", [])
-            for i, dim in enumerate(dimensions):
-                flat[dim] = keys[i] if i < len(keys) else ""
-            flat["clicks"] = row.get("clicks", 0)
-            flat["impressions"] = row.get("impressions", 0)
-            flat["ctr"] = round(row.get("ctr", 0) * 100, 2)
-            flat["position"] = round(row.get("position", 0), 1)
-            rows.append(flat)
-        return rows
+    def _flatten_response(response: dict, dimensions: list[str]) -> ResultSet:
+        """Convert Search Console API response to a ResultSet, dimensions first."""
+        rows = response.get("rows", [])
+        columns = {}
+        for i, dim in enumerate(dimensions):
+            columns[dim] = [
+                row.get("keys", [])[i] if i < len(row.get("keys", [])) else "" for row in rows
+            ]
+        columns["clicks"] = [row.get("clicks", 0) for row in rows]
+        columns["impressions"] = [row.get("impressions", 0) for row in rows]
+        columns["ctr"] = [round(row.get("ctr", 0) * 100, 2) for row in rows]
+        columns["position"] = [round(row.get("position", 0), 1) for row in rows]
+        return ResultSet.from_columns(columns, dimensions)
@@ -1,24 +1,23 @@
 import logging
 import re
 
-from googleapiclient.discovery import Resource
 from googleapiclient.errors import HttpError
 
+from anny.clients.discovery import DiscoveryClient
 from anny.core.exceptions import APIError
 
 logger = logging.getLogger("anny")
 
 
-class TagManagerClient:
+class TagManagerClient(DiscoveryClient):
     """Wraps the Google Tag Manager API v2."""
 
-    def __init__(self, service: Resource):
-        self._service = service
+    service_name = "tag_manager"
 
     def list_accounts(self) -> list[dict]:
         """List all GTM accounts accessible by the service account."""
         try:
-            response = self._service.accounts().list().execute()
+            response = self._execute(self._service.accounts().list())
         except HttpError as exc:
             logger.warning("GTM list accounts failed: %s %s", exc.status_code, exc.reason)
             raise APIError(
@@ -53,7 +52,7 @@ class TagManagerClient:
         self._validate_account_id(account_id)
         parent = f"accounts/{account_id.removeprefix('accounts/')}"
         try:
-            response = self._service.accounts().containers().list(parent=parent).execute()
+            response = self._execute(self._service.accounts().containers().list(parent=parent))
         except HttpError as exc:
             logger.warning("GTM list containers failed: %s %s", exc.status_code, exc.reason)
             raise APIError(
@@ -76,14 +75,7 @@ class TagManagerClient:
         self._validate_container_path(container_path)
         workspace_path = self._ensure_workspace_path(container_path)
         try:
-            response = (
-                self._service.accounts()
-                .containers()
-                .workspaces()
-                .tags()
-                .list(parent=workspace_path)
-                .execute()
-            )
+            response = self._execute(self._workspaces().tags().list(parent=workspace_path))
         except HttpError as exc:
             logger.warning("GTM list tags failed: %s %s", exc.status_code, exc.reason)
             raise APIError(
@@ -91,28 +83,14 @@ class TagManagerClient:
                 service="tag_manager",
             ) from exc
 
-        return [
-            {
-                "tagId": t.get("tagId", ""),
-                "name": t.get("name", ""),
-                "type": t.get("type", ""),
-            }
-            for t in response.get("tag", [])
-        ]
+        return self._tag_rows(response)
 
     def list_triggers(self, container_path: str) -> list[dict]:
         """List triggers in a container workspace."""
         self._validate_container_path(container_path)
         workspace_path = self._ensure_workspace_path(container_path)
         try:
-            response = (
-                self._service.accounts()
-                .containers()
-                .workspaces()
-                .triggers()
-                .list(parent=workspace_path)
-                .execute()
-            )
+            response = self._execute(self._workspaces().triggers().list(parent=workspace_path))
         except HttpError as exc:
             logger.warning("GTM list triggers failed: %s %s", exc.status_code, exc.reason)
             raise APIError(
@@ -120,28 +98,14 @@ class TagManagerClient:
                 service="tag_manager",
             ) from exc
 
-        return [
-            {
-                "triggerId": t.get("triggerId", ""),
-                "name": t.get("name", ""),
-                "type": t.get("type", ""),
-            }
-            for t in response.get("trigger", [])
-        ]
+        return self._trigger_rows(response)
 
     def list_variables(self, container_path: str) -> list[dict]:
         """List variables in a container workspace."""
         self._validate_container_path(container_path)
         workspace_path = self._ensure_workspace_path(container_path)
         try:
-            response = (
-                self._service.accounts()
-                .containers()
-                .workspaces()
-                .variables()
-                .list(parent=workspace_path)
-                .execute()
-            )
+            response = self._execute(self._workspaces().variables().list(parent=workspace_path))
         except HttpError as exc:
             logger.warning("GTM list variables failed: %s %s", exc.status_code, exc.reason)
             raise APIError(
@@ -149,6 +113,54 @@ class TagManagerClient:
                 service="tag_manager",
             ) from exc
 
+        return self._variable_rows(response)
+
+    def list_container_setup(self, container_path: str) -> dict[str, list[dict]]:
+        """List tags, triggers, and variables in one batched HTTP call."""
+        self._validate_container_path(container_path)
+        workspace_path = self._ensure_workspace_path(container_path)
+        workspaces = self._workspaces()
+        responses = self._execute_all(
+            {
+                "tags": workspaces.tags().list(parent=workspace_path),
+                "triggers": workspaces.triggers().list(parent=workspace_path),
+                "variables": workspaces.variables().list(parent=workspace_path),
+            },
+            "GTM container setup",
+        )
+        return {
+            "tags": self._tag_rows(responses["tags"]),
+            "triggers": self._trigger_rows(responses["triggers"]),
+            "variables": self._variable_rows(responses["variables"]),
+        }
+
+    def _workspaces(self):
+        return self._service.accounts().containers().workspaces()
+
+    @staticmethod
+    def _tag_rows(response: dict) -> list[dict]:
+        return [
+            {
+                "tagId": t.get("tagId", ""),
+                "name": t.get("name", ""),
+                "type": t.get("type", ""),
+            }
+            for t in response.get("tag", [])
+        ]
+
+    @staticmethod
+    def _trigger_rows(response: dict) -> list[dict]:
+        return [
+            {
+                "triggerId": t.get("triggerId", ""),
+                "name": t.get("name", ""),
+                "type": t.get("type", ""),
+            }
+            for t in response.get("trigger", [])
+        ]
+
+    @staticmethod
+    def _variable_rows(response: dict) -> list[dict]:
         return [
             {
                 "variableId": v.get("variableId", ""),
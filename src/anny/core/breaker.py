@@ -0,0 +1,125 @@
+"""Per-service circuit breaking for outbound Google API calls."""
+
+import logging
+import threading
+import time
+
+from anny.core.exceptions import APIError, CircuitOpenError
+
+logger = logging.getLogger("anny")
+
+# 4xx statuses that may succeed on retry (timeout, rate limit); other 4xx are deterministic
+_RETRYABLE_4XX = (408, 429)
+
+
+def error_status(exc: BaseException) -> int | None:
+    """HTTP status of the Google error behind exc, or None if there is none.
+
+    Reads status_code (googleapiclient HttpError) or code (google.api_core errors),
+    following the cause chain of APIError wrappers.
+    """
+    while isinstance(exc, APIError):
+        exc = exc.__cause__
+    code = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_deterministic(exc: BaseException) -> bool:
+    """True for errors that would recur on an identical request, e.g. an invalid metric."""
+    status = error_status(exc)
+    return status is not None and 400 <= status < 500 and status not in _RETRYABLE_4XX
+
+
+class CircuitBreaker:  # pylint: disable=too-many-instance-attributes
+    """Fails calls to one Google service fast while it is failing.
+
+    Closed, calls pass. After failure_threshold consecutive failures (429s, 5xx,
+    transport errors) the breaker opens and before_call() raises CircuitOpenError for
+    reset_timeout seconds. Then it is half-open: one trial call passes, closing the
+    breaker if it succeeds and reopening it if it fails. A trial that never reports
+    back releases its turn after another reset_timeout. Deterministic errors (4xx
+    such as invalid arguments) mean the service answered, so they count as successes.
+    """
+
+    def __init__(self, service: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self._service = service
+        self._threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_started: float | None = None
+        self._opens = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked(time.monotonic())
+
+    def _state_locked(self, now: float) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at < self._reset_timeout:
+            return "open"
+        return "half_open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._state_locked(now)
+            if state == "closed":
+                return
+            if state == "half_open" and (
+                self._trial_started is None or now - self._trial_started >= self._reset_timeout
+            ):
+                self._trial_started = now
+                return
+            self._rejected += 1
+            retry_after = max(self._opened_at + self._reset_timeout - now, 1.0)
+        raise CircuitOpenError(self._service, retry_after)
+
+    def record(self, exc: BaseException | None = None) -> None:
+        """Record the outcome of a call that went through: None for success."""
+        if exc is not None and not is_deterministic(exc):
+            self._record_failure()
+            return
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("%s circuit closed", self._service)
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started = None
+
+    def _record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            half_open = self._trial_started is not None
+            if not half_open and (self._opened_at is not None or self._failures < self._threshold):
+                return
+            self._opened_at = time.monotonic()
+            self._trial_started = None
+            self._opens += 1
+        logger.warning(
+            "%s circuit opened after %d failures, failing fast for %ds",
+            self._service,
+            self._failures,
+            self._reset_timeout,
+        )
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            state = self._state_locked(now)
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "opens": self._opens,
+                "rejected": self._rejected,
+                "retry_after_seconds": (
+                    round(self._opened_at + self._reset_timeout - now, 1)
+                    if state == "open"
+                    else None
+                ),
+            }
@@ -1,71 +1,1296 @@
+# pylint: disable=too-many-lines
+import asyncio
+import contextvars
 import hashlib
+import heapq
 import json
 import logging
+import sys
 import threading
 import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from anny.core.breaker import is_deterministic
+from anny.core.cache_backends import CacheBackend, CachedRecord
+from anny.core.cache_policy import TTLPolicy
+from anny.core.cache_shape import Shape, covers, project
+from anny.core.constants import CACHE_SCHEMA_VERSION
+from anny.core.exceptions import APIError, CapacityError
+from anny.core.executor import BlockingExecutor
+from anny.core.quota import Priority, set_priority
+from anny.core.resultset import json_default, json_object_hook
 
 logger = logging.getLogger("anny")
 
+# Result a cancelled leader hands to its followers so one of them retries the fetch
+_RETRY = object()
+
+# Seconds before expiry at which get_or_fetch in this context refetches a fresh entry
+_refresh_lead_var: contextvars.ContextVar[float] = contextvars.ContextVar(
+    "cache_refresh_lead", default=0.0
+)
+
+
+def set_refresh_lead(seconds: float) -> contextvars.Token:
+    """Make get_or_fetch in the current context refetch entries expiring within seconds.
+
+    Used by the prefetcher to renew entries before they expire; other callers keep
+    getting the cached result meanwhile.
+    """
+    return _refresh_lead_var.set(seconds)
+
+
+# Summaries of results served from fallback in the current context, under track_stale()
+_stale_var: contextvars.ContextVar[list[str] | None] = contextvars.ContextVar(
+    "cache_stale_served", default=None
+)
+
+
+@contextmanager
+def track_stale():
+    """Collect what the cache serves from fallback within the block.
+
+    Yields a list that receives the summary of every last-known-good result served
+    because Google was unavailable; code run on the executor or in tasks started in
+    the block reports into the same list. Empty means every result was fresh.
+    """
+    served: list[str] = []
+    token = _stale_var.set(served)
+    try:
+        yield served
+    finally:
+        _stale_var.reset(token)
+
+
+def _is_outage(exc: BaseException) -> bool:
+    """True when exc means Google could not answer, rather than rejected the request."""
+    return isinstance(exc, CapacityError) or (
+        isinstance(exc, APIError) and not is_deterministic(exc)
+    )
+
+
+def measure_size(obj) -> int:
+    """Deep in-memory size of a cached result in bytes (shared objects counted once)."""
+    seen: set[int] = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return size
+
+
+class _Entry:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    __slots__ = (
+        "result",
+        "rows",
+        "api",
+        "summary",
+        "ts",
+        "expires",
+        "stale_until",
+        "keep_until",
+        "size",
+        "shape",
+        "packed",
+        "raw_size",
+        "stale",
+    )
+
+    def __init__(
+        self,
+        result,
+        api: str,
+        summary: str,
+        ts: float,
+        expires: float,
+        stale_until: float,
+        keep_until: float,
+        size: int,
+        shape: Shape | None = None,
+    ):
+        self.result = result
+        self.rows = len(result) if shape is not None else 0  # for containment checks
+        self.api = api
+        self.summary = summary
+        self.ts = ts
+        self.expires = expires  # soft TTL: fresh until then
+        self.stale_until = stale_until  # hard TTL: may be served stale until then
+        self.keep_until = keep_until  # kept as a fallback for outages until then
+        self.size = size
+        self.shape = shape
+        self.packed: bytes | None = None  # zlib-compressed JSON while result is None
+        self.raw_size = size  # size when unpacked
+        self.stale = False  # counted in stale_entries
+
+
+class _Packed(NamedTuple):
+    """A compressed entry's data, taken under the lock to be decompressed outside it.
+
+    project is the (cached, wanted) shape pair when the result answers a containment
+    lookup and must be projected once decompressed.
+    """
+
+    key: str
+    entry: _Entry
+    data: bytes
+    project: tuple[Shape, Shape] | None = None
+
+
+class CacheRequest(NamedTuple):
+    """One of several results fetched in one call by QueryCache.get_or_fetch_many.
+
+    key, api, summary, end_date, shape, and store are as for get_or_fetch. fallback,
+    if set, stands in for the entry under key as the last known good result: it is
+    called with the error when Google is unavailable and returns a result or None.
+    """
+
+    key: str
+    api: str = ""
+    summary: str = ""
+    end_date: str | None = None
+    shape: Shape | None = None
+    store: bool = True
+    fallback: Callable[[Exception], object] | None = None
+
+
+class _Claims(NamedTuple):
+    """Flights joined by get_or_fetch_many, by request index."""
+
+    flights: dict[int, Future]  # every flight the call leads or waits on
+    leaders: list[int]  # misses the call fetches
+    stale: list[int]  # stale hits the call refreshes
+
+    def followers(self) -> list[tuple[int, Future]]:
+        return [
+            (i, flight)
+            for i, flight in self.flights.items()
+            if i not in self.leaders and i not in self.stale
+        ]
+
+
+class _ApiStats:  # pylint: disable=too-many-instance-attributes
+    """Lookup, storage, and Google fetch counters for one api label."""
+
+    __slots__ = (
+        "hits",
+        "misses",
+        "stale_served",
+        "fallbacks",
+        "negative_hits",
+        "evictions",
+        "expirations",
+        "entries",
+        "bytes",
+        "fetches",
+        "fetch_seconds",
+        "seconds_saved",
+    )
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0  # lookups that waited for Google
+        self.stale_served = 0
+        self.fallbacks = 0  # last known good results served during outages
+        self.negative_hits = 0  # cached errors raised again without calling Google
+        self.evictions = 0
+        self.expirations = 0
+        self.entries = 0
+        self.bytes = 0
+        self.fetches = 0
+        self.fetch_seconds = 0.0
+        self.seconds_saved = 0.0  # mean fetch latency at each hit and stale serve, summed
+
+    def _mean_fetch_seconds(self) -> float:
+        return self.fetch_seconds / self.fetches if self.fetches else 0.0
 
-class QueryCache:
-    """In-memory query cache with TTL expiry and LRU eviction."""
+    def served(self, stale: bool = False) -> None:
+        """Count a hit (or stale serve) and the Google latency it avoided."""
+        if stale:
+            self.stale_served += 1
+        else:
+            self.hits += 1
+        self.seconds_saved += self._mean_fetch_seconds()
 
-    def __init__(self, ttl: int = 3600, max_entries: int = 500):
+    def as_dict(self) -> dict:
+        """Counters plus hit ratio and Google latency avoided (the mean fetch latency
+        at the time of each hit and stale serve, so it only grows)."""
+        lookups = self.hits + self.misses
+        mean = self._mean_fetch_seconds()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "stale_served": self.stale_served,
+            "fallbacks": self.fallbacks,
+            "negative_hits": self.negative_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": self.entries,
+            "bytes": self.bytes,
+            "fetches": self.fetches,
+            "mean_fetch_seconds": round(mean, 4),
+            "fetch_seconds_saved": round(self.seconds_saved, 3),
+        }
+
+
+class QueryCache:  # pylint: disable=too-many-instance-attributes
+    """In-memory query cache with TTL expiry and LRU eviction.
+
+    get, put, and eviction are O(1) (expiry is O(log n) via a heap). Capacity is
+    bounded both by entry count and by max_bytes of measured result size.
+
+    An optional l2 backend (SQLite file or Redis) persists entries beyond this process
+    and shares them between workers: misses are looked up there before fetching (hits
+    are promoted back into memory with their original expiry), and every put is
+    written through to it asynchronously.
+
+    With a TTLPolicy, each entry's TTL depends on its api and the end date it covers
+    (see TTLPolicy); otherwise every entry lives for ttl seconds.
+
+    That TTL is soft when stale_ttl is set: for stale_ttl seconds after it, get_or_fetch
+    returns the stale result immediately and starts one background refresh (at LOW
+    priority, on executor for sync callers) instead of making the caller wait for
+    Google. get() only returns fresh results.
+
+    Results stored with a Shape also answer other queries of the same family: a miss
+    for a smaller limit or a metric subset is sliced or projected from a fresh cached
+    result that covers it, instead of calling Google.
+
+    With compress_threshold set, results measuring more than that many bytes are kept
+    as zlib-compressed compact JSON, except for the hot_entries most recently used of
+    them, which stay as Python objects. A hit on a compressed entry decompresses it
+    back into the hot set; as with the second tier, the result is its JSON round trip.
+
+    With negative_ttl set, a deterministic APIError from fetch (a 4xx such as an
+    invalid metric) is remembered for that many seconds and raised again for the same
+    key without calling Google. When fetch fails because Google is unavailable (an
+    open circuit breaker, shed work, 429, 5xx), get_or_fetch returns the last known
+    good result instead, if one is held, and reports it to track_stale(); entries are
+    kept for that purpose for fallback_ttl seconds past their TTL.
+    """
+
+    def __init__(
+        self,
+        ttl: int = 3600,
+        max_entries: int = 500,
+        max_bytes: int = 0,
+        l2: CacheBackend | None = None,
+        policy: TTLPolicy | None = None,
+        stale_ttl: int = 0,
+        compress_threshold: int = 0,
+        hot_entries: int = 32,
+        negative_ttl: int = 0,
+        fallback_ttl: int = 0,
+        executor: BlockingExecutor | None = None,
+    ):
         self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._fallback_ttl = fallback_ttl
+        self._negative_ttl = negative_ttl
+        # key -> (expires, error) for deterministic failures, oldest first
+        self._errors: OrderedDict[str, tuple[float, APIError]] = OrderedDict()
+        self._fallbacks = 0
         self._max_entries = max_entries
+        self._max_bytes = max_bytes  # 0 = no byte budget
         self._lock = threading.Lock()
-        # key -> {"result": ..., "api": ..., "summary": ..., "ts": ..., "last_access": ...}
-        self._store: dict[str, dict] = {}
+        # key -> entry, least recently used first
+        self._store: OrderedDict[str, _Entry] = OrderedDict()
+        # (keep_until, key) for every entry; outdated pairs are skipped when popped
+        self._expiry: list[tuple[float, str]] = []
+        # (expires, key) for entries not yet counted stale, so status() need not scan
+        self._freshness: list[tuple[float, str]] = []
+        self._stale_entries = 0
+        self._bytes = 0
+        self._evictions = 0
+        self._expirations = 0
+        # key -> Future shared by every caller waiting on the same in-flight fetch
+        self._inflight: dict[str, Future] = {}
+        self._sweeper: threading.Thread | None = None
+        self._stop_sweeper = threading.Event()
+        self._l2 = l2
+        self._policy = policy
+        self._stale_served = 0
+        self._refreshes = 0
+        self._refresh_failures = 0
+        self._contained_hits = 0
+        # Shape.family -> {key: shape} of stored entries, for containment lookups
+        self._families: dict[str, dict[str, Shape]] = {}
+        # Background refresh tasks, referenced until done so they are not collected
+        self._refresh_tasks: set[asyncio.Task] = set()
+        # Runs background refreshes for sync callers; a small private pool if not given
+        self._executor = executor
+        # api label -> counters, reported by status()
+        self._api_stats: dict[str, _ApiStats] = {}
+        self._compress_threshold = compress_threshold  # 0 = never compress
+        self._hot_entries = hot_entries
+        # keys of large entries kept unpacked, least recently used first
+        self._hot: OrderedDict[str, None] = OrderedDict()
+        self._packed_entries = 0
+        self._packed_raw_bytes = 0
+        self._packed_bytes = 0
+        self._compressions = 0
+        self._decompressions = 0
+        self._compress_seconds = 0.0
+        self._decompress_seconds = 0.0
 
     @staticmethod
     def make_key(api: str, params: dict) -> str:
-        """Create a deterministic SHA-256 cache key from API name and params."""
-        raw = json.dumps({"api": api, "params": params}, sort_keys=True, default=str)
+        """Create a deterministic SHA-256 cache key from API name, params and schema version."""
+        payload = {"api": api, "params": params, "version": CACHE_SCHEMA_VERSION}
+        raw = json.dumps(payload, sort_keys=True, default=str)
         return hashlib.sha256(raw.encode()).hexdigest()
 
-    def get(self, key: str) -> dict | None:
-        """Return cached result or None if missing/expired."""
+    def get(
+        self, key: str, shape: Shape | None = None, api: str = "", miss: bool = True
+    ) -> dict | None:
+        """Return cached result or None if missing/expired.
+
+        With a shape, a fresh result of the same family that covers it also counts.
+        A miss is counted against api, unless miss is False because the caller goes on
+        to count it (say, as part of a get_or_fetch).
+        """
         with self._lock:
-            entry = self._store.get(key)
-            if entry is None:
-                return None
-            if time.time() - entry["ts"] > self._ttl:
-                del self._store[key]
+            entry = self._entry_locked(key)
+            if entry is not None and time.time() <= entry.expires:
+                self._stats_locked(entry.api).served()
+                cached = self._result_locked(key, entry)
+            else:
+                cached = self._contained_locked(shape) if shape is not None else None
+        if cached is None and self._l2 is not None:
+            cached = self._load_l2(key, shape)
+        if cached is None and miss:
+            with self._lock:
+                self._stats_locked(api).misses += 1
+        return self._resolve(cached)
+
+    def _load_l2(self, key: str, shape: Shape | None = None):
+        """Look key up in the second tier, promoting a live hit into memory.
+
+        A second tier that fails or returns something unusable is a miss.
+        """
+        try:
+            record = self._l2.get(key)
+            if record is None or record.expires <= time.time() + _refresh_lead_var.get():
                 return None
-            entry["last_access"] = time.time()
-            return entry["result"]
+            self._pack_entries(self._store_local(key, record, shape))
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logger.warning("Cache second tier read of %s failed: %r", key, exc)
+            return None
+        with self._lock:
+            self._stats_locked(record.api).served()
+        return record.result
+
+    async def _load_l2_async(self, key: str, flight: Future, shape: Shape | None):
+        """_load_l2 off the event loop for a flight's leader; cancelling it frees the flight."""
+        try:
+            return await asyncio.to_thread(self._load_l2, key, shape)
+        except BaseException:
+            self._land_flight(key, flight, result=_RETRY)
+            raise
+
+    def _stats_locked(self, api: str) -> _ApiStats:
+        stats = self._api_stats.get(api)
+        if stats is None:
+            stats = self._api_stats[api] = _ApiStats()
+        return stats
+
+    def _record_fetch(self, api: str, started: float, miss: bool = True) -> None:
+        """Count a Google call and how long it took (a miss unless it was a refresh)."""
+        with self._lock:
+            stats = self._stats_locked(api)
+            stats.misses += miss
+            stats.fetches += 1
+            stats.fetch_seconds += time.monotonic() - started
+
+    def _contained_locked(self, shape: Shape):
+        """Slice or project a fresh cached result of shape's family that covers it.
+
+        Candidates are checked by their stored row count, so only the entry that is
+        returned gets decompressed.
+        """
+        now = time.time()
+        for key, cached in self._families.get(shape.family, {}).items():
+            entry = self._store[key]
+            if now > entry.expires or not covers(cached, entry.rows, shape):
+                continue
+            self._store.move_to_end(key)
+            self._contained_hits += 1
+            self._stats_locked(entry.api).served()
+            result = self._result_locked(key, entry)
+            if isinstance(result, _Packed):
+                return result._replace(project=(cached, shape))
+            return project(result, cached, shape)
+        return None
+
+    def _result_locked(self, key: str, entry: _Entry):
+        """The entry's result, or a _Packed for _resolve() to decompress outside the lock."""
+        if entry.packed is not None:
+            return _Packed(key, entry, entry.packed)
+        if key in self._hot:
+            self._hot.move_to_end(key)
+        return entry.result
+
+    def _resolve(self, value):
+        """The result behind a value from _result_locked(), decompressing it if packed.
+
+        A decompressed entry joins the hot set, with its result swapped in under the
+        lock only if the entry has not changed meanwhile; growing back to its raw size
+        evicts other entries as a put would.
+        """
+        if not isinstance(value, _Packed):
+            return value
+        started = time.perf_counter()
+        result = json.loads(zlib.decompress(value.data), object_hook=json_object_hook)
+        elapsed = time.perf_counter() - started
+        cold = []
+        with self._lock:
+            self._decompress_seconds += elapsed
+            self._decompressions += 1
+            entry = value.entry
+            if entry.packed is value.data and self._store.get(value.key) is entry:
+                self._forget_packed_locked(entry)
+                entry.packed, entry.result = None, result
+                self._resize_locked(entry, entry.raw_size)
+                cold = self._make_hot_locked(value.key)
+                self._evict_locked(keep=value.key)
+        self._pack_entries(cold)  # with no hot set, this packs it straight back
+        return project(result, *value.project) if value.project else result
+
+    async def _resolve_async(self, value):
+        """_resolve() on a worker thread when there is something to decompress."""
+        if not isinstance(value, _Packed):
+            return value
+        return await asyncio.to_thread(self._resolve, value)
+
+    def _resize_locked(self, entry: _Entry, size: int) -> None:
+        self._bytes += size - entry.size
+        self._stats_locked(entry.api).bytes += size - entry.size
+        entry.size = size
+
+    def _pack_entries(self, cold: list[tuple[str, _Entry]]) -> None:
+        """Replace large entries that left the hot set with compressed compact JSON.
+
+        Compression runs outside the lock; an entry used, replaced, or removed in the
+        meantime is left as it is.
+        """
+        for key, entry in cold:
+            with self._lock:
+                result = entry.result
+                if result is None or key in self._hot or self._store.get(key) is not entry:
+                    continue
+            started = time.perf_counter()
+            try:
+                data = zlib.compress(
+                    json.dumps(result, separators=(",", ":"), default=json_default).encode()
+                )
+            except (TypeError, ValueError):
+                continue  # not JSON-serialisable: keep it as is
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._compress_seconds += elapsed
+                self._compressions += 1
+                if (
+                    entry.result is not result
+                    or key in self._hot
+                    or self._store.get(key) is not entry
+                ):
+                    continue
+                entry.packed, entry.result = data, None
+                self._resize_locked(entry, sys.getsizeof(data))
+                self._packed_entries += 1
+                self._packed_raw_bytes += entry.raw_size
+                self._packed_bytes += entry.size
+
+    def _forget_packed_locked(self, entry: _Entry) -> None:
+        self._packed_entries -= 1
+        self._packed_raw_bytes -= entry.raw_size
+        self._packed_bytes -= entry.size
+
+    def _make_hot_locked(self, key: str) -> list[tuple[str, _Entry]]:
+        """Add a large entry to the hot set; return the least recently used beyond it,
+        for _pack_entries() to compress once the lock is released."""
+        self._hot[key] = None
+        cold = []
+        while len(self._hot) > self._hot_entries:
+            cold_key, _ = self._hot.popitem(last=False)
+            cold.append((cold_key, self._store[cold_key]))
+        return cold
+
+    def _entry_locked(self, key: str) -> _Entry | None:
+        """Return key's entry if still held (fresh, stale, or kept as a fallback), marking
+        it recently used."""
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        if time.time() > entry.keep_until:
+            self._remove_locked(key)
+            self._expirations += 1
+            self._stats_locked(entry.api).expirations += 1
+            return None
+        self._store.move_to_end(key)
+        return entry
 
-    def put(self, key: str, result, api: str = "", summary: str = "") -> None:
-        """Store a result in cache, evicting oldest-accessed entry if at capacity."""
+    def _remove_locked(self, key: str) -> _Entry:
+        entry = self._store.pop(key)
+        self._hot.pop(key, None)
+        if entry.stale:
+            self._stale_entries -= 1
+        if entry.packed is not None:
+            self._forget_packed_locked(entry)
+        self._bytes -= entry.size
+        stats = self._stats_locked(entry.api)
+        stats.entries -= 1
+        stats.bytes -= entry.size
+        if entry.shape is not None:
+            family = self._families[entry.shape.family]
+            del family[key]
+            if not family:
+                del self._families[entry.shape.family]
+        return entry
+
+    def _join_flight(
+        self, key: str, shape: Shape | None = None, api: str = ""
+    ) -> tuple[object, Future | None, bool]:
+        """Return (cached, flight, is_leader) for key, registering a new flight on a miss.
+
+        A stale hit returns the cached result; if no fetch for key is in flight yet, it
+        also registers one with is_leader True, and the caller starts the refresh. Under
+        set_refresh_lead, an entry expiring within the lead counts as a miss and
+        containment is skipped, so the key itself gets renewed. On a miss, an error
+        remembered for key (see negative_ttl) is raised instead.
+        """
+        lead = _refresh_lead_var.get()
         with self._lock:
-            if len(self._store) >= self._max_entries and key not in self._store:
-                oldest_key = min(self._store, key=lambda k: self._store[k]["last_access"])
-                del self._store[oldest_key]
+            entry = self._entry_locked(key)
             now = time.time()
-            self._store[key] = {
-                "result": result,
-                "api": api,
-                "summary": summary,
-                "ts": now,
-                "last_access": now,
-            }
+            if entry is not None and now + lead <= entry.expires:
+                self._stats_locked(entry.api).served()
+                return self._result_locked(key, entry), None, False
+            if entry is not None and (now > entry.stale_until or (lead and now <= entry.expires)):
+                entry = None  # only kept as a fallback, or due for refresh within lead
+            if entry is None:
+                self._raise_error_locked(key, api)
+            contained = self._contained_locked(shape) if shape is not None and not lead else None
+            if contained is not None:
+                return contained, None, False
+            flight = self._inflight.get(key)
+            if entry is not None:
+                self._stale_served += 1
+                self._stats_locked(entry.api).served(stale=True)
+                result = self._result_locked(key, entry)
+                if flight is not None:
+                    return result, None, False
+                return result, self._new_flight_locked(key), True
+            if flight is not None:
+                self._stats_locked(api).misses += 1
+                return None, flight, False
+            return None, self._new_flight_locked(key), True
+
+    def _raise_error_locked(self, key: str, api: str) -> None:
+        """Raise the remembered deterministic error for key, if it has not expired."""
+        remembered = self._errors.get(key)
+        if remembered is None:
+            return
+        expires, error = remembered
+        if time.time() > expires:
+            del self._errors[key]
+            return
+        self._stats_locked(api).negative_hits += 1
+        raise APIError(error.message, service=error.service) from error.__cause__
+
+    def _remember_error(self, key: str, exc: Exception) -> None:
+        if not (self._negative_ttl and isinstance(exc, APIError) and is_deterministic(exc)):
+            return
+        with self._lock:
+            self._errors.pop(key, None)
+            self._errors[key] = (time.time() + self._negative_ttl, exc)
+            while len(self._errors) > self._max_entries:
+                self._errors.popitem(last=False)
+
+    def _fallback(self, key: str, exc: Exception):
+        """Return key's last known good result if exc is an outage, else None.
+
+        The summary of a result served this way is added to the track_stale() list.
+        """
+        if not _is_outage(exc):
+            return None
+        with self._lock:
+            entry = self._entry_locked(key)
+            if entry is None:
+                return None
+            self._fallbacks += 1
+            self._stats_locked(entry.api).fallbacks += 1
+            result = self._result_locked(key, entry)  # resolved by the caller
+        logger.warning("Serving last known good %s %s: %s", entry.api, entry.summary, exc)
+        served = _stale_var.get()
+        if served is not None:
+            served.append(f"{entry.api} {entry.summary}".strip())
+        return result
+
+    def fallback(self, key: str, exc: Exception):
+        """Return key's last known good result if exc means Google is unavailable, else None.
+
+        For callers that cache a result under several keys, as get_or_fetch does for
+        one key.
+        """
+        return self._resolve(self._fallback(key, exc))
+
+    def _fallback_or_raise(self, key: str, exc: Exception):
+        fallback = self._fallback(key, exc)
+        if fallback is None:
+            raise exc
+        return fallback
+
+    def _new_flight_locked(self, key: str) -> Future:
+        flight = Future()
+        flight.set_running_or_notify_cancel()  # waiters must not be able to cancel it
+        self._inflight[key] = flight
+        return flight
+
+    def _land_flight(self, key: str, flight: Future, result=None, exc=None) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        if exc is not None:
+            flight.set_exception(exc)
+        else:
+            flight.set_result(result)
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch,
+        api: str = "",
+        summary: str = "",
+        end_date: str | None = None,
+        shape: Shape | None = None,
+        store: bool = True,
+    ):
+        """Return the cached result for key, or call fetch() once for all concurrent callers.
+
+        Callers that miss while another fetch for the same key is in flight wait for it
+        and share its result or exception. If the fetch fails because Google is
+        unavailable, each caller gets the last known good result, if there is one.
+
+        With store False the result is only shared with concurrent callers, not cached
+        under key: fetch caches whatever parts of it should be kept.
+        """
+        while True:
+            cached, flight, leader = self._join_flight(key, shape, api)
+            if cached is not None:
+                if leader:
+                    self._refresh_in_background(key, flight, fetch, api, summary, end_date, shape)
+                return self._resolve(cached)
+            if not leader:
+                try:
+                    result = flight.result()
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    return self._resolve(self._fallback_or_raise(key, exc))
+                if result is _RETRY:
+                    continue
+                return result
+            try:
+                result = self._load_l2(key, shape) if self._l2 is not None and store else None
+            except BaseException:
+                self._land_flight(key, flight, result=_RETRY)
+                raise
+            if result is not None:
+                self._land_flight(key, flight, result=result)
+                return result
+            started = time.monotonic()
+            try:
+                result = fetch()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self._remember_error(key, exc)
+                self._land_flight(key, flight, exc=exc)
+                return self._resolve(self._fallback_or_raise(key, exc))
+            except BaseException:
+                self._land_flight(key, flight, result=_RETRY)
+                raise
+            finally:
+                self._record_fetch(api, started)
+            if store:
+                self.put(key, result, api=api, summary=summary, end_date=end_date, shape=shape)
+            self._land_flight(key, flight, result=result)
+            return result
+
+    async def get_or_fetch_async(
+        self,
+        key: str,
+        fetch,
+        api: str = "",
+        summary: str = "",
+        end_date: str | None = None,
+        shape: Shape | None = None,
+        store: bool = True,
+    ):
+        """Async get_or_fetch: fetch is a zero-argument callable returning an awaitable.
+
+        Async and threaded callers share the same in-flight fetch for a key.
+        """
+        while True:
+            cached, flight, leader = self._join_flight(key, shape, api)
+            if cached is not None:
+                if leader:
+                    task = asyncio.ensure_future(
+                        self._refresh_async(key, flight, fetch, api, summary, end_date, shape)
+                    )
+                    self._refresh_tasks.add(task)
+                    task.add_done_callback(self._refresh_tasks.discard)
+                return await self._resolve_async(cached)
+            if not leader:
+                try:
+                    result = await asyncio.wrap_future(flight)
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    return await self._resolve_async(self._fallback_or_raise(key, exc))
+                if result is _RETRY:
+                    continue
+                return result
+            if self._l2 is not None and store:
+                result = await self._load_l2_async(key, flight, shape)
+                if result is not None:
+                    self._land_flight(key, flight, result=result)
+                    return result
+            started = time.monotonic()
+            try:
+                result = await fetch()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self._remember_error(key, exc)
+                self._land_flight(key, flight, exc=exc)
+                return await self._resolve_async(self._fallback_or_raise(key, exc))
+            except BaseException:
+                self._land_flight(key, flight, result=_RETRY)
+                raise
+            finally:
+                self._record_fetch(api, started)
+            if store:
+                await self._put_async(key, result, api, summary, end_date, shape)
+            self._land_flight(key, flight, result=result)
+            return result
+
+    def get_or_fetch_many(self, requests: list[CacheRequest], fetch) -> list:
+        """get_or_fetch for several requests whose misses are fetched in one call.
+
+        fetch(indices) fetches the requests at those positions together and returns
+        their results in the same order. Each request is served as by get_or_fetch:
+        fresh, contained, and second-tier hits are not fetched, a miss shares its
+        flight with concurrent callers for the same key, and stale results are
+        refreshed along with the misses (in the background if there are none). When
+        Google is unavailable, each miss falls back to its last known good result; the
+        error is raised if one has none.
+        """
+        results: list = [None] * len(requests)
+        pending = range(len(requests))
+        while pending:
+            claims = self._claim_many(requests, pending, results)
+            try:
+                self._load_many_l2(requests, claims, results)
+            except BaseException:
+                self._release_many(requests, claims, claims.leaders + claims.stale)
+                raise
+            if claims.leaders:
+                self._fetch_many(requests, claims, claims.leaders + claims.stale, fetch, results)
+            elif claims.stale:
+                self._refresh_many_in_background(requests, claims, fetch)
+            pending = []
+            for i, flight in claims.followers():
+                try:
+                    result = flight.result()
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    result = self._fallback_for(requests[i], exc)
+                    if result is None:
+                        raise exc
+                if result is _RETRY:
+                    pending.append(i)
+                else:
+                    results[i] = result
+        return [self._resolve(result) for result in results]
+
+    async def get_or_fetch_many_async(self, requests: list[CacheRequest], fetch) -> list:
+        """Async get_or_fetch_many: fetch(indices) returns an awaitable.
+
+        Second-tier reads, stores, and fallbacks run on worker threads.
+        """
+        results: list = [None] * len(requests)
+        pending = range(len(requests))
+        while pending:
+            claims = self._claim_many(requests, pending, results)
+            if self._l2 is not None and claims.leaders:
+                try:
+                    await asyncio.to_thread(self._load_many_l2, requests, claims, results)
+                except BaseException:
+                    self._release_many(requests, claims, claims.leaders + claims.stale)
+                    raise
+            if claims.leaders:
+                indices = claims.leaders + claims.stale
+                await self._fetch_many_async(requests, claims, indices, fetch, results)
+            elif claims.stale:
+                task = asyncio.ensure_future(self._refresh_many_async(requests, claims, fetch))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            pending = []
+            for i, flight in claims.followers():
+                try:
+                    result = await asyncio.wrap_future(flight)
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    result = await asyncio.to_thread(self._fallback_for, requests[i], exc)
+                    if result is None:
+                        raise exc
+                if result is _RETRY:
+                    pending.append(i)
+                else:
+                    results[i] = result
+        return [await self._resolve_async(result) for result in results]
+
+    def _claim_many(self, requests, indices, results: list) -> _Claims:
+        """Join each request's flight, putting hits (stale ones included) into results.
+
+        If a request raises a remembered error, the flights already claimed are
+        released before it propagates.
+        """
+        claims = _Claims({}, [], [])
+        try:
+            for i in indices:
+                request = requests[i]
+                cached, flight, leader = self._join_flight(request.key, request.shape, request.api)
+                results[i] = cached
+                if flight is None:
+                    continue
+                claims.flights[i] = flight
+                if leader:
+                    (claims.leaders if cached is None else claims.stale).append(i)
+        except APIError:
+            self._release_many(requests, claims, claims.leaders + claims.stale)
+            raise
+        return claims
+
+    def _load_many_l2(self, requests, claims: _Claims, results: list) -> None:
+        """Answer the misses the second tier holds, so they are not fetched."""
+        if self._l2 is None:
+            return
+        for i in list(claims.leaders):
+            request = requests[i]
+            result = self._load_l2(request.key, request.shape) if request.store else None
+            if result is not None:
+                claims.leaders.remove(i)
+                results[i] = result
+                self._land_flight(request.key, claims.flights.pop(i), result=result)
+
+    def _fetch_many(self, requests, claims: _Claims, indices, fetch, results: list) -> None:
+        started = time.monotonic()
+        try:
+            fetched = fetch(indices)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self._failed_many(requests, claims, indices, exc, results)
+            return
+        except BaseException:
+            self._release_many(requests, claims, indices)
+            raise
+        finally:
+            self._record_many(requests, claims, indices, started)
+        self._fetched_many(requests, claims, indices, fetched, results)
+
+    async def _fetch_many_async(
+        self, requests, claims: _Claims, indices, fetch, results: list
+    ) -> None:
+        started = time.monotonic()
+        try:
+            fetched = await fetch(indices)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            await asyncio.to_thread(self._failed_many, requests, claims, indices, exc, results)
+            return
+        except BaseException:
+            self._release_many(requests, claims, indices)
+            raise
+        finally:
+            self._record_many(requests, claims, indices, started)
+        await asyncio.to_thread(self._fetched_many, requests, claims, indices, fetched, results)
+
+    def _record_many(self, requests, claims: _Claims, indices, started: float) -> None:
+        for i in indices:
+            self._record_fetch(requests[i].api, started, miss=i not in claims.stale)
+
+    def _fetched_many(self, requests, claims: _Claims, indices, fetched, results: list) -> None:
+        """Store the fetched results and hand them to the requests' followers."""
+        for i, result in zip(indices, fetched):
+            request = requests[i]
+            if request.store:
+                self.put(
+                    request.key,
+                    result,
+                    api=request.api,
+                    summary=request.summary,
+                    end_date=request.end_date,
+                    shape=request.shape,
+                )
+            self._land_flight(request.key, claims.flights[i], result=result)
+            results[i] = result
+
+    def _failed_many(self, requests, claims: _Claims, indices, exc, results: list) -> None:
+        """Hand a failed fetch's error to followers, then fall back for each miss or raise.
+
+        Stale results keep being served. The error is only remembered (negative_ttl)
+        when the call fetched a single request, since a batch error need not be due to
+        every request in it.
+        """
+        fallbacks = {}
+        for i in indices:
+            request = requests[i]
+            if i in claims.stale:
+                flight = claims.flights[i]
+                self._refresh_failed(request.key, flight, exc, request.api, request.summary)
+                continue
+            if len(indices) == 1:
+                self._remember_error(request.key, exc)
+            self._land_flight(request.key, claims.flights[i], exc=exc)
+            fallbacks[i] = self._fallback_for(request, exc)
+        if any(result is None for result in fallbacks.values()):
+            raise exc
+        for i, result in fallbacks.items():
+            results[i] = result
+
+    def _fallback_for(self, request: CacheRequest, exc: Exception):
+        if request.fallback is None:
+            return self._fallback(request.key, exc)
+        return request.fallback(exc) if _is_outage(exc) else None
+
+    def _release_many(self, requests, claims: _Claims, indices) -> None:
+        """Let another caller fetch whatever an interrupted call left unfinished."""
+        for i in indices:
+            if not claims.flights[i].done():
+                self._land_flight(requests[i].key, claims.flights[i], result=_RETRY)
+
+    def _refresh_many_in_background(self, requests, claims: _Claims, fetch) -> None:
+        try:
+            self._refresher().submit(self._refresh_many, requests, claims, fetch)
+        except CapacityError:
+            logger.info(
+                "Skipped background refresh of %d results: executor busy", len(claims.stale)
+            )
+            self._release_many(requests, claims, claims.stale)
+
+    def _refresh_many(self, requests, claims: _Claims, fetch) -> None:
+        set_priority(Priority.LOW)
+        self._refreshes += len(claims.stale)
+        try:
+            self._fetch_many(requests, claims, claims.stale, fetch, [None] * len(requests))
+        finally:
+            self._release_many(requests, claims, claims.stale)
+
+    async def _refresh_many_async(self, requests, claims: _Claims, fetch) -> None:
+        set_priority(Priority.LOW)
+        self._refreshes += len(claims.stale)
+        try:
+            await self._fetch_many_async(
+                requests, claims, claims.stale, fetch, [None] * len(requests)
+            )
+        finally:
+            self._release_many(requests, claims, claims.stale)
+
+    def _refresher(self) -> BlockingExecutor:
+        if self._executor is None:
+            self._executor = BlockingExecutor(max_workers=2, max_queue=32)
+        return self._executor
+
+    def _refresh_in_background(self, key, flight, fetch, api, summary, end_date, shape) -> None:
+        """Queue a stale entry's fetch on the executor, in a copy of the caller's context.
+
+        If the executor is full the refresh is skipped; a later stale hit retries it.
+        """
+        try:
+            self._refresher().submit(
+                self._refresh, key, flight, fetch, api, summary, end_date, shape
+            )
+        except CapacityError:
+            logger.info("Skipped background refresh of %s %s: executor busy", api, summary)
+            self._land_flight(key, flight, result=_RETRY)
+
+    def _refresh(self, key, flight, fetch, api, summary, end_date, shape) -> None:
+        set_priority(Priority.LOW)
+        self._refreshes += 1
+        started = time.monotonic()
+        try:
+            try:
+                result = fetch()
+            finally:
+                self._record_fetch(api, started, miss=False)
+            self.put(key, result, api=api, summary=summary, end_date=end_date, shape=shape)
+            self._land_flight(key, flight, result=result)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self._refresh_failed(key, flight, exc, api, summary)
+        finally:
+            if not flight.done():  # interrupted: let the next stale hit refresh again
+                self._land_flight(key, flight, result=_RETRY)
+
+    async def _refresh_async(self, key, flight, fetch, api, summary, end_date, shape) -> None:
+        set_priority(Priority.LOW)
+        self._refreshes += 1
+        started = time.monotonic()
+        try:
+            try:
+                result = await fetch()
+            finally:
+                self._record_fetch(api, started, miss=False)
+            await self._put_async(key, result, api, summary, end_date, shape)
+            self._land_flight(key, flight, result=result)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self._refresh_failed(key, flight, exc, api, summary)
+        finally:
+            if not flight.done():  # cancelled: let the next stale hit refresh again
+                self._land_flight(key, flight, result=_RETRY)
+
+    def _refresh_failed(self, key, flight, exc, api, summary) -> None:
+        """Keep serving the stale entry; callers arriving after its hard TTL see exc."""
+        self._refresh_failures += 1
+        logger.warning("Background refresh of %s %s failed: %s", api, summary, exc)
+        self._land_flight(key, flight, exc=exc)
+
+    def put(
+        self,
+        key: str,
+        result,
+        api: str = "",
+        summary: str = "",
+        end_date: str | None = None,
+        shape: Shape | None = None,
+    ) -> None:
+        """Store a result, evicting least recently used entries to stay within budget.
+
+        end_date is the last day the result covers, used by the TTL policy. shape
+        registers the result for containment reuse.
+        """
+        self._pack_entries(self._put(key, result, api, summary, end_date, shape))
+
+    async def _put_async(self, key, result, api, summary, end_date, shape) -> None:
+        """put() that compresses on a worker thread instead of the event loop."""
+        cold = self._put(key, result, api, summary, end_date, shape)
+        if cold:
+            await asyncio.to_thread(self._pack_entries, cold)
+
+    def _put(self, key, result, api, summary, end_date, shape) -> list[tuple[str, _Entry]]:
+        """Store locally and queue the L2 write; return entries for _pack_entries()."""
+        now = time.time()
+        record = CachedRecord(result, api, summary, now, now + self.ttl_for(api, end_date))
+        cold = self._store_local(key, record, shape)
+        if self._l2 is not None:
+            self._l2.put(key, record)
+        return cold
+
+    def ttl_for(self, api: str, end_date: str | None = None) -> int:
+        if self._policy is None:
+            return self._ttl
+        return self._policy.ttl_for(api, end_date)
+
+    def _store_local(
+        self, key: str, record: CachedRecord, shape: Shape | None = None
+    ) -> list[tuple[str, _Entry]]:
+        """Store record in memory; return large entries to compress (see _pack_entries)."""
+        size = measure_size(record.result)
+        if self._max_bytes and size > self._max_bytes:
+            logger.info(
+                "Not caching %s %s: %d bytes exceeds cache budget",
+                record.api,
+                record.summary,
+                size,
+            )
+            return []
+        entry = _Entry(
+            record.result,
+            record.api,
+            record.summary,
+            record.ts,
+            record.expires,
+            record.expires + self._stale_ttl,
+            record.expires + max(self._stale_ttl, self._fallback_ttl),
+            size,
+            shape,
+        )
+        cold = []
+        with self._lock:
+            self._errors.pop(key, None)
+            if key in self._store:
+                self._remove_locked(key)
+            self._store[key] = entry
+            self._bytes += size
+            stats = self._stats_locked(entry.api)
+            stats.entries += 1
+            stats.bytes += size
+            if shape is not None:
+                self._families.setdefault(shape.family, {})[key] = shape
+            if self._compress_threshold and size > self._compress_threshold:
+                cold = self._make_hot_locked(key)
+            heapq.heappush(self._expiry, (entry.keep_until, key))
+            heapq.heappush(self._freshness, (entry.expires, key))
+            self._evict_locked()
+            self._compact_expiry_locked()
+        return cold
+
+    def _evict_locked(self, keep: str | None = None) -> None:
+        """Drop least recently used entries, never keep, until within both budgets."""
+        while len(self._store) > self._max_entries or (
+            self._max_bytes and self._bytes > self._max_bytes
+        ):
+            victim = next((key for key in self._store if key != keep), None)
+            if victim is None:
+                return
+            evicted = self._remove_locked(victim)
+            self._evictions += 1
+            self._stats_locked(evicted.api).evictions += 1
+
+    def _compact_expiry_locked(self) -> None:
+        """Drop heap pairs left behind by replaced or evicted entries (amortised O(1))."""
+        if len(self._expiry) > 2 * len(self._store) + 64:
+            self._expiry = [(e.keep_until, k) for k, e in self._store.items()]
+            heapq.heapify(self._expiry)
+        if len(self._freshness) > 2 * len(self._store) + 64:
+            self._freshness = [(e.expires, k) for k, e in self._store.items() if not e.stale]
+            heapq.heapify(self._freshness)
+
+    def _count_stale_locked(self, now: float) -> None:
+        """Mark entries whose TTL has passed as stale, from the freshness heap."""
+        while self._freshness and self._freshness[0][0] < now:
+            expires, key = heapq.heappop(self._freshness)
+            entry = self._store.get(key)
+            if entry is not None and entry.expires == expires and not entry.stale:
+                entry.stale = True
+                self._stale_entries += 1
+
+    def sweep(self) -> int:
+        """Remove every entry no longer held (past its hard TTL and fallback window).
+
+        Returns the number removed.
+        """
+        now = time.time()
+        removed = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expires, key = heapq.heappop(self._expiry)
+                entry = self._store.get(key)
+                if entry is not None and entry.keep_until == expires:
+                    self._remove_locked(key)
+                    self._stats_locked(entry.api).expirations += 1
+                    removed += 1
+            self._compact_expiry_locked()
+            self._expirations += removed
+        return removed
+
+    def start_sweeper(self, interval: float = 60.0) -> None:
+        """Remove expired entries every interval seconds on a daemon thread."""
+        if self._sweeper is not None:
+            return
+
+        def run():
+            while not self._stop_sweeper.wait(interval):
+                removed = self.sweep()
+                if removed:
+                    logger.debug("Cache sweeper removed %d expired entries", removed)
+
+        self._stop_sweeper.clear()
+        self._sweeper = threading.Thread(target=run, name="anny-cache-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        if self._sweeper is not None:
+            self._stop_sweeper.set()
+            self._sweeper.join()
+            self._sweeper = None
 
     def clear(self) -> int:
         """Clear all entries. Returns the number of entries removed."""
         with self._lock:
             count = len(self._store)
             self._store.clear()
-            logger.info("Cache cleared: %d entries removed", count)
-            return count
+            self._errors.clear()
+            self._families.clear()
+            self._expiry.clear()
+            self._freshness.clear()
+            self._stale_entries = 0
+            self._hot.clear()
+            self._bytes = 0
+            self._packed_entries = self._packed_raw_bytes = self._packed_bytes = 0
+            for stats in self._api_stats.values():
+                stats.entries = 0
+                stats.bytes = 0
+        if self._l2 is not None:
+            self._l2.clear()
+        logger.info("Cache cleared: %d entries removed", count)
+        return count
+
+    def _compression_status_locked(self) -> dict:
+        packed = self._packed_bytes
+        return {
+            "threshold_bytes": self._compress_threshold,
+            "hot_entries": len(self._hot),
+            "max_hot_entries": self._hot_entries,
+            "compressed_entries": self._packed_entries,
+            "raw_bytes": self._packed_raw_bytes,
+            "compressed_bytes": packed,
+            "ratio": round(self._packed_raw_bytes / packed, 2) if packed else None,
+            "compressions": self._compressions,
+            "decompressions": self._decompressions,
+            "compress_seconds": round(self._compress_seconds, 4),
+            "decompress_seconds": round(self._decompress_seconds, 4),
+        }
+
+    def _totals_locked(self) -> dict:
+        hits = sum(stats.hits for stats in self._api_stats.values())
+        misses = sum(stats.misses for stats in self._api_stats.values())
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        }
 
     def status(self) -> dict:
         """Return cache status info."""
+        self.sweep()
+        now = time.time()
         with self._lock:
-            now = time.time()
-            active = sum(1 for e in self._store.values() if now - e["ts"] <= self._ttl)
-            return {
+            self._count_stale_locked(now)
+            stale = self._stale_entries
+            status = {
                 "total_entries": len(self._store),
-                "active_entries": active,
+                "active_entries": len(self._store) - stale,
+                "stale_entries": stale,
                 "max_entries": self._max_entries,
                 "ttl_seconds": self._ttl,
+                "stale_ttl_seconds": self._stale_ttl,
+                "total_bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "stale_served": self._stale_served,
+                "fallback_ttl_seconds": self._fallback_ttl,
+                "fallbacks": self._fallbacks,
+                "negative_ttl_seconds": self._negative_ttl,
+                "negative_entries": len(self._errors),
+                "background_refreshes": self._refreshes,
+                "refresh_failures": self._refresh_failures,
+                "contained_hits": self._contained_hits,
+                **self._totals_locked(),
+                "by_api": {
+                    api or "other": stats.as_dict()
+                    for api, stats in sorted(self._api_stats.items())
+                },
             }
+            if self._compress_threshold:
+                status["compression"] = self._compression_status_locked()
+        if self._policy is not None:
+            status["ttl_policy"] = self._policy.status()
+        if self._l2 is not None:
+            status["l2"] = self._l2.status()
+        return status
@@ -0,0 +1,400 @@
+import json
+import logging
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, NamedTuple
+from urllib.parse import unquote, urlsplit
+
+from anny.core.resultset import ResultSet, json_object_hook
+
+logger = logging.getLogger("anny")
+
+
+class CachedRecord(NamedTuple):
+    """A cached result plus the metadata needed to restore it into the in-memory tier."""
+
+    result: Any
+    api: str
+    summary: str
+    ts: float
+    expires: float
+
+
+class RedisReplyError(Exception):
+    """Redis answered a command with an error reply."""
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    api TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    value TEXT NOT NULL,
+    ts REAL NOT NULL,
+    expires REAL NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires);
+"""
+
+# Writer operations drained into one batch
+_WRITE_BATCH = 100
+
+
+class CacheBackend:
+    """Second-tier store behind QueryCache, shared across restarts or worker processes.
+
+    get() runs on the caller's thread. put() and clear() are queued and applied in
+    order by one background writer per backend, so a slow store never delays a
+    request; when the queue is full, writes are dropped rather than blocking.
+    Subclasses implement get(), _apply_batch(), and _status().
+    """
+
+    name = ""
+
+    def __init__(self, max_queue: int = 1000):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._dropped = 0
+        self._writer: threading.Thread | None = None
+        self._writer_lock = threading.Lock()
+
+    def get(self, key: str) -> CachedRecord | None:
+        """Return the stored record for key, or None if missing, expired, or unreadable."""
+        raise NotImplementedError
+
+    def put(self, key: str, record: CachedRecord) -> None:
+        """Queue a record to be written by the background writer."""
+        self._enqueue(("put", key, record))
+
+    def clear(self) -> None:
+        """Queue removal of every stored record (ordered after pending writes)."""
+        self._enqueue(("clear",), block=True)
+
+    def flush(self) -> None:
+        """Block until every queued write has been applied."""
+        self._queue.join()
+
+    def status(self) -> dict:
+        return {
+            "backend": self.name,
+            **self._status(),
+            "pending_writes": self._queue.qsize(),
+            "dropped_writes": self._dropped,
+        }
+
+    def _status(self) -> dict:
+        raise NotImplementedError
+
+    def _apply_batch(self, ops: list[tuple]) -> None:
+        """Apply queued ("put", key, record), ("touch", key, when), and ("clear",) ops."""
+        raise NotImplementedError
+
+    def _enqueue(self, op: tuple, block: bool = False) -> None:
+        self._ensure_writer()
+        try:
+            self._queue.put(op, block=block)
+        except queue.Full:
+            self._dropped += 1
+            logger.debug("Cache %s write queue full, dropping %s", self.name, op[0])
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name=f"anny-cache-{self.name}-writer", daemon=True
+                )
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            ops = [self._queue.get()]
+            while len(ops) < _WRITE_BATCH:
+                try:
+                    ops.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._apply_batch(ops)
+            except (OSError, sqlite3.Error, RedisReplyError, TypeError, ValueError) as exc:
+                logger.warning("Cache %s write failed: %s", self.name, exc)
+            finally:
+                for _ in ops:
+                    self._queue.task_done()
+
+
+def _default(obj):
+    return obj.to_json() if isinstance(obj, ResultSet) else str(obj)
+
+
+def _encode(result) -> str:
+    return json.dumps(result, default=_default, separators=(",", ":"))
+
+
+class SQLiteBackend(CacheBackend):
+    """SQLite file that persists cached results across restarts.
+
+    WAL mode lets every prefork worker on one host open the same file, so a result
+    fetched by one worker is a hit for the others. After each write batch the writer
+    removes expired rows and then least recently used rows until the stored values
+    fit in max_bytes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, max_queue: int = 1000):
+        super().__init__(max_queue)
+        self._path = os.path.expanduser(path)
+        self._max_bytes = max_bytes
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        os.chmod(self._path, 0o600)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> CachedRecord | None:
+        try:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT value, api, summary, ts, expires FROM entries WHERE key = ?", (key,)
+                )
+                .fetchone()
+            )
+        except sqlite3.Error as exc:
+            logger.warning("Cache file read failed: %s", exc)
+            return None
+        if row is None:
+            return None
+        value, api, summary, ts, expires = row
+        if expires <= time.time():
+            return None
+        try:
+            result = json.loads(value, object_hook=json_object_hook)
+        except (ValueError, KeyError, TypeError) as exc:
+            logger.warning("Unreadable cache file value for %s: %r", key, exc)
+            return None
+        self._enqueue(("touch", key, time.time()))
+        return CachedRecord(result, api, summary, ts, expires)
+
+    def _status(self) -> dict:
+        try:
+            count, size = (
+                self._connect()
+                .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+                .fetchone()
+            )
+        except sqlite3.Error as exc:
+            logger.warning("Cache file status failed: %s", exc)
+            count, size = None, None
+        return {"path": self._path, "entries": count, "bytes": size, "max_bytes": self._max_bytes}
+
+    def _apply_batch(self, ops: list[tuple]) -> None:
+        conn = self._connect()
+        with conn:
+            for op in ops:
+                self._apply(conn, op)
+            self._enforce_budget(conn)
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, op: tuple) -> None:
+        kind = op[0]
+        if kind == "put":
+            _, key, record = op
+            value = _encode(record.result)
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    record.api,
+                    record.summary,
+                    value,
+                    record.ts,
+                    record.expires,
+                    len(value),
+                    time.time(),
+                ),
+            )
+        elif kind == "touch":
+            _, key, when = op
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (when, key))
+        elif kind == "clear":
+            conn.execute("DELETE FROM entries")
+
+    def _enforce_budget(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        while total > self._max_bytes:
+            oldest = conn.execute(
+                "SELECT key, size FROM entries ORDER BY last_access LIMIT 50"
+            ).fetchall()
+            if not oldest:
+                break
+            for key, size in oldest:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                if total <= self._max_bytes:
+                    break
+
+
+class _RespConnection:
+    """Minimal blocking RESP2 client: enough for GET/SET/SCAN/DEL on one socket."""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._reader = self._sock.makefile("rb")
+
+    def command(self, *args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+        return self._read()
+
+    def _read(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Redis closed the connection")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RedisReplyError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            return None if length < 0 else self._reader.read(length + 2)[:-2]
+        if kind == b"*":
+            length = int(body)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise ConnectionError(f"Unexpected Redis reply: {line!r}")
+
+    def close(self) -> None:
+        self._reader.close()
+        self._sock.close()
+
+
+class RedisBackend(CacheBackend):  # pylint: disable=too-many-instance-attributes
+    """Redis (or any RESP-speaking server) shared by every worker and host.
+
+    Entries are stored under key_prefix with a PX expiry matching the in-memory
+    entry, so Redis drops them itself; its maxmemory policy bounds the total size.
+    Each thread keeps one connection and reconnects after any error.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        key_prefix: str = "anny:cache:",
+        timeout: float = 1.0,
+        max_queue: int = 1000,
+    ):
+        super().__init__(max_queue)
+        parts = urlsplit(url)
+        if parts.scheme != "redis":
+            raise ValueError(f"Unsupported cache URL scheme: {parts.scheme!r}")
+        self._host = parts.hostname or "localhost"
+        self._port = parts.port or 6379
+        self._username = unquote(parts.username) if parts.username else None
+        self._password = unquote(parts.password) if parts.password else None
+        self._db = int(parts.path.lstrip("/") or 0)
+        self._prefix = key_prefix
+        self._timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def url(self) -> str:
+        """Connection URL with any credentials removed."""
+        return f"redis://{self._host}:{self._port}/{self._db}"
+
+    def _command(self, *args):
+        conn = getattr(self._local, "conn", None)
+        try:
+            if conn is None:
+                conn = _RespConnection(self._host, self._port, self._timeout)
+                self._local.conn = conn
+                if self._password:
+                    auth = (self._username, self._password) if self._username else (self._password,)
+                    conn.command("AUTH", *auth)
+                if self._db:
+                    conn.command("SELECT", self._db)
+            return conn.command(*args)
+        except (OSError, RedisReplyError):
+            if conn is not None:
+                conn.close()
+            self._local.conn = None
+            raise
+
+    def get(self, key: str) -> CachedRecord | None:
+        try:
+            value = self._command("GET", self._prefix + key)
+        except (OSError, RedisReplyError) as exc:
+            logger.warning("Redis cache read failed: %s", exc)
+            return None
+        if value is None:
+            return None
+        try:
+            data = json.loads(value, object_hook=json_object_hook)
+            if data["expires"] <= time.time():
+                return None
+            return CachedRecord(
+                data["result"], data["api"], data["summary"], data["ts"], data["expires"]
+            )
+        except (ValueError, KeyError, TypeError) as exc:
+            logger.warning("Unreadable Redis cache value for %s: %r", key, exc)
+            return None
+
+    def _status(self) -> dict:
+        try:
+            connected = self._command("PING") == "PONG"
+        except (OSError, RedisReplyError) as exc:
+            logger.warning("Redis cache status failed: %s", exc)
+            connected = False
+        return {"url": self.url, "key_prefix": self._prefix, "connected": connected}
+
+    def _apply_batch(self, ops: list[tuple]) -> None:
+        for op in ops:
+            if op[0] == "put":
+                _, key, record = op
+                ttl_ms = int((record.expires - time.time()) * 1000)
+                if ttl_ms <= 0:
+                    continue
+                value = _encode(record._asdict())
+                self._command("SET", self._prefix + key, value, "PX", ttl_ms)
+            elif op[0] == "clear":
+                self._delete_prefix()
+
+    def _delete_prefix(self) -> None:
+        cursor = "0"
+        while True:
+            cursor, keys = self._command("SCAN", cursor, "MATCH", self._prefix + "*", "COUNT", 500)
+            if keys:
+                self._command("DEL", *keys)
+            if cursor in (b"0", "0"):
+                break
@@ -0,0 +1,46 @@
+from datetime import date, datetime, timezone
+from typing import NamedTuple
+
+
+class FreshnessRule(NamedTuple):
+    fresh_ttl: int
+    settled_ttl: int
+    settle_days: int
+
+
+class TTLPolicy:
+    """Chooses how long a cached result may be served from its API and end date.
+
+    Google keeps revising recent days: GA4 finishes processing a day within about
+    48 hours, and Search Console reports with a lag of two to three days, so its
+    latest days keep filling in. A result whose end date is at least settle_days
+    before today (UTC, as in parse_date_range) will not change again and gets
+    settled_ttl. Anything more recent, including today and yesterday, gets fresh_ttl,
+    as do results with no date range (Tag Manager). APIs without a rule use
+    default_ttl.
+    """
+
+    def __init__(self, rules: dict[str, FreshnessRule], default_ttl: int = 3600):
+        self._rules = rules
+        self._default_ttl = default_ttl
+
+    def ttl_for(self, api: str, end_date: str | None = None, today: date | None = None) -> int:
+        rule = self._rules.get(api)
+        if rule is None:
+            return self._default_ttl
+        if not end_date:
+            return rule.fresh_ttl
+        try:
+            end = date.fromisoformat(end_date)
+        except ValueError:
+            return rule.fresh_ttl
+        today = today or datetime.now(timezone.utc).date()
+        if (today - end).days >= rule.settle_days:
+            return rule.settled_ttl
+        return rule.fresh_ttl
+
+    def status(self) -> dict:
+        return {
+            "default_ttl": self._default_ttl,
+            **{api: rule._asdict() for api, rule in self._rules.items()},
+        }
@@ -0,0 +1,49 @@
+from typing import NamedTuple
+
+from anny.core.resultset import ResultSet
+
+
+class Shape(NamedTuple):
+    """Where a result sits among cached results of the same query, for containment reuse.
+
+    family identifies the query without its row limit and metric list. columns are the
+    metric columns the result can be projected to (empty when not selectable), and
+    ordered means rows come back in an explicit, deterministic order.
+    """
+
+    family: str
+    limit: int
+    columns: tuple[str, ...] = ()
+    ordered: bool = False
+
+
+def covers(cached: Shape, rows: int, wanted: Shape) -> bool:
+    """Whether a cached result with this shape and row count answers the wanted query.
+
+    A complete result (fewer rows than its limit) holds every row, so any limit and
+    any metric subset can be read from it. A truncated one is only a prefix of the
+    full answer when its rows are ordered, and then only up to its own limit.
+    Dimension subsets are never derived: non-additive metrics such as totalUsers
+    cannot be re-aggregated.
+    """
+    if not set(wanted.columns) <= set(cached.columns):
+        return False
+    if rows < cached.limit:
+        return True
+    return cached.ordered and cached.limit >= wanted.limit
+
+
+def project(rows: list[dict], cached: Shape, wanted: Shape) -> list[dict]:
+    rows = rows[: wanted.limit]
+    if wanted.columns == cached.columns:
+        return rows
+    dropped = set(cached.columns)
+    if isinstance(rows, ResultSet):
+        return rows.project([c for c in rows.columns if c not in dropped] + list(wanted.columns))
+    return [
+        {
+            **{k: v for k, v in row.items() if k not in dropped},
+            **{c: row[c] for c in wanted.columns},
+        }
+        for row in rows
+    ]
@@ -0,0 +1,60 @@
+import contextvars
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from anny.core.constants import FAN_OUT_MAX_CONCURRENCY
+from anny.core.exceptions import AnnyError, APIError
+
+logger = logging.getLogger("anny")
+
+T = TypeVar("T")
+
+
+def fan_out(
+    calls: dict[str, Callable[[], T]],
+    max_concurrency: int = FAN_OUT_MAX_CONCURRENCY,
+    service: str = "",
+) -> dict[str, T]:
+    """Run independent blocking calls concurrently and return their results by name.
+
+    At most max_concurrency calls run at once, and every call runs to completion.
+    A single failure is re-raised as-is; several failures are aggregated into one
+    APIError naming each failed call.
+    """
+    if not calls:
+        return {}
+
+    workers = max(1, min(max_concurrency, len(calls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="anny-fanout") as pool:
+        futures = {
+            name: pool.submit(contextvars.copy_context().run, fn) for name, fn in calls.items()
+        }
+
+    results: dict[str, T] = {}
+    failures: dict[str, BaseException] = {}
+    for name, future in futures.items():
+        exc = future.exception()
+        if exc is None:
+            results[name] = future.result()
+        else:
+            failures[name] = exc
+
+    if failures:
+        raise_failures(failures, len(calls), service)
+    return results
+
+
+def raise_failures(failures: dict[str, BaseException], total: int, service: str = "") -> None:
+    """Re-raise a single failure as-is, or aggregate several into one APIError."""
+    first = next(iter(failures.values()))
+    if len(failures) == 1:
+        raise first
+
+    details = "; ".join(
+        f"{name}: {exc.message if isinstance(exc, AnnyError) else exc}"
+        for name, exc in failures.items()
+    )
+    logger.warning("%d of %d calls failed: %s", len(failures), total, details)
+    raise APIError(f"{len(failures)} of {total} calls failed ({details})", service) from first
@@ -53,8 +53,56 @@ class Settings(BaseSettings):
     rate_limit_window: int = 60
     cache_ttl: int = 3600
     cache_max_entries: int = 500
+    cache_max_bytes: int = 128 * 1024 * 1024
+    cache_sweep_interval: int = 60
+    cache_stale_ttl: int = 3600
+    cache_compress_threshold: int = 64 * 1024  # 0 = never compress
+    cache_hot_entries: int = 32
+    cache_negative_ttl: int = 60  # 0 = never cache errors
+    cache_fallback_ttl: int = 24 * 3600  # 0 = no fallback past the stale TTL
+    cache_realtime_ttl: int = 10  # clamped to 5-30
+    cache_realtime_max_entries: int = 64
+    cache_l2_backend: str = ""  # "", "sqlite", or "redis"
+    cache_l2_path: str = "~/.anny/query-cache.sqlite3"
+    cache_l2_redis_url: str = "redis://localhost:6379/0"
+    cache_l2_max_bytes: int = 256 * 1024 * 1024
     memory_store_path: str = "~/.anny/memory.json"
 
+    # Executor (blocking Google client calls)
+    executor_max_workers: int = 8
+    executor_max_queue: int = 64
+
+    # Outbound Google API quota scheduling
+    quota_ga4_max_concurrent: int = 10
+    quota_search_console_max_concurrent: int = 10
+    quota_search_console_qpm: int = 1200
+    quota_tag_manager_max_concurrent: int = 4
+    quota_low_priority_reserve: float = 0.25
+    quota_normal_priority_reserve: float = 0.05
+    quota_max_wait: float = 10.0
+    quota_breaker_threshold: int = 5
+    quota_breaker_reset: float = 30.0
+
+    # Freshness-aware cache TTLs (seconds; settle_days = age at which a day stops changing)
+    freshness_ga4_fresh_ttl: int = 900
+    freshness_ga4_settled_ttl: int = 7 * 24 * 3600
+    freshness_ga4_settle_days: int = 3
+    freshness_search_console_fresh_ttl: int = 3600
+    freshness_search_console_settled_ttl: int = 7 * 24 * 3600
+    freshness_search_console_settle_days: int = 4
+    freshness_tag_manager_ttl: int = 600
+
+    # Background cache warm-up (seconds unless noted)
+    prefetch_enabled: bool = True
+    prefetch_date_range: str = "last_28_days"
+    prefetch_limit: int = 10
+    prefetch_watchlist_limit: int = 100
+    prefetch_interval: float = 300
+    prefetch_jitter: float = 30
+    prefetch_lead: float = 600
+    prefetch_spacing: float = 2
+    prefetch_rollover_delay: float = 120
+
     # Google
     ga4_property_id: str = ""
     search_console_site_url: str = ""
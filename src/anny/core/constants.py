@@ -3,6 +3,39 @@
 MAX_LIMIT = 100
 MAX_ROW_LIMIT = 1000
 
+# Concurrent Google calls a single service function may fan out to
+FAN_OUT_MAX_CONCURRENCY = 4
+
+# GA4 batchRunReports accepts at most this many reports per call
+GA4_MAX_BATCH_REPORTS = 5
+
+# Largest GA4 runReport page (the API's maximum limit)
+GA4_MAX_PAGE_ROWS = 250000
+
+# Bounds for the realtime report cache TTL (seconds)
+REALTIME_TTL_MIN = 5
+REALTIME_TTL_MAX = 30
+
+# Discovery requests packed into one multipart batch call (Google allows up to 1000)
+DISCOVERY_BATCH_MAX_REQUESTS = 100
+
+# Longest date range cached as per-day partitions; longer ranges are cached whole
+MAX_PARTITION_DAYS = 400
+
+# Search Console returns at most this many rows per searchanalytics.query page
+SEARCH_CONSOLE_MAX_PAGE_ROWS = 25000
+
+# All-rows Search Console reads request pages after the first this many per batch call
+SEARCH_CONSOLE_PAGES_PER_BATCH = 4
+
+# Streaming exports flush encoded output in chunks of about this many bytes
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Version of the cached result format, part of every cache key; bump it when the
+# rows stored for a query change so entries written by older code (including those
+# kept in an L2 backend) are never served. 2: GA4 metrics decoded as numbers
+CACHE_SCHEMA_VERSION = 2
+
 # Memory service input length limits
 MAX_TEXT_LENGTH = 5000
 MAX_NAME_LENGTH = 100
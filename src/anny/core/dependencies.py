@@ -2,19 +2,29 @@ import functools
 import hmac
 import logging
 
+import google_auth_httplib2
+import httplib2
 from fastapi import Security
 from fastapi.security import APIKeyHeader
-from google.analytics.data_v1beta import BetaAnalyticsDataClient
+from google.analytics.data_v1beta import BetaAnalyticsDataAsyncClient, BetaAnalyticsDataClient
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
 
-from anny.clients.ga4 import GA4Client
+from anny.clients.ga4 import AsyncGA4Client, GA4Client
 from anny.clients.memory import MemoryStore
 from anny.clients.search_console import SearchConsoleClient
 from anny.clients.tag_manager import TagManagerClient
 from anny.core.auth import get_google_credentials
 from anny.core.cache import QueryCache
+from anny.core.cache_backends import CacheBackend, RedisBackend, SQLiteBackend
+from anny.core.cache_policy import FreshnessRule, TTLPolicy
 from anny.core.config import settings
+from anny.core.constants import REALTIME_TTL_MAX, REALTIME_TTL_MIN
 from anny.core.exceptions import AuthError
+from anny.core.executor import BlockingExecutor
+from anny.core.prefetch import PrefetchJob, Prefetcher
+from anny.core.quota import QuotaScheduler
+from anny.core.services import prefetch_service
 
 logger = logging.getLogger("anny")
 
@@ -48,28 +58,52 @@ def get_credentials():
     return get_google_credentials(settings.google_service_account_key_path)
 
 
+def _build_discovery_service(api: str, version: str, creds):
+    """Build a discovery client that gives every request its own httplib2.Http.
+
+    httplib2.Http is not thread-safe, and clients are shared by the executor's threads.
+    """
+
+    def request_builder(_http, *args, **kwargs):
+        http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+        return HttpRequest(http, *args, **kwargs)
+
+    http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+    return build(api, version, http=http, requestBuilder=request_builder)
+
+
 @functools.lru_cache
 def get_ga4_client() -> GA4Client:
     creds = get_credentials()
     client = BetaAnalyticsDataClient(credentials=creds)
     logger.info("Created GA4 client for property %s", settings.ga4_property_id)
-    return GA4Client(client, settings.ga4_property_id)
+    return GA4Client(client, settings.ga4_property_id, scheduler=get_quota_scheduler())
+
+
+@functools.lru_cache
+def get_async_ga4_client() -> AsyncGA4Client:
+    creds = get_credentials()
+    client = BetaAnalyticsDataAsyncClient(credentials=creds)
+    logger.info("Created async GA4 client for property %s", settings.ga4_property_id)
+    return AsyncGA4Client(client, settings.ga4_property_id, scheduler=get_quota_scheduler())
 
 
 @functools.lru_cache
 def get_search_console_client() -> SearchConsoleClient:
     creds = get_credentials()
-    service = build("searchconsole", "v1", credentials=creds)
+    service = _build_discovery_service("searchconsole", "v1", creds)
     logger.info("Created Search Console client for %s", settings.search_console_site_url)
-    return SearchConsoleClient(service, settings.search_console_site_url)
+    return SearchConsoleClient(
+        service, settings.search_console_site_url, scheduler=get_quota_scheduler()
+    )
 
 
 @functools.lru_cache
 def get_tag_manager_client() -> TagManagerClient:
     creds = get_credentials()
-    service = build("tagmanager", "v2", credentials=creds)
+    service = _build_discovery_service("tagmanager", "v2", creds)
     logger.info("Created Tag Manager client")
-    return TagManagerClient(service)
+    return TagManagerClient(service, scheduler=get_quota_scheduler())
 
 
 @functools.lru_cache
@@ -78,9 +112,128 @@ def get_memory_store() -> MemoryStore:
     return MemoryStore(settings.memory_store_path)
 
 
+def _make_cache_backend() -> CacheBackend | None:
+    """Build the configured second cache tier shared by all uvicorn workers, if any."""
+    kind = settings.cache_l2_backend
+    if kind == "sqlite":
+        logger.info("Query cache second tier: SQLite at %s", settings.cache_l2_path)
+        return SQLiteBackend(settings.cache_l2_path, max_bytes=settings.cache_l2_max_bytes)
+    if kind == "redis":
+        backend = RedisBackend(settings.cache_l2_redis_url)
+        logger.info("Query cache second tier: Redis at %s", backend.url)
+        return backend
+    if kind:
+        logger.warning("Unknown cache_l2_backend %r, running without a second tier", kind)
+    return None
+
+
+def _make_ttl_policy() -> TTLPolicy:
+    return TTLPolicy(
+        {
+            "ga4": FreshnessRule(
+                settings.freshness_ga4_fresh_ttl,
+                settings.freshness_ga4_settled_ttl,
+                settings.freshness_ga4_settle_days,
+            ),
+            "search_console": FreshnessRule(
+                settings.freshness_search_console_fresh_ttl,
+                settings.freshness_search_console_settled_ttl,
+                settings.freshness_search_console_settle_days,
+            ),
+            "tag_manager": FreshnessRule(
+                settings.freshness_tag_manager_ttl, settings.freshness_tag_manager_ttl, 0
+            ),
+        },
+        default_ttl=settings.cache_ttl,
+    )
+
+
 @functools.lru_cache
 def get_query_cache() -> QueryCache:
     logger.info(
-        "Created query cache (TTL=%ds, max=%d)", settings.cache_ttl, settings.cache_max_entries
+        "Created query cache (TTL=%ds, max=%d entries, %d bytes)",
+        settings.cache_ttl,
+        settings.cache_max_entries,
+        settings.cache_max_bytes,
+    )
+    l2 = _make_cache_backend()
+    cache = QueryCache(
+        ttl=settings.cache_ttl,
+        max_entries=settings.cache_max_entries,
+        max_bytes=settings.cache_max_bytes,
+        l2=l2,
+        policy=_make_ttl_policy(),
+        stale_ttl=settings.cache_stale_ttl,
+        compress_threshold=settings.cache_compress_threshold,
+        hot_entries=settings.cache_hot_entries,
+        negative_ttl=settings.cache_negative_ttl,
+        fallback_ttl=settings.cache_fallback_ttl,
+        executor=get_blocking_executor(),
+    )
+    if settings.cache_sweep_interval > 0:
+        cache.start_sweeper(settings.cache_sweep_interval)
+    return cache
+
+
+@functools.lru_cache
+def get_realtime_cache() -> QueryCache:
+    """Short-TTL cache for GA4 realtime snapshots, so concurrent pollers share one call."""
+    ttl = max(REALTIME_TTL_MIN, min(settings.cache_realtime_ttl, REALTIME_TTL_MAX))
+    logger.info("Created realtime cache (TTL=%ds)", ttl)
+    return QueryCache(ttl=ttl, max_entries=settings.cache_realtime_max_entries)
+
+
+@functools.lru_cache
+def get_blocking_executor() -> BlockingExecutor:
+    logger.info(
+        "Created blocking executor (workers=%d, queue=%d)",
+        settings.executor_max_workers,
+        settings.executor_max_queue,
+    )
+    return BlockingExecutor(
+        max_workers=settings.executor_max_workers, max_queue=settings.executor_max_queue
+    )
+
+
+@functools.lru_cache
+def get_quota_scheduler() -> QuotaScheduler:
+    logger.info("Created quota scheduler (GA4 concurrency=%d)", settings.quota_ga4_max_concurrent)
+    return QuotaScheduler(
+        limits={
+            "ga4": settings.quota_ga4_max_concurrent,
+            "search_console": settings.quota_search_console_max_concurrent,
+            "tag_manager": settings.quota_tag_manager_max_concurrent,
+        },
+        search_console_qpm=settings.quota_search_console_qpm,
+        low_priority_reserve=settings.quota_low_priority_reserve,
+        normal_priority_reserve=settings.quota_normal_priority_reserve,
+        max_wait=settings.quota_max_wait,
+        breaker_threshold=settings.quota_breaker_threshold,
+        breaker_reset=settings.quota_breaker_reset,
+    )
+
+
+def _prefetch_jobs() -> list[PrefetchJob]:
+    """Canonical queries for every API that is configured."""
+    return prefetch_service.canonical_jobs(
+        get_query_cache(),
+        get_ga4_client() if settings.ga4_property_id else None,
+        get_search_console_client() if settings.search_console_site_url else None,
+        get_memory_store(),
+        date_range=settings.prefetch_date_range,
+        limit=settings.prefetch_limit,
+        watchlist_limit=settings.prefetch_watchlist_limit,
+    )
+
+
+@functools.lru_cache
+def get_prefetcher() -> Prefetcher:
+    logger.info("Created cache prefetcher (interval=%ds)", settings.prefetch_interval)
+    return Prefetcher(
+        _prefetch_jobs,
+        interval=settings.prefetch_interval,
+        jitter=settings.prefetch_jitter,
+        lead=settings.prefetch_lead,
+        spacing=settings.prefetch_spacing,
+        rollover_delay=settings.prefetch_rollover_delay,
     )
-    return QueryCache(ttl=settings.cache_ttl, max_entries=settings.cache_max_entries)
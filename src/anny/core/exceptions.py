@@ -26,3 +26,19 @@ class APIError(AnnyError):
     def __init__(self, message: str = "API call failed", service: str = ""):
         self.service = service
         super().__init__(message)
+
+
+class CapacityError(AnnyError):
+    """Raised when Anny sheds work because it is at capacity (queues full, quota exhausted)."""
+
+    def __init__(self, message: str = "Server is busy"):
+        super().__init__(message)
+
+
+class CircuitOpenError(CapacityError):
+    """Raised without calling Google while a service's circuit breaker is open."""
+
+    def __init__(self, service: str, retry_after: float = 0.0):
+        self.service = service
+        self.retry_after = retry_after
+        super().__init__(f"{service} is failing, try again in {retry_after:.0f}s")
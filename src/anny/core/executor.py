@@ -0,0 +1,95 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from anny.core.exceptions import CapacityError
+
+logger = logging.getLogger("anny")
+
+
+class BlockingExecutor:  # pylint: disable=too-many-instance-attributes
+    """Bounded thread pool that runs blocking Google client calls off the event loop."""
+
+    def __init__(self, max_workers: int = 8, max_queue: int = 64):
+        self._max_workers = max_workers
+        self._max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="anny-io")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._started = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def run(self, fn, /, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the pool and await the result.
+
+        The caller's context variables (request ID, etc.) are visible inside fn.
+        Raises CapacityError when the number of queued calls reaches max_queue.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs) on the pool and return its Future without waiting.
+
+        Same context and queue limit as run(), for callers that are not async.
+        """
+        with self._lock:
+            if self._queued >= self._max_queue:
+                self._rejected += 1
+                logger.warning("Executor queue full (%d queued), rejecting call", self._queued)
+                raise CapacityError("Server is busy, try again shortly")
+            self._queued += 1
+
+        ctx = contextvars.copy_context()
+        submitted = time.monotonic()
+
+        def call():
+            wait = time.monotonic() - submitted
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self._started += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            try:
+                return ctx.run(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+
+        future = self._pool.submit(call)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        # A future can only be cancelled before it starts, so it is still counted as queued
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def status(self) -> dict:
+        """Return queue depth, worker usage, and wait-time metrics."""
+        with self._lock:
+            return {
+                "max_workers": self._max_workers,
+                "max_queue": self._max_queue,
+                "queue_depth": self._queued,
+                "active": self._active,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_seconds_avg": (
+                    round(self._wait_total / self._started, 4) if self._started else 0.0
+                ),
+                "wait_seconds_max": round(self._wait_max, 4),
+            }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and release worker threads once queued calls finish."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,10 +1,28 @@
+from anny.core.resultset import ResultSet
+
+
+def _format_columns(rows: ResultSet, columns: list[str]) -> str:
+    """format_table for a ResultSet: widths and lines come straight from the columns."""
+    columns = [col for col in columns if col in rows.columns]
+    widths = [max(len(col), rows.width(col)) for col in columns]
+    lines = [
+        " | ".join(col.ljust(width) for col, width in zip(columns, widths)),
+        "-+-".join("-" * width for width in widths),
+    ]
+    for values in rows.project(columns).iter_tuples():
+        lines.append(" | ".join(str(v).ljust(width) for v, width in zip(values, widths)))
+    return "\n".join(lines)
+
+
 def format_table(rows: list[dict], columns: list[str] | None = None) -> str:
-    """Format a list of dicts as a readable text table for MCP output."""
+    """Format a list of dicts (or a ResultSet) as a readable text table for MCP output."""
     if not rows:
         return "No data available."
 
     if columns is None:
-        columns = list(rows[0].keys())
+        columns = list(rows.columns) if isinstance(rows, ResultSet) else list(rows[0].keys())
+    if isinstance(rows, ResultSet):
+        return _format_columns(rows, columns)
 
     col_widths = {col: len(col) for col in columns}
     for row in rows:
@@ -0,0 +1,150 @@
+import asyncio
+from collections.abc import Callable
+from datetime import date, timedelta
+
+from anny.core.cache import CacheRequest, QueryCache
+from anny.core.constants import MAX_PARTITION_DAYS
+from anny.core.resultset import ResultSet
+
+
+def iter_days(start_date: str, end_date: str) -> list[str]:
+    """Every YYYY-MM-DD day from start_date to end_date inclusive."""
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    return [(start + timedelta(days=n)).isoformat() for n in range((end - start).days + 1)]
+
+
+def partitionable(start_date: str, end_date: str) -> bool:
+    """Whether a date range is short enough to cache as per-day partitions.
+
+    Longer ranges are cached as one entry, so a multi-year report cannot flood the LRU
+    with day entries.
+    """
+    days = (date.fromisoformat(end_date) - date.fromisoformat(start_date)).days + 1
+    return 0 < days <= MAX_PARTITION_DAYS
+
+
+class DayPartitions:
+    """Per-day cache partitions of a report whose only dimension is the date.
+
+    Each day's rows are cached under their own key with the TTL policy applied to
+    that day, so settled days stay cached while recent ones expire quickly. Only the
+    span from the first to the last missing day is fetched; rows are reassembled in
+    date order as one ResultSet.
+
+    The span is fetched under a key of its own (see request()), so concurrent
+    identical requests share one Google call. Only the days are cached, not the span.
+    When Google is unavailable, the missing days fall back to their last known good
+    results if every one of them has one.
+    """
+
+    def __init__(
+        self,
+        cache: QueryCache,
+        name: str,
+        params: dict,
+        start_date: str,
+        end_date: str,
+        api: str = "",
+    ):
+        self._cache = cache
+        self._api = api
+        self._name = name
+        self._params = params
+        self._keys = {
+            day: cache.make_key(name, {**params, "day": day})
+            for day in iter_days(start_date, end_date)
+        }
+        # Misses are counted once, by the span fetch, not once per day
+        self._parts = {day: cache.get(key, api=api, miss=False) for day, key in self._keys.items()}
+        missing = [day for day, rows in self._parts.items() if rows is None]
+        self.span = (missing[0], missing[-1]) if missing else None
+
+    @property
+    def span_days(self) -> int:
+        """Number of days in the span to fetch (0 when every day is cached)."""
+        return len(iter_days(*self.span)) if self.span else 0
+
+    def _split(self, rows, day_of) -> dict[str, ResultSet]:
+        """Rows of each day of the span by day_of(row), empty days included."""
+        rows = ResultSet.from_rows(rows)
+        by_day: dict[str, list[int]] = {day: [] for day in iter_days(*self.span)}
+        for index, row in enumerate(rows):
+            day = day_of(row)
+            if day in by_day:
+                by_day[day].append(index)
+        return {day: rows.take(indices) for day, indices in by_day.items()}
+
+    def _span_key(self) -> str:
+        return self._cache.make_key(self._name, {**self._params, "span": list(self.span)})
+
+    def _fallback_rows(self, exc: Exception):
+        """The span's rows from last known good days, or None if a missing day has none."""
+        days = []
+        for day in iter_days(*self.span):
+            rows = self._parts[day]
+            if rows is None:
+                rows = self._cache.fallback(self._keys[day], exc)
+                if rows is None:
+                    return None
+            days.append(rows)
+        return ResultSet.concat(days)
+
+    def request(self, summary: str) -> CacheRequest:
+        """The missing span as a get_or_fetch_many request.
+
+        The span is shared with concurrent callers but not cached itself: whoever
+        fetches it calls store(). When Google is unavailable, it falls back to the
+        missing days' last known good results if every one of them has one.
+        """
+        start, end = self.span
+        return CacheRequest(
+            self._span_key(),
+            api=self._api,
+            summary=f"{summary} {start}..{end}",
+            end_date=end,
+            store=False,
+            fallback=self._fallback_rows,
+        )
+
+    def store(self, rows, day_of, summary: str) -> None:
+        """Cache each day of the span's fetched rows by day_of(row), empty days included."""
+        for day, day_rows in self._split(rows, day_of).items():
+            self._cache.put(
+                self._keys[day], day_rows, api=self._api, summary=f"{summary} {day}", end_date=day
+            )
+
+    def fill(self, rows, day_of) -> None:
+        """Take the span's rows, as returned for request(), as the missing days."""
+        self._parts.update(self._split(rows, day_of))
+        self.span = None
+
+    def fetch(self, fetch_span: Callable, day_of, summary: str) -> None:
+        """Fill the span with fetch_span(start_date, end_date, days) through the cache.
+
+        The caller that actually calls Google caches each day of the result; callers
+        fetching the same span meanwhile share its rows.
+        """
+        span, days = self.span, self.span_days
+
+        def fetch(_):
+            rows = fetch_span(*span, days)
+            self.store(rows, day_of, summary)
+            return [rows]
+
+        (rows,) = self._cache.get_or_fetch_many([self.request(summary)], fetch)
+        self.fill(rows, day_of)
+
+    async def fetch_async(self, fetch_span: Callable, day_of, summary: str) -> None:
+        """Async fetch(): fetch_span returns an awaitable."""
+        span, days = self.span, self.span_days
+
+        async def fetch(_):
+            rows = await fetch_span(*span, days)
+            await asyncio.to_thread(self.store, rows, day_of, summary)
+            return [rows]
+
+        (rows,) = await self._cache.get_or_fetch_many_async([self.request(summary)], fetch)
+        await asyncio.to_thread(self.fill, rows, day_of)
+
+    def rows(self) -> ResultSet:
+        return ResultSet.concat(self._parts[day] for day in self._keys)
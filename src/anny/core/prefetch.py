@@ -0,0 +1,137 @@
+"""Background cache warm-up for the queries users run first."""
+
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from anny.core.cache import set_refresh_lead
+from anny.core.exceptions import CapacityError
+from anny.core.quota import Priority, set_priority
+
+logger = logging.getLogger("anny")
+
+# (name, call) pairs; each call runs one cached service query
+PrefetchJob = tuple[str, Callable[[], object]]
+
+
+class Prefetcher:  # pylint: disable=too-many-instance-attributes
+    """Re-runs a list of cached queries on a background thread to keep them warm.
+
+    jobs() is called at the start of every pass, so named date ranges and the
+    watchlist are resolved afresh. Jobs run at Priority.LOW, spaced by up to spacing
+    seconds, with a refresh lead: a cached entry expiring within lead seconds is
+    fetched again, anything fresher is a cache hit and costs nothing. A pass stops at
+    the first CapacityError, leaving the remaining quota to interactive requests.
+
+    Passes run every interval seconds plus up to jitter seconds, and also
+    rollover_delay seconds after each UTC midnight, when named date ranges move to
+    new dates (and new cache keys).
+    """
+
+    def __init__(
+        self,
+        jobs: Callable[[], list[PrefetchJob]],
+        interval: float = 300,
+        jitter: float = 30,
+        lead: float = 600,
+        spacing: float = 2,
+        rollover_delay: float = 120,
+        initial_delay: float = 30,
+    ):
+        self._jobs = jobs
+        self._interval = interval
+        self._jitter = jitter
+        self._lead = lead
+        self._spacing = spacing
+        self._rollover_delay = rollover_delay
+        self._initial_delay = initial_delay
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._passes = 0
+        self._jobs_run = 0
+        self._failures = 0
+        self._shed = 0
+        self._last_pass: float | None = None
+        self._next_pass: float | None = None
+
+    def next_delay(self, now: datetime | None = None) -> float:
+        """Seconds until the next pass: the interval or the next rollover, plus jitter."""
+        now = now or datetime.now(timezone.utc)
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        until_rollover = (midnight - now).total_seconds() + self._rollover_delay
+        return min(self._interval, until_rollover) + random.uniform(0, self._jitter)
+
+    def run_pass(self) -> int:
+        """Run every job once in the calling thread; return how many completed."""
+        return contextvars.copy_context().run(self._run_pass)
+
+    def _run_pass(self) -> int:
+        set_priority(Priority.LOW)
+        set_refresh_lead(self._lead)
+        completed = 0
+        try:
+            jobs = self._jobs()
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            jobs = []
+            self._failures += 1
+            logger.warning("Prefetch jobs unavailable: %s", exc)
+        for index, (name, call) in enumerate(jobs):
+            if index and self._stop.wait(random.uniform(0, self._spacing)):
+                break
+            try:
+                call()
+            except CapacityError as exc:
+                self._shed += 1
+                logger.info("Prefetch pass stopped at %s: %s", name, exc)
+                break
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self._failures += 1
+                logger.warning("Prefetch of %s failed: %s", name, exc)
+                continue
+            completed += 1
+        self._passes += 1
+        self._jobs_run += completed
+        self._last_pass = time.time()
+        return completed
+
+    def start(self) -> None:
+        """Start the background thread (no-op if already running)."""
+        if self._thread is not None:
+            return
+
+        def run():
+            delay = self._initial_delay + random.uniform(0, self._jitter)
+            while True:
+                self._next_pass = time.time() + delay
+                if self._stop.wait(delay):
+                    return
+                self.run_pass()
+                delay = self.next_delay()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="anny-cache-prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._next_pass = None
+
+    def status(self) -> dict:
+        return {
+            "running": self._thread is not None,
+            "interval_seconds": self._interval,
+            "lead_seconds": self._lead,
+            "passes": self._passes,
+            "jobs_run": self._jobs_run,
+            "failures": self._failures,
+            "shed": self._shed,
+            "last_pass": self._last_pass,
+            "next_pass": self._next_pass,
+        }
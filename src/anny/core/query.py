@@ -0,0 +1,104 @@
+import functools
+from typing import NamedTuple
+
+from anny.core.cache import QueryCache, Shape
+from anny.core.resultset import ResultSet
+
+
+class ReportQuery(NamedTuple):
+    """A cacheable report request in canonical form.
+
+    Metrics and dimensions are sorted and de-duplicated by build(), so requests that
+    differ only in column order are equal, hash alike, and share one cache key and one
+    Google call. Callers get their own column order back with reproject(). source is
+    the API ("ga4" or "search_console"); order_by is the metric rows are sorted by,
+    descending, or "" for the API's default order.
+    """
+
+    source: str
+    metrics: tuple[str, ...]
+    dimensions: tuple[str, ...]
+    start_date: str
+    end_date: str
+    limit: int
+    order_by: str = ""
+
+    @classmethod
+    def build(
+        cls,
+        source: str,
+        metrics,
+        dimensions,
+        start_date: str,
+        end_date: str,
+        limit: int,
+        order_by: str = "",
+    ) -> "ReportQuery":
+        return cls(
+            source,
+            tuple(sorted(set(metrics))),
+            tuple(sorted(set(dimensions))),
+            start_date,
+            end_date,
+            limit,
+            order_by,
+        )
+
+    @property
+    def key(self) -> str:
+        """Cache key, computed once per distinct query."""
+        return _query_key(self)
+
+    @property
+    def family(self) -> str:
+        """Key of the query without its limit and metrics, for containment reuse."""
+        return _query_family(self)
+
+    def shape(self) -> Shape:
+        return Shape(self.family, self.limit, columns=self.metrics, ordered=bool(self.order_by))
+
+    def run_args(self) -> dict:
+        """Keyword arguments for GA4Client.run_report."""
+        args = {
+            "metrics": list(self.metrics),
+            "dimensions": list(self.dimensions),
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "limit": self.limit,
+        }
+        if self.order_by:
+            args["order_by"] = self.order_by
+        return args
+
+
+@functools.lru_cache(maxsize=4096)
+def _query_key(query: ReportQuery) -> str:
+    return QueryCache.make_key(query.source, query._asdict())
+
+
+@functools.lru_cache(maxsize=4096)
+def _query_family(query: ReportQuery) -> str:
+    return QueryCache.make_key(
+        query.source,
+        {
+            "dimensions": query.dimensions,
+            "start": query.start_date,
+            "end": query.end_date,
+            "order_by": query.order_by,
+        },
+    )
+
+
+def reproject(rows: list[dict], columns: list[str]) -> list[dict]:
+    """Return rows with columns first, in that order, followed by any other keys.
+
+    Rows already in that order are returned as they are, without copying; a
+    ResultSet is reordered without copying its columns.
+    """
+    if isinstance(rows, ResultSet):
+        if list(rows.columns[: len(columns)]) == columns:
+            return rows
+        return rows.project(columns + [c for c in rows.columns if c not in columns])
+    if not rows or list(rows[0])[: len(columns)] == columns:
+        return rows
+    return [{**{c: row[c] for c in columns if c in row}, **row} for row in rows]
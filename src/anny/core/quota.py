@@ -0,0 +1,321 @@
+"""Quota-aware admission control for outbound Google API calls."""
+
+import asyncio
+import contextvars
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+
+from anny.core.breaker import CircuitBreaker
+from anny.core.exceptions import CapacityError
+
+logger = logging.getLogger("anny")
+
+# GA4 token quotas used to decide when to start shedding work
+GA4_TOKEN_QUOTAS = ("tokens_per_day", "tokens_per_hour", "tokens_per_project_per_hour")
+GA4_QUOTA_FIELDS = GA4_TOKEN_QUOTAS + (
+    "concurrent_requests",
+    "server_errors_per_project_per_hour",
+    "potentially_thresholded_requests_per_hour",
+)
+
+# A propertyQuota snapshot older than this is ignored (hourly quotas may have refilled)
+QUOTA_SNAPSHOT_MAX_AGE = 600
+
+
+class Priority(IntEnum):
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+
+
+_priority_var: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "request_priority", default=Priority.NORMAL
+)
+
+
+def get_priority() -> Priority:
+    return _priority_var.get()
+
+
+def set_priority(priority: Priority) -> contextvars.Token:
+    return _priority_var.set(priority)
+
+
+class _Lane:  # pylint: disable=too-many-instance-attributes
+    """Admission state for one (service, scope) pair, e.g. ("ga4", "properties/123")."""
+
+    def __init__(self, max_concurrent: int, qpm: int):
+        self.max_concurrent = max_concurrent
+        self.qpm = qpm
+        self.in_flight = 0
+        self.waiting: list[tuple[int, int]] = []  # (-priority, seq) tickets
+        self.admitted = 0
+        self.shed = 0
+        self.quota: dict[str, dict] = {}
+        self.quota_updated = 0.0
+        self.exhausted_until = 0.0
+        self.recent: deque[float] = deque()  # admission times within the last minute
+
+    def headroom(self, now: float) -> float | None:
+        """Smallest remaining fraction across known quotas, or None when nothing is known."""
+        fractions = []
+        if self.quota and now - self.quota_updated <= QUOTA_SNAPSHOT_MAX_AGE:
+            for name in GA4_TOKEN_QUOTAS:
+                status = self.quota.get(name)
+                if not status:
+                    continue
+                total = status["consumed"] + status["remaining"]
+                if total > 0:
+                    fractions.append(status["remaining"] / total)
+        if self.qpm:
+            while self.recent and now - self.recent[0] > 60:
+                self.recent.popleft()
+            fractions.append(1 - len(self.recent) / self.qpm)
+        return min(fractions) if fractions else None
+
+
+class QuotaScheduler:  # pylint: disable=too-many-instance-attributes
+    """Queues or sheds outbound Google calls before Google starts rejecting them.
+
+    Each (service, scope) lane has a concurrency limit. GA4 lanes also track token
+    headroom reported by propertyQuota, and Search Console lanes track a queries-per-minute
+    budget. When headroom falls below a priority's reserve, calls at that priority are
+    shed with CapacityError, and after Google rejects a call for quota, LOW priority
+    (background) calls are shed for exhausted_cooldown seconds. Otherwise calls wait
+    (highest priority first) for up to max_wait seconds for a free slot.
+
+    Each service also has a CircuitBreaker fed with the outcome of every call made in
+    a slot; while it is open, slots for that service fail fast with CircuitOpenError.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, int] | None = None,
+        search_console_qpm: int = 1200,
+        low_priority_reserve: float = 0.25,
+        normal_priority_reserve: float = 0.05,
+        max_wait: float = 10.0,
+        exhausted_cooldown: float = 60.0,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+    ):
+        self._limits = {"ga4": 10, "search_console": 10, "tag_manager": 4, **(limits or {})}
+        self._qpm = {"search_console": search_console_qpm}
+        self._reserve = {
+            Priority.LOW: low_priority_reserve,
+            Priority.NORMAL: normal_priority_reserve,
+            Priority.HIGH: 0.0,
+        }
+        self._max_wait = max_wait
+        self._exhausted_cooldown = exhausted_cooldown
+        self._cond = threading.Condition()
+        # Async waiters by ticket, woken through their own event loop
+        self._async_waiters: dict[
+            tuple[int, int], tuple[asyncio.AbstractEventLoop, asyncio.Event]
+        ] = {}
+        self._lanes: dict[tuple[str, str], _Lane] = {}
+        self._seq = itertools.count()
+        self._breaker_threshold = breaker_threshold
+        self._breaker_reset = breaker_reset
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def _lane(self, service: str, scope: str) -> _Lane:
+        lane = self._lanes.get((service, scope))
+        if lane is None:
+            lane = _Lane(self._limits.get(service, 4), self._qpm.get(service, 0))
+            self._lanes[(service, scope)] = lane
+        return lane
+
+    def breaker(self, service: str) -> CircuitBreaker:
+        with self._cond:
+            breaker = self._breakers.get(service)
+            if breaker is None:
+                breaker = CircuitBreaker(service, self._breaker_threshold, self._breaker_reset)
+                self._breakers[service] = breaker
+            return breaker
+
+    def _try_admit(
+        self, lane: _Lane, ticket: tuple[int, int], priority: Priority, cost: int = 1
+    ) -> bool:
+        """Admit the ticket if allowed, return False to keep waiting, or raise to shed.
+
+        cost is the number of API calls the slot covers (a batch counts each request).
+        """
+        now = time.time()
+        if now < lane.exhausted_until and priority == Priority.LOW:
+            self._shed(lane, ticket)
+            raise CapacityError("Google API quota exhausted, try again later")
+        headroom = lane.headroom(now)
+        if headroom is not None and headroom < self._reserve[priority]:
+            self._shed(lane, ticket)
+            raise CapacityError("Google API quota nearly exhausted, request shed")
+        if lane.in_flight >= lane.max_concurrent or min(lane.waiting) != ticket:
+            return False
+        cost = min(cost, lane.qpm) if lane.qpm else cost
+        if lane.qpm and len(lane.recent) + cost > lane.qpm:
+            return False
+        lane.waiting.remove(ticket)
+        lane.in_flight += 1
+        lane.admitted += 1
+        if lane.qpm:
+            lane.recent.extend([now] * cost)
+        self._notify_locked()  # the next ticket in line may now be at the front
+        return True
+
+    def _notify_locked(self) -> None:
+        """Wake every thread and async task waiting for a slot to re-check admission."""
+        self._cond.notify_all()
+        for loop, event in self._async_waiters.values():
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # the waiter's loop has closed
+                pass
+
+    def _shed(self, lane: _Lane, ticket: tuple[int, int]) -> None:
+        if ticket in lane.waiting:
+            lane.waiting.remove(ticket)
+        lane.shed += 1
+        self._notify_locked()
+
+    def _enqueue(self, service: str, scope: str) -> tuple[_Lane, tuple[int, int], Priority]:
+        priority = get_priority()
+        lane = self._lane(service, scope)
+        ticket = (-priority, next(self._seq))
+        lane.waiting.append(ticket)
+        return lane, ticket, priority
+
+    def _timed_out(self, lane: _Lane, ticket: tuple[int, int], service: str) -> CapacityError:
+        self._shed(lane, ticket)
+        logger.warning("Timed out waiting for a %s quota slot", service)
+        return CapacityError(f"Too many concurrent {service} requests, try again shortly")
+
+    def _release(self, lane: _Lane) -> None:
+        with self._cond:
+            lane.in_flight -= 1
+            self._notify_locked()
+
+    @contextmanager
+    def slot(self, service: str, scope: str, cost: int = 1):
+        """Hold one outbound call slot for (service, scope), waiting or shedding as needed."""
+        breaker = self.breaker(service)
+        breaker.before_call()
+        deadline = time.monotonic() + self._max_wait
+        with self._cond:
+            lane, ticket, priority = self._enqueue(service, scope)
+            while not self._try_admit(lane, ticket, priority, cost):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._timed_out(lane, ticket, service)
+                self._cond.wait(min(remaining, 0.1))
+        try:
+            yield
+        except Exception as exc:
+            breaker.record(exc)
+            raise
+        else:
+            breaker.record()
+        finally:
+            self._release(lane)
+
+    @asynccontextmanager
+    async def slot_async(self, service: str, scope: str):
+        """Async slot(): waits on an asyncio.Event so the event loop is never blocked.
+
+        Releases and sheds set the event from whichever thread or loop they run on.
+        """
+        breaker = self.breaker(service)
+        breaker.before_call()
+        deadline = time.monotonic() + self._max_wait
+        wakeup = asyncio.Event()
+        with self._cond:
+            lane, ticket, priority = self._enqueue(service, scope)
+            self._async_waiters[ticket] = (asyncio.get_running_loop(), wakeup)
+        try:
+            while True:
+                with self._cond:
+                    wakeup.clear()
+                    if self._try_admit(lane, ticket, priority):
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._timed_out(lane, ticket, service)
+                # The timeout covers budget that frees with time (qpm), as in slot()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), min(remaining, 0.1))
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            with self._cond:
+                if ticket in lane.waiting:
+                    lane.waiting.remove(ticket)
+                    self._notify_locked()
+            raise
+        finally:
+            with self._cond:
+                self._async_waiters.pop(ticket, None)
+        try:
+            yield
+        except Exception as exc:
+            breaker.record(exc)
+            raise
+        else:
+            breaker.record()
+        finally:
+            self._release(lane)
+
+    def record_ga4_quota(self, property_name: str, property_quota) -> None:
+        """Store the propertyQuota block returned with a GA4 report."""
+        snapshot = {}
+        for name in GA4_QUOTA_FIELDS:
+            status = getattr(property_quota, name, None)
+            if status is None:
+                continue
+            snapshot[name] = {"consumed": int(status.consumed), "remaining": int(status.remaining)}
+        with self._cond:
+            lane = self._lane("ga4", property_name)
+            lane.quota = snapshot
+            lane.quota_updated = time.time()
+
+    def record_exhausted(self, service: str, scope: str) -> None:
+        """Google rejected a call for quota: shed LOW priority work for the cooldown period."""
+        logger.warning(
+            "%s quota exhausted for %s, shedding work for %ds",
+            service,
+            scope,
+            self._exhausted_cooldown,
+        )
+        with self._cond:
+            self._lane(service, scope).exhausted_until = time.time() + self._exhausted_cooldown
+
+    def status(self) -> dict:
+        """Return per-service, per-scope concurrency and quota state."""
+        now = time.time()
+        result: dict[str, dict] = {}
+        with self._cond:
+            for (service, scope), lane in self._lanes.items():
+                headroom = lane.headroom(now)
+                result.setdefault(service, {})[scope] = {
+                    "in_flight": lane.in_flight,
+                    "max_concurrent": lane.max_concurrent,
+                    "queued": len(lane.waiting),
+                    "admitted": lane.admitted,
+                    "shed": lane.shed,
+                    "headroom": round(headroom, 4) if headroom is not None else None,
+                    "exhausted": now < lane.exhausted_until,
+                    "quota": lane.quota,
+                    "quota_age_seconds": (
+                        round(now - lane.quota_updated, 1) if lane.quota_updated else None
+                    ),
+                }
+        return result
+
+    def breaker_status(self) -> dict:
+        """Return each service's circuit breaker state."""
+        with self._cond:
+            breakers = dict(self._breakers)
+        return {service: breaker.status() for service, breaker in breakers.items()}
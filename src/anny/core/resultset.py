@@ -0,0 +1,269 @@
+"""Columnar report rows: ResultSet and its JSON encoding."""
+
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import NamedTuple
+
+# Key marking a ResultSet in JSON written by json_default, read back by json_object_hook
+_JSON_TAG = "__resultset__"
+
+
+class Column(NamedTuple):
+    """One column of a ResultSet schema.
+
+    type is "str" (dictionary-encoded strings), "int" or "float" (packed arrays), or
+    "any" (a plain list, for mixed or other values).
+    """
+
+    name: str
+    type: str
+    dimension: bool
+
+
+class _Encoded:
+    """Dictionary-encoded strings: each distinct value is stored once and every row
+    holds its index in an unsigned int array."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values: list[str], codes: array):
+        self.values = values
+        self.codes = codes
+
+    @classmethod
+    def encode(cls, strings: Iterable[str]) -> "_Encoded":
+        index: dict[str, int] = {}
+        codes = array("I", (index.setdefault(s, len(index)) for s in strings))
+        return cls(list(index), codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return _Encoded(self.values, self.codes[i])
+        return self.values[self.codes[i]]
+
+    def __iter__(self) -> Iterator[str]:
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def take(self, indices: list[int]) -> "_Encoded":
+        codes = self.codes
+        return _Encoded(self.values, array("I", (codes[i] for i in indices)))
+
+    def width(self) -> int:
+        """Length of the longest value in use."""
+        values = self.values
+        return max((len(values[code]) for code in set(self.codes)), default=0)
+
+    def __sizeof__(self) -> int:
+        return (
+            object.__sizeof__(self)
+            + sys.getsizeof(self.codes)
+            + sys.getsizeof(self.values)
+            + sum(sys.getsizeof(v) for v in self.values)
+        )
+
+
+def _column_type(store) -> str:
+    if isinstance(store, _Encoded):
+        return "str"
+    if isinstance(store, array):
+        return "int" if store.typecode == "q" else "float"
+    return "any"
+
+
+def _pack(values: list, dimension: bool):
+    """Store values in the most compact form that returns them unchanged."""
+    kinds = {type(v) for v in values}
+    if kinds == {str} and dimension:
+        return _Encoded.encode(values)
+    if kinds == {int}:
+        try:
+            return array("q", values)
+        except OverflowError:
+            return values
+    if kinds == {float}:
+        return array("d", values)
+    return values
+
+
+def _take(store, indices: list[int]):
+    if isinstance(store, _Encoded):
+        return store.take(indices)
+    if isinstance(store, array):
+        return array(store.typecode, (store[i] for i in indices))
+    return [store[i] for i in indices]
+
+
+class ResultSet(Sequence):
+    """Report rows stored column by column.
+
+    Dimension strings are dictionary-encoded and integer or float columns are packed
+    into arrays, so a result holds one object per distinct value rather than a dict
+    and a set of key strings per row. Clients return ResultSets and the cache stores
+    them as they are.
+
+    A ResultSet is also a read-only sequence of row dicts, built one at a time on
+    access, so code written for list[dict] keeps working: indexing gives a row, slicing
+    gives a ResultSet, and it compares equal to a list of the same rows. Renderers that
+    know the type read whole columns with column() or tuples with iter_tuples().
+    """
+
+    __slots__ = ("_names", "_dimensions", "_stores", "_length")
+
+    def __init__(self, stores: dict, dimensions: Iterable[str] = (), length: int = 0):
+        self._stores = stores
+        self._names = tuple(stores)
+        self._dimensions = tuple(d for d in dimensions if d in stores)
+        self._length = len(next(iter(stores.values()))) if stores else length
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, list], dimensions: Iterable[str] = ()) -> "ResultSet":
+        """Build from equal-length value lists by column name, in row-dict key order."""
+        dimensions = tuple(dimensions)
+        return cls(
+            {name: _pack(values, name in dimensions) for name, values in columns.items()},
+            dimensions,
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict], dimensions: Iterable[str] = ()) -> "ResultSet":
+        """Build from row dicts; a key missing from a row reads back as None."""
+        if isinstance(rows, ResultSet):
+            return rows
+        rows = list(rows)
+        names = list(dict.fromkeys(key for row in rows for key in row))
+        columns = {name: [row.get(name) for row in rows] for name in names}
+        return cls.from_columns(columns, dimensions)
+
+    @classmethod
+    def concat(cls, parts: Iterable[Sequence[dict]]) -> "ResultSet":
+        """Rows of every part in order, as one ResultSet."""
+        parts = [cls.from_rows(part) for part in parts]
+        names = list(dict.fromkeys(name for part in parts for name in part.columns))
+        dimensions = dict.fromkeys(d for part in parts for d in part.dimensions)
+        columns: dict[str, list] = {name: [] for name in names}
+        for part in parts:
+            for name in names:
+                if name in part.columns:
+                    columns[name].extend(part.column(name))
+                else:
+                    columns[name].extend([None] * len(part))
+        return cls.from_columns(columns, dimensions)
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return self._names
+
+    @property
+    def dimensions(self) -> tuple[str, ...]:
+        return self._dimensions
+
+    @property
+    def schema(self) -> tuple[Column, ...]:
+        return tuple(
+            Column(name, _column_type(store), name in self._dimensions)
+            for name, store in self._stores.items()
+        )
+
+    def column(self, name: str) -> list:
+        """Every value of one column, in row order."""
+        return list(self._stores[name])
+
+    def width(self, name: str) -> int:
+        """Length of the longest value of a column as text."""
+        store = self._stores[name]
+        if isinstance(store, _Encoded):
+            return store.width()
+        return max((len(str(v)) for v in store), default=0)
+
+    def iter_tuples(self) -> Iterator[tuple]:
+        """Rows as tuples of values in columns order."""
+        return zip(*self._stores.values())
+
+    def project(self, names: Iterable[str]) -> "ResultSet":
+        """The named columns only, in that order; the column arrays are shared, not copied."""
+        stores = {name: self._stores[name] for name in names if name in self._stores}
+        return ResultSet(stores, self._dimensions, self._length if not stores else 0)
+
+    def take(self, indices: list[int]) -> "ResultSet":
+        """The rows at indices, in that order."""
+        stores = {name: _take(store, indices) for name, store in self._stores.items()}
+        return ResultSet(stores, self._dimensions, len(indices))
+
+    def to_list(self) -> list[dict]:
+        names = self._names
+        return [dict(zip(names, values)) for values in self.iter_tuples()]
+
+    def to_json(self) -> dict:
+        """JSON-ready form that keeps the column layout (see json_default)."""
+        columns = {}
+        for name, store in self._stores.items():
+            if isinstance(store, _Encoded):
+                columns[name] = {"values": store.values, "codes": store.codes.tolist()}
+            else:
+                columns[name] = list(store)
+        return {_JSON_TAG: 1, "dimensions": list(self._dimensions), "columns": columns}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ResultSet":
+        dimensions = data["dimensions"]
+        stores = {}
+        for name, values in data["columns"].items():
+            if isinstance(values, dict):
+                stores[name] = _Encoded(values["values"], array("I", values["codes"]))
+            else:
+                stores[name] = _pack(values, name in dimensions)
+        return cls(stores, dimensions)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            stores = {name: store[i] for name, store in self._stores.items()}
+            return ResultSet(stores, self._dimensions, len(range(*i.indices(self._length))))
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("ResultSet index out of range")
+        return {name: store[i] for name, store in self._stores.items()}
+
+    def __iter__(self) -> Iterator[dict]:
+        names = self._names
+        return (dict(zip(names, values)) for values in self.iter_tuples())
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (ResultSet, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ResultSet({len(self)} rows, columns={list(self._names)})"
+
+    def __sizeof__(self) -> int:
+        size = object.__sizeof__(self)
+        for name, store in self._stores.items():
+            size += sys.getsizeof(name) + sys.getsizeof(store)
+            if isinstance(store, list):
+                size += sum(sys.getsizeof(v) for v in store)
+        return size
+
+
+def json_default(obj) -> dict:
+    """json.dumps default hook that writes a ResultSet in its columnar form."""
+    if isinstance(obj, ResultSet):
+        return obj.to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_object_hook(obj: dict):
+    """json.loads object hook that reads back what json_default wrote."""
+    if _JSON_TAG in obj:
+        return ResultSet.from_json(obj)
+    return obj
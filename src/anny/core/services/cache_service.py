@@ -1,12 +1,84 @@
 from anny.core.cache import QueryCache
 
 
-def get_cache_status(cache: QueryCache) -> dict:
-    """Return cache status information."""
-    return cache.status()
+def get_cache_status(cache: QueryCache, realtime: QueryCache | None = None) -> dict:
+    """Return cache status information, with the realtime cache's under "realtime"."""
+    status = cache.status()
+    if realtime is not None:
+        status["realtime"] = realtime.status()
+    return status
 
 
 def clear_cache(cache: QueryCache) -> dict:
     """Clear all cache entries. Returns count of removed entries."""
     count = cache.clear()
     return {"cleared": count}
+
+
+# (status field, metric name, type, help) for per-api counters and gauges
+_API_METRICS = (
+    ("hits", "anny_cache_hits_total", "counter", "Lookups answered from the cache."),
+    ("misses", "anny_cache_misses_total", "counter", "Lookups that waited for Google."),
+    ("stale_served", "anny_cache_stale_served_total", "counter", "Stale results served."),
+    (
+        "fallbacks",
+        "anny_cache_fallbacks_total",
+        "counter",
+        "Last known good results served while Google was unavailable.",
+    ),
+    (
+        "negative_hits",
+        "anny_cache_negative_hits_total",
+        "counter",
+        "Cached Google errors raised again without a call.",
+    ),
+    ("evictions", "anny_cache_evictions_total", "counter", "Entries evicted for capacity."),
+    ("expirations", "anny_cache_expirations_total", "counter", "Entries removed after expiry."),
+    ("entries", "anny_cache_entries", "gauge", "Entries stored."),
+    ("bytes", "anny_cache_bytes", "gauge", "Measured bytes stored."),
+    ("fetches", "anny_cache_fetches_total", "counter", "Google calls made through the cache."),
+    ("mean_fetch_seconds", "anny_cache_mean_fetch_seconds", "gauge", "Mean Google call latency."),
+    (
+        "fetch_seconds_saved",
+        "anny_cache_fetch_seconds_saved_total",
+        "counter",
+        "Estimated Google latency avoided by hits and stale serves (mean fetch latency at each).",
+    ),
+)
+
+# (status field, metric name, type, help) for whole-cache values
+_CACHE_METRICS = (
+    ("max_entries", "anny_cache_max_entries", "gauge", "Entry capacity."),
+    ("max_bytes", "anny_cache_max_bytes", "gauge", "Byte budget (0 = unbounded)."),
+    (
+        "contained_hits",
+        "anny_cache_contained_hits_total",
+        "counter",
+        "Hits sliced from a larger result.",
+    ),
+    (
+        "background_refreshes",
+        "anny_cache_refreshes_total",
+        "counter",
+        "Background refreshes started.",
+    ),
+    (
+        "refresh_failures",
+        "anny_cache_refresh_failures_total",
+        "counter",
+        "Background refreshes that failed.",
+    ),
+)
+
+
+def format_prometheus(status: dict) -> str:
+    """Render cache status in the Prometheus text exposition format."""
+    by_api = {**status["by_api"], **status.get("realtime", {}).get("by_api", {})}
+    lines = []
+    for field, name, kind, help_text in _API_METRICS:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for api, stats in by_api.items():
+            lines.append(f'{name}{{api="{api}"}} {stats[field]}')
+    for field, name, kind, help_text in _CACHE_METRICS:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {status[field]}"]
+    return "\n".join(lines) + "\n"
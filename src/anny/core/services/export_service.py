@@ -1,8 +1,13 @@
 import csv
 import io
 import json
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from anny.core.constants import EXPORT_CHUNK_BYTES
+from anny.core.resultset import ResultSet
 
 _FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_BOM = b"\xef\xbb\xbf"
 
 
 def _sanitize_cell(value: str) -> str:
@@ -14,20 +19,145 @@ def _sanitize_cell(value: str) -> str:
     return value
 
 
-def to_csv(rows: list[dict]) -> bytes:
-    """Convert rows to CSV bytes with UTF-8 BOM for Excel compatibility."""
-    if not rows:
-        return b"\xef\xbb\xbf"
+class _CsvEncoder:
+    """Buffers sanitised CSV lines; the first chunk taken starts with the UTF-8 BOM."""
+
+    def __init__(self):
+        self._output = io.StringIO()
+        self._writer = csv.writer(self._output)
+        self._columns: list[str] | None = None
+        self._prefix = _BOM
+
+    def start(self, columns) -> None:
+        self._columns = list(columns)
+        self._writer.writerow(self._columns)
+
+    def add(self, row: dict) -> None:
+        if self._columns is None:
+            self.start(row.keys())
+        self.add_values(row.get(col, "") for col in self._columns)
+
+    def add_values(self, values) -> None:
+        """Write one row given as values in column order."""
+        self._writer.writerow([_sanitize_cell(str(v)) for v in values])
+
+    def pending(self) -> int:
+        return self._output.tell()
+
+    def take(self) -> bytes:
+        data = self._prefix + self._output.getvalue().encode("utf-8")
+        self._prefix = b""
+        self._output.seek(0)
+        self._output.truncate()
+        return data
+
+    def finish(self) -> bytes:
+        return self.take()
+
+
+class _JsonEncoder:
+    """Buffers elements of a pretty-printed JSON array, matching json.dumps(indent=2)."""
+
+    def __init__(self):
+        self._parts: list[str] = []
+        self._size = 0
+        self._count = 0
+
+    def add(self, row: dict) -> None:
+        element = json.dumps(row, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        self._parts.append(("[\n  " if self._count == 0 else ",\n  ") + element)
+        self._size += len(element)
+        self._count += 1
+
+    def pending(self) -> int:
+        return self._size
+
+    def take(self) -> bytes:
+        data = "".join(self._parts).encode("utf-8")
+        self._parts.clear()
+        self._size = 0
+        return data
 
-    safe_rows = [{k: _sanitize_cell(str(v)) for k, v in row.items()} for row in rows]
+    def finish(self) -> bytes:
+        return self.take() + (b"\n]" if self._count else b"[]")
 
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=list(safe_rows[0].keys()))
-    writer.writeheader()
-    writer.writerows(safe_rows)
-    return b"\xef\xbb\xbf" + output.getvalue().encode("utf-8")
+
+def _encode(rows: Iterable, encoder, chunk_size: int, add=None) -> Iterator[bytes]:
+    add = add or encoder.add
+    for row in rows:
+        add(row)
+        if encoder.pending() >= chunk_size:
+            yield encoder.take()
+    tail = encoder.finish()
+    if tail:
+        yield tail
+
+
+async def _encode_async(
+    rows: AsyncIterable, encoder, chunk_size: int, add=None
+) -> AsyncIterator[bytes]:
+    add = add or encoder.add
+    async for row in rows:
+        add(row)
+        if encoder.pending() >= chunk_size:
+            yield encoder.take()
+    tail = encoder.finish()
+    if tail:
+        yield tail
+
+
+async def _aiter(rows: Iterable) -> AsyncIterator:
+    for row in rows:
+        yield row
+
+
+def to_csv(rows: list[dict]) -> bytes:
+    """Convert rows to CSV bytes with UTF-8 BOM for Excel compatibility.
+
+    A ResultSet is written from its columns without building row dicts.
+    """
+    encoder = _CsvEncoder()
+    if isinstance(rows, ResultSet):
+        if rows:
+            encoder.start(rows.columns)
+        return b"".join(
+            _encode(rows.iter_tuples(), encoder, EXPORT_CHUNK_BYTES, encoder.add_values)
+        )
+    return b"".join(_encode(rows, encoder, EXPORT_CHUNK_BYTES))
 
 
 def to_json(rows: list[dict]) -> bytes:
     """Convert rows to pretty-printed JSON bytes."""
-    return json.dumps(rows, indent=2, ensure_ascii=False).encode("utf-8")
+    return b"".join(_encode(rows, _JsonEncoder(), EXPORT_CHUNK_BYTES))
+
+
+def stream_csv(
+    rows: AsyncIterable[dict] | Iterable[dict], chunk_size: int = EXPORT_CHUNK_BYTES
+) -> AsyncIterator[bytes]:
+    """Encode rows to CSV as they arrive, yielding chunks of roughly chunk_size bytes.
+
+    Rows are pulled only when the consumer asks for the next chunk, so a slow client
+    slows the fetcher instead of growing a buffer. Rows already in memory may be
+    passed as a list; a ResultSet is written from its columns without building row
+    dicts.
+    """
+    encoder = _CsvEncoder()
+    if isinstance(rows, ResultSet):
+        if rows:
+            encoder.start(rows.columns)
+        return _encode_async(_aiter(rows.iter_tuples()), encoder, chunk_size, encoder.add_values)
+    if not isinstance(rows, AsyncIterable):
+        rows = _aiter(rows)
+    return _encode_async(rows, encoder, chunk_size)
+
+
+def stream_json(
+    rows: AsyncIterable[dict] | Iterable[dict], chunk_size: int = EXPORT_CHUNK_BYTES
+) -> AsyncIterator[bytes]:
+    """Encode rows as a JSON array as they arrive, yielding chunks of roughly chunk_size bytes.
+
+    Rows already in memory may be passed as a list or ResultSet.
+    """
+    if not isinstance(rows, AsyncIterable):
+        rows = _aiter(rows)
+    return _encode_async(rows, _JsonEncoder(), chunk_size)
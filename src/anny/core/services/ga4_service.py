@@ -1,90 +1,205 @@
-from anny.clients.ga4 import GA4Client
-from anny.core.cache import QueryCache
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from anny.clients.ga4 import AsyncGA4Client, GA4Client
+from anny.core.cache import CacheRequest, QueryCache
+from anny.core.constants import GA4_MAX_BATCH_REPORTS
 from anny.core.date_utils import parse_date_range
 from anny.core.exceptions import ValidationError
+from anny.core.partitions import DayPartitions, partitionable
+from anny.core.query import ReportQuery, reproject
 
+TOP_PAGES_METRICS = ["screenPageViews", "sessions", "totalUsers"]
+TRAFFIC_SUMMARY_METRICS = ["sessions", "totalUsers", "screenPageViews", "bounceRate"]
 
-def get_report(
-    client: GA4Client,
-    metrics: str = "sessions,totalUsers",
-    dimensions: str = "date",
-    date_range: str = "last_28_days",
-    limit: int = 10,
-    cache: QueryCache | None = None,
-) -> list[dict]:
-    """Run a custom GA4 report."""
+
+def _parse_dates(date_range: str) -> tuple[str, str]:
+    try:
+        return parse_date_range(date_range)
+    except ValueError as exc:
+        raise ValidationError(str(exc)) from exc
+
+
+def _report_args(metrics: str, dimensions: str, date_range: str, limit: int) -> dict:
+    """Validate custom report inputs and return keyword arguments for run_report."""
     metric_list = [m.strip() for m in metrics.split(",") if m.strip()]
     dimension_list = [d.strip() for d in dimensions.split(",") if d.strip()]
     if not metric_list:
         raise ValidationError("At least one metric is required")
     if not dimension_list:
         raise ValidationError("At least one dimension is required")
-    try:
-        start_date, end_date = parse_date_range(date_range)
-    except ValueError as exc:
-        raise ValidationError(str(exc)) from exc
+    start_date, end_date = _parse_dates(date_range)
+    return {
+        "metrics": metric_list,
+        "dimensions": dimension_list,
+        "start_date": start_date,
+        "end_date": end_date,
+        "limit": limit,
+    }
 
-    if cache:
-        key = cache.make_key(
-            "ga4_report",
-            {
-                "metrics": metric_list,
-                "dimensions": dimension_list,
-                "start": start_date,
-                "end": end_date,
-                "limit": limit,
-            },
-        )
-        cached = cache.get(key)
-        if cached is not None:
-            return cached
-
-    rows = client.run_report(
-        metrics=metric_list,
-        dimensions=dimension_list,
-        start_date=start_date,
-        end_date=end_date,
-        limit=limit,
+
+def _report_query(args: dict) -> ReportQuery:
+    """Canonical, cacheable form of run_report kwargs."""
+    return ReportQuery.build(
+        "ga4",
+        args["metrics"],
+        args["dimensions"],
+        args["start_date"],
+        args["end_date"],
+        args["limit"],
+        args.get("order_by", ""),
     )
 
-    if cache:
-        cache.put(key, rows, api="ga4", summary=f"report {metrics}")
 
-    return rows
+def _columns(args: dict) -> list[str]:
+    """Column order the caller asked for: dimensions, then metrics."""
+    return list(dict.fromkeys(args["dimensions"] + args["metrics"]))
 
 
-def get_top_pages(
+def _date_partitions(cache: QueryCache, query: ReportQuery) -> DayPartitions | None:
+    """Per-day partitions for reports whose only dimension is date, else None.
+
+    Ranges longer than MAX_PARTITION_DAYS are not partitioned.
+    """
+    if query.dimensions != ("date",) or not partitionable(query.start_date, query.end_date):
+        return None
+    return DayPartitions(
+        cache,
+        "ga4_report_day",
+        {"metrics": query.metrics},
+        query.start_date,
+        query.end_date,
+        api="ga4",
+    )
+
+
+def _span_args(query: ReportQuery, start_date: str, end_date: str, days: int) -> dict:
+    """run_report kwargs for the days from start_date to end_date of a partitioned query."""
+    return {
+        **query.run_args(),
+        "start_date": start_date,
+        "end_date": end_date,
+        "limit": days,
+    }
+
+
+def _ga4_day(row: dict) -> str:
+    """ISO day of a row's date value (GA4 returns YYYYMMDD)."""
+    value = row.get("date", "")
+    if len(value) == 8 and value.isdigit():
+        return f"{value[:4]}-{value[4:6]}-{value[6:]}"
+    return value
+
+
+def _top_pages_args(date_range: str, limit: int) -> dict:
+    start_date, end_date = _parse_dates(date_range)
+    return {
+        "metrics": list(TOP_PAGES_METRICS),
+        "dimensions": ["pagePath"],
+        "start_date": start_date,
+        "end_date": end_date,
+        "limit": limit,
+        "order_by": "screenPageViews",
+    }
+
+
+def _traffic_summary_args(date_range: str) -> dict:
+    start_date, end_date = _parse_dates(date_range)
+    return {
+        "metrics": list(TRAFFIC_SUMMARY_METRICS),
+        "dimensions": ["sessionSource"],
+        "start_date": start_date,
+        "end_date": end_date,
+        "limit": 10,
+    }
+
+
+def _realtime_args(metrics: str, dimensions: str) -> dict:
+    metric_list = [m.strip() for m in metrics.split(",") if m.strip()]
+    if not metric_list:
+        raise ValidationError("At least one metric is required")
+    dimension_list = [d.strip() for d in dimensions.split(",") if d.strip()] or None
+    return {"metrics": metric_list, "dimensions": dimension_list}
+
+
+def _realtime_query(args: dict) -> dict:
+    """Realtime kwargs with sorted columns, so equivalent polls share one cache entry."""
+    return {
+        "metrics": sorted(set(args["metrics"])),
+        "dimensions": sorted(set(args["dimensions"] or [])) or None,
+    }
+
+
+def _snapshot(rows: list[dict]) -> dict:
+    return {"rows": rows, "as_of": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+
+
+def _realtime_view(snapshot: dict, args: dict) -> dict:
+    return {
+        **snapshot,
+        "rows": reproject(snapshot["rows"], (args["dimensions"] or []) + args["metrics"]),
+    }
+
+
+def get_report(
     client: GA4Client,
+    metrics: str = "sessions,totalUsers",
+    dimensions: str = "date",
     date_range: str = "last_28_days",
     limit: int = 10,
     cache: QueryCache | None = None,
 ) -> list[dict]:
-    """Get top pages by screen page views."""
-    try:
-        start_date, end_date = parse_date_range(date_range)
-    except ValueError as exc:
-        raise ValidationError(str(exc)) from exc
+    """Run a custom GA4 report.
 
-    if cache:
-        key = cache.make_key(
-            "ga4_top_pages", {"start": start_date, "end": end_date, "limit": limit}
-        )
-        cached = cache.get(key)
-        if cached is not None:
-            return cached
-
-    rows = client.run_report(
-        metrics=["screenPageViews", "sessions", "totalUsers"],
-        dimensions=["pagePath"],
-        start_date=start_date,
-        end_date=end_date,
-        limit=limit,
+    With a cache, date-only reports are assembled from per-day partitions and only
+    the days missing from the cache are fetched.
+    """
+    args = _report_args(metrics, dimensions, date_range, limit)
+    if not cache:
+        return client.run_report(**args)
+    query = _report_query(args)
+    parts = _date_partitions(cache, query)
+    if parts is not None:
+        if parts.span:
+            parts.fetch(
+                lambda *span: client.run_report(**_span_args(query, *span)),
+                _ga4_day,
+                summary=f"report {metrics}",
+            )
+        return reproject(parts.rows()[:limit], _columns(args))
+    rows = cache.get_or_fetch(
+        query.key,
+        lambda: client.run_report(**query.run_args()),
+        api="ga4",
+        summary=f"report {metrics}",
+        end_date=query.end_date,
+        shape=query.shape(),
     )
+    return reproject(rows, _columns(args))
 
-    if cache:
-        cache.put(key, rows, api="ga4", summary="top_pages")
 
-    return rows
+def get_top_pages(
+    client: GA4Client,
+    date_range: str = "last_28_days",
+    limit: int = 10,
+    cache: QueryCache | None = None,
+) -> list[dict]:
+    """Get top pages by screen page views."""
+    args = _top_pages_args(date_range, limit)
+    if not cache:
+        return client.run_report(**args)
+    query = _report_query(args)
+    rows = cache.get_or_fetch(
+        query.key,
+        lambda: client.run_report(**query.run_args()),
+        api="ga4",
+        summary="top_pages",
+        end_date=query.end_date,
+        shape=query.shape(),
+    )
+    return reproject(rows, _columns(args))
 
 
 def get_traffic_summary(
@@ -93,43 +208,362 @@ def get_traffic_summary(
     cache: QueryCache | None = None,
 ) -> list[dict]:
     """Get a traffic summary with key metrics by session source."""
-    try:
-        start_date, end_date = parse_date_range(date_range)
-    except ValueError as exc:
-        raise ValidationError(str(exc)) from exc
-
-    if cache:
-        key = cache.make_key("ga4_traffic_summary", {"start": start_date, "end": end_date})
-        cached = cache.get(key)
-        if cached is not None:
-            return cached
-
-    rows = client.run_report(
-        metrics=["sessions", "totalUsers", "screenPageViews", "bounceRate"],
-        dimensions=["sessionSource"],
-        start_date=start_date,
-        end_date=end_date,
-        limit=10,
+    args = _traffic_summary_args(date_range)
+    if not cache:
+        return client.run_report(**args)
+    query = _report_query(args)
+    rows = cache.get_or_fetch(
+        query.key,
+        lambda: client.run_report(**query.run_args()),
+        api="ga4",
+        summary="traffic_summary",
+        end_date=query.end_date,
+        shape=query.shape(),
     )
+    return reproject(rows, _columns(args))
 
-    if cache:
-        cache.put(key, rows, api="ga4", summary="traffic_summary")
 
-    return rows
+def _all_rows_args(args: dict) -> dict:
+    """Drop the row limit from run_report kwargs for an all-rows iteration."""
+    return {k: v for k, v in args.items() if k != "limit"}
+
+
+def iter_report(
+    client: GA4Client,
+    metrics: str = "sessions,totalUsers",
+    dimensions: str = "date",
+    date_range: str = "last_28_days",
+) -> Iterator[dict]:
+    """Stream every row of a custom GA4 report, page by page.
+
+    Inputs are validated before the first page is requested. All-rows results are
+    not cached.
+    """
+    args = _report_args(metrics, dimensions, date_range, limit=0)
+    return client.iter_report(**_all_rows_args(args))
+
+
+def iter_top_pages(client: GA4Client, date_range: str = "last_28_days") -> Iterator[dict]:
+    """Stream every page's views, sessions, and users, page by page."""
+    args = _top_pages_args(date_range, limit=0)
+    return client.iter_report(**_all_rows_args(args))
+
+
+def get_realtime_snapshot(
+    client: GA4Client,
+    metrics: str = "activeUsers",
+    dimensions: str = "",
+    cache: QueryCache | None = None,
+) -> dict:
+    """Run a GA4 realtime report, returning {"rows", "as_of"}.
+
+    With a (short-TTL) cache, every identical poll within its TTL, concurrent ones
+    included, shares one GA4 call; as_of is the UTC time that call was made.
+    """
+    args = _realtime_args(metrics, dimensions)
+    if not cache:
+        return _snapshot(client.run_realtime_report(**args))
+    query = _realtime_query(args)
+    snapshot = cache.get_or_fetch(
+        cache.make_key("ga4_realtime", query),
+        lambda: _snapshot(client.run_realtime_report(**query)),
+        api="ga4_realtime",
+        summary=f"realtime {metrics}",
+    )
+    return _realtime_view(snapshot, args)
 
 
 def get_realtime_report(
     client: GA4Client,
     metrics: str = "activeUsers",
     dimensions: str = "",
+    cache: QueryCache | None = None,
 ) -> list[dict]:
     """Run a GA4 realtime report."""
-    metric_list = [m.strip() for m in metrics.split(",") if m.strip()]
-    if not metric_list:
-        raise ValidationError("At least one metric is required")
-    dimension_list = [d.strip() for d in dimensions.split(",") if d.strip()] or None
+    return get_realtime_snapshot(client, metrics, dimensions, cache)["rows"]
+
+
+async def get_report_async(
+    client: AsyncGA4Client,
+    metrics: str = "sessions,totalUsers",
+    dimensions: str = "date",
+    date_range: str = "last_28_days",
+    limit: int = 10,
+    cache: QueryCache | None = None,
+) -> list[dict]:
+    """Run a custom GA4 report on the async client."""
+    args = _report_args(metrics, dimensions, date_range, limit)
+    if not cache:
+        return await client.run_report(**args)
+    query = _report_query(args)
+    parts = await asyncio.to_thread(_date_partitions, cache, query)
+    if parts is not None:
+        if parts.span:
+            await parts.fetch_async(
+                lambda *span: client.run_report(**_span_args(query, *span)),
+                _ga4_day,
+                summary=f"report {metrics}",
+            )
+        return reproject(parts.rows()[:limit], _columns(args))
+    rows = await cache.get_or_fetch_async(
+        query.key,
+        lambda: client.run_report(**query.run_args()),
+        api="ga4",
+        summary=f"report {metrics}",
+        end_date=query.end_date,
+        shape=query.shape(),
+    )
+    return reproject(rows, _columns(args))
+
+
+async def get_top_pages_async(
+    client: AsyncGA4Client,
+    date_range: str = "last_28_days",
+    limit: int = 10,
+    cache: QueryCache | None = None,
+) -> list[dict]:
+    """Get top pages by screen page views on the async client."""
+    args = _top_pages_args(date_range, limit)
+    if not cache:
+        return await client.run_report(**args)
+    query = _report_query(args)
+    rows = await cache.get_or_fetch_async(
+        query.key,
+        lambda: client.run_report(**query.run_args()),
+        api="ga4",
+        summary="top_pages",
+        end_date=query.end_date,
+        shape=query.shape(),
+    )
+    return reproject(rows, _columns(args))
+
+
+async def get_traffic_summary_async(
+    client: AsyncGA4Client,
+    date_range: str = "last_28_days",
+    cache: QueryCache | None = None,
+) -> list[dict]:
+    """Get a traffic summary by session source on the async client."""
+    args = _traffic_summary_args(date_range)
+    if not cache:
+        return await client.run_report(**args)
+    query = _report_query(args)
+    rows = await cache.get_or_fetch_async(
+        query.key,
+        lambda: client.run_report(**query.run_args()),
+        api="ga4",
+        summary="traffic_summary",
+        end_date=query.end_date,
+        shape=query.shape(),
+    )
+    return reproject(rows, _columns(args))
+
+
+def iter_report_async(
+    client: AsyncGA4Client,
+    metrics: str = "sessions,totalUsers",
+    dimensions: str = "date",
+    date_range: str = "last_28_days",
+) -> AsyncIterator[dict]:
+    """Stream every row of a custom GA4 report on the async client."""
+    args = _report_args(metrics, dimensions, date_range, limit=0)
+    return client.iter_report(**_all_rows_args(args))
+
+
+def iter_top_pages_async(
+    client: AsyncGA4Client, date_range: str = "last_28_days"
+) -> AsyncIterator[dict]:
+    """Stream every page's views, sessions, and users on the async client."""
+    args = _top_pages_args(date_range, limit=0)
+    return client.iter_report(**_all_rows_args(args))
+
 
-    return client.run_realtime_report(
-        metrics=metric_list,
-        dimensions=dimension_list,
+async def get_realtime_snapshot_async(
+    client: AsyncGA4Client,
+    metrics: str = "activeUsers",
+    dimensions: str = "",
+    cache: QueryCache | None = None,
+) -> dict:
+    """Run a GA4 realtime report on the async client, returning {"rows", "as_of"}."""
+    args = _realtime_args(metrics, dimensions)
+    if not cache:
+        return _snapshot(await client.run_realtime_report(**args))
+    query = _realtime_query(args)
+
+    async def fetch():
+        return _snapshot(await client.run_realtime_report(**query))
+
+    snapshot = await cache.get_or_fetch_async(
+        cache.make_key("ga4_realtime", query),
+        fetch,
+        api="ga4_realtime",
+        summary=f"realtime {metrics}",
     )
+    return _realtime_view(snapshot, args)
+
+
+async def get_realtime_report_async(
+    client: AsyncGA4Client,
+    metrics: str = "activeUsers",
+    dimensions: str = "",
+    cache: QueryCache | None = None,
+) -> list[dict]:
+    """Run a GA4 realtime report on the async client."""
+    return (await get_realtime_snapshot_async(client, metrics, dimensions, cache))["rows"]
+
+
+def _batch_entry(spec: dict) -> tuple[ReportQuery, str, list[str]]:
+    """Return (query, cache summary, caller's column order) for one batch report spec.
+
+    Queries match the single-report functions, so batch and non-batch calls share
+    cache entries.
+    """
+    kind = spec.get("report", "report")
+    date_range = spec.get("date_range", "last_28_days")
+    limit = spec.get("limit", 10)
+    if kind == "report":
+        metrics = spec.get("metrics", "sessions,totalUsers")
+        args = _report_args(metrics, spec.get("dimensions", "date"), date_range, limit)
+        summary = f"report {metrics}"
+    elif kind == "top_pages":
+        args = _top_pages_args(date_range, limit)
+        summary = "top_pages"
+    elif kind == "traffic_summary":
+        args = _traffic_summary_args(date_range)
+        summary = "traffic_summary"
+    else:
+        raise ValidationError(f"Unknown report type: {kind}")
+    return _report_query(args), summary, _columns(args)
+
+
+class _BatchPlan(NamedTuple):
+    """A batch of report specs resolved into the distinct reports to fetch.
+
+    results holds each spec's fully cached partitions (or None); fetch_args are the
+    run_report kwargs of each distinct report, requests its cache request (when there
+    is a cache), and spans the day partitions and summary of each date-only report.
+    slots pairs each spec not yet answered with its report's position.
+    """
+
+    entries: list[tuple[ReportQuery, str, list[str]]]
+    parts: list[DayPartitions | None]
+    results: list
+    fetch_args: list[dict]
+    requests: list[CacheRequest]
+    spans: dict[int, tuple[DayPartitions, str]]
+    slots: list[tuple[int, int]]
+
+
+def _plan_batch(specs: list[dict], cache: QueryCache | None) -> _BatchPlan:
+    """Collect the distinct reports a batch needs, with their cache requests.
+
+    Date-only reports use the same per-day cache entries as get_report, so only their
+    missing span is requested; every other report is requested under the same key
+    as its single-report function. Equivalent queries are requested once.
+    """
+    if not specs:
+        raise ValidationError("At least one report is required")
+    if len(specs) > GA4_MAX_BATCH_REPORTS:
+        raise ValidationError(f"At most {GA4_MAX_BATCH_REPORTS} reports per batch")
+    entries = [_batch_entry(spec) for spec in specs]
+    plan = _BatchPlan(entries, [None] * len(entries), [None] * len(entries), [], [], {}, [])
+    positions: dict[ReportQuery, int] = {}
+    partitions: dict[ReportQuery, DayPartitions | None] = {}
+    for i, (query, summary, _) in enumerate(entries):
+        if query in positions:
+            plan.parts[i] = partitions.get(query)
+            plan.slots.append((i, positions[query]))
+            continue
+        if cache:
+            partitions[query] = plan.parts[i] = _date_partitions(cache, query)
+        parts = plan.parts[i]
+        if parts is not None and not parts.span:
+            plan.results[i] = parts.rows()[: query.limit]
+            continue
+        positions[query] = len(plan.fetch_args)
+        if parts is not None:
+            plan.spans[positions[query]] = (parts, summary)
+            plan.fetch_args.append(_span_args(query, *parts.span, parts.span_days))
+            plan.requests.append(parts.request(summary))
+        else:
+            plan.fetch_args.append(query.run_args())
+            plan.requests.append(
+                CacheRequest(query.key, "ga4", summary, query.end_date, query.shape())
+            )
+        plan.slots.append((i, positions[query]))
+    return plan
+
+
+def _store_spans(plan: _BatchPlan, positions: list[int], fetched: list) -> list:
+    """Cache each day of the date-only reports among fetched, then return it."""
+    for position, rows in zip(positions, fetched):
+        if position in plan.spans:
+            parts, summary = plan.spans[position]
+            parts.store(rows, _ga4_day, summary)
+    return fetched
+
+
+def _land_batch(plan: _BatchPlan, fetched: list) -> list[list[dict]]:
+    results = plan.results
+    for i, position in plan.slots:
+        query, _, _ = plan.entries[i]
+        parts = plan.parts[i]
+        if parts is None:
+            results[i] = fetched[position]
+            continue
+        if parts.span:
+            parts.fill(fetched[position], _ga4_day)
+        results[i] = parts.rows()[: query.limit]
+    return [reproject(rows, columns) for rows, (_, _, columns) in zip(results, plan.entries)]
+
+
+def batch_reports(
+    client: GA4Client,
+    specs: list[dict],
+    cache: QueryCache | None = None,
+) -> list[list[dict]]:
+    """Run several GA4 reports, sending only the cache misses in one batchRunReports call.
+
+    Each spec has a "report" type (report, top_pages, traffic_summary) plus that
+    report's arguments (metrics, dimensions, date_range, limit). Misses go through
+    the cache's get_or_fetch_many, so they share flights with concurrent single
+    reports and fall back to their last known good results when Google is down.
+    """
+    plan = _plan_batch(specs, cache)
+    if not plan.fetch_args:
+        fetched = []
+    elif not cache:
+        fetched = client.batch_run_reports(plan.fetch_args)
+    else:
+
+        def fetch(positions):
+            rows = client.batch_run_reports([plan.fetch_args[p] for p in positions])
+            return _store_spans(plan, positions, rows)
+
+        fetched = cache.get_or_fetch_many(plan.requests, fetch)
+    return _land_batch(plan, fetched)
+
+
+async def batch_reports_async(
+    client: AsyncGA4Client,
+    specs: list[dict],
+    cache: QueryCache | None = None,
+) -> list[list[dict]]:
+    """Run several GA4 reports in one batchRunReports call on the async client.
+
+    Planning (day partition lookups may read the second tier), storing, and
+    assembling results run on worker threads.
+    """
+    plan = await asyncio.to_thread(_plan_batch, specs, cache)
+    if not plan.fetch_args:
+        fetched = []
+    elif not cache:
+        fetched = await client.batch_run_reports(plan.fetch_args)
+    else:
+
+        async def fetch(positions):
+            rows = await client.batch_run_reports([plan.fetch_args[p] for p in positions])
+            return await asyncio.to_thread(_store_spans, plan, positions, rows)
+
+        fetched = await cache.get_or_fetch_many_async(plan.requests, fetch)
+    return await asyncio.to_thread(_land_batch, plan, fetched)
@@ -0,0 +1,68 @@
+from anny.clients.ga4 import GA4Client
+from anny.clients.memory import MemoryStore
+from anny.clients.search_console import SearchConsoleClient
+from anny.core.cache import QueryCache
+from anny.core.prefetch import PrefetchJob
+from anny.core.services import ga4_service, search_console_service
+
+
+def canonical_jobs(
+    cache: QueryCache,
+    ga4_client: GA4Client | None,
+    sc_client: SearchConsoleClient | None,
+    store: MemoryStore | None = None,
+    date_range: str = "last_28_days",
+    limit: int = 10,
+    watchlist_limit: int = 100,
+) -> list[PrefetchJob]:
+    """Queries to keep warm: the default tool calls, plus page reports for the watchlist.
+
+    Each job uses the same arguments and cache keys as the MCP tool defaults. When the
+    watchlist has pages, top pages are also fetched with watchlist_limit rows; smaller
+    top-pages queries are then sliced from that result.
+    """
+    watching = bool(store and store.list_watchlist())
+    jobs: list[PrefetchJob] = []
+    if ga4_client is not None:
+        jobs += [
+            (
+                "ga4_top_pages",
+                lambda: ga4_service.get_top_pages(ga4_client, date_range, limit, cache),
+            ),
+            (
+                "ga4_traffic_summary",
+                lambda: ga4_service.get_traffic_summary(ga4_client, date_range, cache),
+            ),
+        ]
+        if watching:
+            jobs.append(
+                (
+                    "ga4_watchlist_pages",
+                    lambda: ga4_service.get_top_pages(
+                        ga4_client, date_range, watchlist_limit, cache
+                    ),
+                )
+            )
+    if sc_client is not None:
+        jobs += [
+            (
+                "search_console_summary",
+                lambda: search_console_service.get_performance_summary(
+                    sc_client, date_range, cache
+                ),
+            ),
+            (
+                "search_console_top_queries",
+                lambda: search_console_service.get_top_queries(sc_client, date_range, limit, cache),
+            ),
+        ]
+        if watching:
+            jobs.append(
+                (
+                    "search_console_watchlist_pages",
+                    lambda: search_console_service.get_top_pages(
+                        sc_client, date_range, watchlist_limit, cache
+                    ),
+                )
+            )
+    return jobs
@@ -1,7 +1,66 @@
+from collections.abc import Iterator
+
 from anny.clients.search_console import SearchConsoleClient
 from anny.core.cache import QueryCache
 from anny.core.date_utils import parse_date_range
 from anny.core.exceptions import ValidationError
+from anny.core.partitions import DayPartitions, partitionable
+from anny.core.query import ReportQuery, reproject
+
+
+def _parse_dates(date_range: str) -> tuple[str, str]:
+    try:
+        return parse_date_range(date_range)
+    except ValueError as exc:
+        raise ValidationError(str(exc)) from exc
+
+
+def _cached_query(
+    client: SearchConsoleClient,
+    cache: QueryCache | None,
+    dimensions: list[str],
+    start_date: str,
+    end_date: str,
+    row_limit: int,
+    summary: str,
+) -> list[dict]:
+    """Run client.query, coalescing concurrent identical misses via the cache.
+
+    Queries are cached in canonical dimension order and reprojected to the caller's.
+    Search Console returns dimension rows sorted by clicks, descending, so a cached
+    query with the same dimensions and dates and a larger row limit answers a smaller
+    one (e.g. top_queries with limit 10 from search_analytics "query" with limit 100).
+    """
+    if not cache:
+        return client.query(
+            start_date=start_date,
+            end_date=end_date,
+            dimensions=dimensions or None,
+            row_limit=row_limit,
+        )
+    query = ReportQuery.build(
+        "search_console",
+        (),
+        dimensions,
+        start_date,
+        end_date,
+        row_limit,
+        order_by="clicks" if dimensions else "",
+    )
+    rows = cache.get_or_fetch(
+        query.key,
+        lambda: client.query(
+            start_date=query.start_date,
+            end_date=query.end_date,
+            dimensions=list(query.dimensions) or None,
+            row_limit=query.limit,
+        ),
+        api="search_console",
+        summary=summary,
+        end_date=query.end_date,
+        shape=query.shape() if dimensions else None,
+    )
+    return reproject(rows, dimensions)
 
 
 def get_search_analytics(
@@ -11,40 +70,55 @@ def get_search_analytics(
     row_limit: int = 10,
     cache: QueryCache | None = None,
 ) -> list[dict]:
-    """Run a custom Search Console query."""
+    """Run a custom Search Console query.
+
+    With a cache, date-only queries over up to MAX_PARTITION_DAYS are assembled from
+    per-day partitions and only the days missing from the cache are fetched.
+    """
     dimension_list = [d.strip() for d in dimensions.split(",") if d.strip()]
     if not dimension_list:
         raise ValidationError("At least one dimension is required")
-    try:
-        start_date, end_date = parse_date_range(date_range)
-    except ValueError as exc:
-        raise ValidationError(str(exc)) from exc
-
-    if cache:
-        key = cache.make_key(
-            "sc_query",
-            {
-                "dimensions": dimension_list,
-                "start": start_date,
-                "end": end_date,
-                "limit": row_limit,
-            },
-        )
-        cached = cache.get(key)
-        if cached is not None:
-            return cached
-
-    rows = client.query(
-        start_date=start_date,
-        end_date=end_date,
-        dimensions=dimension_list,
-        row_limit=row_limit,
+    start_date, end_date = _parse_dates(date_range)
+
+    if cache and dimension_list == ["date"] and partitionable(start_date, end_date):
+        parts = DayPartitions(cache, "sc_query_day", {}, start_date, end_date, api="search_console")
+        if parts.span:
+            parts.fetch(
+                lambda start, end, days: client.query(
+                    start_date=start, end_date=end, dimensions=["date"], row_limit=days
+                ),
+                lambda row: row["date"],
+                summary="query date",
+            )
+        # Search Console sorts date rows ascending, which is the partition order
+        return parts.rows()[:row_limit]
+
+    return _cached_query(
+        client,
+        cache,
+        dimension_list,
+        start_date,
+        end_date,
+        row_limit,
+        summary=f"query {dimensions}",
     )
 
-    if cache:
-        cache.put(key, rows, api="search_console", summary=f"query {dimensions}")
 
-    return rows
+def iter_search_analytics(
+    client: SearchConsoleClient,
+    dimensions: str = "query",
+    date_range: str = "last_28_days",
+) -> Iterator[list[dict]]:
+    """Stream every row of a Search Console query as 25,000-row pages.
+
+    Inputs are validated before the first page is requested. The next page is
+    prefetched while the current one is consumed. All-rows results are not cached.
+    """
+    dimension_list = [d.strip() for d in dimensions.split(",") if d.strip()]
+    if not dimension_list:
+        raise ValidationError("At least one dimension is required")
+    start_date, end_date = _parse_dates(date_range)
+    return client.iter_query_pages(start_date, end_date, dimension_list)
 
 
 def get_top_queries(
@@ -54,31 +128,18 @@ def get_top_queries(
     cache: QueryCache | None = None,
 ) -> list[dict]:
     """Get top search queries by clicks."""
-    try:
-        start_date, end_date = parse_date_range(date_range)
-    except ValueError as exc:
-        raise ValidationError(str(exc)) from exc
-
-    if cache:
-        key = cache.make_key(
-            "sc_top_queries", {"start": start_date, "end": end_date, "limit": limit}
-        )
-        cached = cache.get(key)
-        if cached is not None:
-            return cached
-
-    rows = client.query(
-        start_date=start_date,
-        end_date=end_date,
-        dimensions=["query"],
-        row_limit=limit,
+    start_date, end_date = _parse_dates(date_range)
+
+    return _cached_query(
+        client,
+        cache,
+        ["query"],
+        start_date,
+        end_date,
+        limit,
+        summary="top_queries",
     )
 
-    if cache:
-        cache.put(key, rows, api="search_console", summary="top_queries")
-
-    return rows
-
 
 def get_top_pages(
     client: SearchConsoleClient,
@@ -87,29 +148,18 @@ def get_top_pages(
     cache: QueryCache | None = None,
 ) -> list[dict]:
     """Get top pages by clicks."""
-    try:
-        start_date, end_date = parse_date_range(date_range)
-    except ValueError as exc:
-        raise ValidationError(str(exc)) from exc
-
-    if cache:
-        key = cache.make_key("sc_top_pages", {"start": start_date, "end": end_date, "limit": limit})
-        cached = cache.get(key)
-        if cached is not None:
-            return cached
-
-    rows = client.query(
-        start_date=start_date,
-        end_date=end_date,
-        dimensions=["page"],
-        row_limit=limit,
+    start_date, end_date = _parse_dates(date_range)
+
+    return _cached_query(
+        client,
+        cache,
+        ["page"],
+        start_date,
+        end_date,
+        limit,
+        summary="top_pages",
     )
 
-    if cache:
-        cache.put(key, rows, api="search_console", summary="top_pages")
-
-    return rows
-
 
 def get_performance_summary(
     client: SearchConsoleClient,
@@ -117,29 +167,18 @@ def get_performance_summary(
     cache: QueryCache | None = None,
 ) -> list[dict]:
     """Get overall performance summary (no dimension breakdown)."""
-    try:
-        start_date, end_date = parse_date_range(date_range)
-    except ValueError as exc:
-        raise ValidationError(str(exc)) from exc
-
-    if cache:
-        key = cache.make_key("sc_summary", {"start": start_date, "end": end_date})
-        cached = cache.get(key)
-        if cached is not None:
-            return cached
-
-    rows = client.query(
-        start_date=start_date,
-        end_date=end_date,
-        dimensions=None,
-        row_limit=1,
+    start_date, end_date = _parse_dates(date_range)
+
+    return _cached_query(
+        client,
+        cache,
+        [],
+        start_date,
+        end_date,
+        1,
+        summary="performance_summary",
     )
 
-    if cache:
-        cache.put(key, rows, api="search_console", summary="performance_summary")
-
-    return rows
-
 
 def get_sitemaps(client: SearchConsoleClient) -> list[dict]:
     """List all sitemaps for the site."""
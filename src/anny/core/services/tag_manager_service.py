@@ -1,4 +1,5 @@
 from anny.clients.tag_manager import TagManagerClient
+from anny.core.cache import QueryCache
 
 
 def get_accounts(client: TagManagerClient) -> list[dict]:
@@ -26,11 +27,23 @@ def get_variables(client: TagManagerClient, container_path: str) -> list[dict]:
     return client.list_variables(container_path)
 
 
-def get_container_setup(client: TagManagerClient, container_path: str) -> dict:
-    """Get a summary of a container's tags, triggers, and variables."""
-    tags = client.list_tags(container_path)
-    triggers = client.list_triggers(container_path)
-    variables = client.list_variables(container_path)
+def get_container_setup(
+    client: TagManagerClient, container_path: str, cache: QueryCache | None = None
+) -> dict:
+    """Get a summary of a container's tags, triggers, and variables.
+
+    The three lists are fetched in one batched HTTP call.
+    """
+    if cache:
+        results = cache.get_or_fetch(
+            cache.make_key("gtm_container_setup", {"container": container_path}),
+            lambda: client.list_container_setup(container_path),
+            api="tag_manager",
+            summary="container_setup",
+        )
+    else:
+        results = client.list_container_setup(container_path)
+    tags, triggers, variables = results["tags"], results["triggers"], results["variables"]
 
     return {
         "tags": tags,
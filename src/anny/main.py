@@ -2,6 +2,7 @@ import logging
 import os
 import time
 from collections import defaultdict
+from contextlib import asynccontextmanager
 
 import sentry_sdk
 from fastapi import FastAPI, Request
@@ -13,10 +14,12 @@ from anny.api.error_handlers import anny_error_handler
 from anny.api.export_routes import router as export_router
 from anny.api.ga4_routes import router as ga4_router
 from anny.api.logs_routes import router as logs_router
+from anny.api.runtime_routes import router as runtime_router
 from anny.api.search_console_routes import router as sc_router
 from anny.api.tag_manager_routes import router as gtm_router
+from anny.core.cache import track_stale
 from anny.core.config import settings
-from anny.core.dependencies import verify_mcp_bearer_token
+from anny.core.dependencies import get_prefetcher, verify_mcp_bearer_token
 from anny.core.exceptions import AnnyError
 from anny.core.logging import new_request_id, set_request_id, setup_logging
 from anny.mcp_server import mcp
@@ -36,7 +39,23 @@ if settings.anny_api_key:
     logger.info("MCP HTTP auth enabled (Bearer token)")
 
 mcp_app = mcp.http_app(path="/")
-app = FastAPI(title="Anny", version=settings.app_version, lifespan=mcp_app.lifespan)
+
+
+@asynccontextmanager
+async def lifespan(app_: FastAPI):
+    """Run the MCP app's lifespan and, when enabled, the cache prefetcher."""
+    prefetcher = get_prefetcher() if settings.prefetch_enabled else None
+    if prefetcher is not None:
+        prefetcher.start()
+    try:
+        async with mcp_app.lifespan(app_):
+            yield
+    finally:
+        if prefetcher is not None:
+            prefetcher.stop()
+
+
+app = FastAPI(title="Anny", version=settings.app_version, lifespan=lifespan)
 logger.info("Anny v%s starting", settings.app_version)
 
 # --- CORS middleware (restrictive defaults) ---
@@ -56,6 +75,7 @@ app.include_router(gtm_router)
 app.include_router(logs_router)
 app.include_router(cache_router)
 app.include_router(export_router)
+app.include_router(runtime_router)
 
 app.mount("/mcp", mcp_app)
 
@@ -73,6 +93,18 @@ async def request_id_middleware(request: Request, call_next):
         set_request_id("")
 
 
+# --- Stale-response flag ---
+@app.middleware("http")
+async def stale_response_middleware(request: Request, call_next):
+    """Flag responses containing results served from cache while Google was unavailable."""
+    with track_stale() as stale:
+        response = await call_next(request)
+    if stale:
+        response.headers["Warning"] = '110 anny "Response is Stale"'
+        response.headers["X-Anny-Stale"] = "true"
+    return response
+
+
 # --- Request logging middleware ---
 @app.middleware("http")
 async def request_logging_middleware(request: Request, call_next):
@@ -1,9 +1,14 @@
+import functools
+
 from fastmcp import FastMCP
 
+from anny.core.cache import track_stale
 from anny.core.dependencies import (
-    get_ga4_client,
+    get_async_ga4_client,
+    get_blocking_executor,
     get_memory_store,
     get_query_cache,
+    get_realtime_cache,
     get_search_console_client,
     get_tag_manager_client,
 )
@@ -20,6 +25,20 @@ from anny.core.services import (
 
 mcp = FastMCP("Anny")
 
+_STALE_NOTE = "Note: Google is unavailable; some results are the last cached copy and may be stale."
+
+
+def _flag_stale(tool):
+    """Append _STALE_NOTE to an async tool's output when the cache served a fallback."""
+
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        with track_stale() as stale:
+            text = await tool(*args, **kwargs)
+        return f"{text}\n\n{_STALE_NOTE}" if stale else text
+
+    return wrapper
+
 
 @mcp.tool()
 def ping() -> str:
@@ -28,7 +47,8 @@ def ping() -> str:
 
 
 @mcp.tool()
-def ga4_report(
+@_flag_stale
+async def ga4_report(
     metrics: str = "sessions,totalUsers",
     dimensions: str = "date",
     date_range: str = "last_28_days",
@@ -43,17 +63,20 @@ def ga4_report(
         limit: Max rows to return (1-100)
     """
     limit = max(1, min(limit, MAX_LIMIT))
-    client = get_ga4_client()
+    client = get_async_ga4_client()
     cache = get_query_cache()
     try:
-        rows = ga4_service.get_report(client, metrics, dimensions, date_range, limit, cache=cache)
+        rows = await ga4_service.get_report_async(
+            client, metrics, dimensions, date_range, limit, cache=cache
+        )
     except (ValidationError, ValueError) as exc:
         return f"Invalid input: {exc}"
     return format_table(rows)
 
 
 @mcp.tool()
-def ga4_top_pages(date_range: str = "last_28_days", limit: int = 10) -> str:
+@_flag_stale
+async def ga4_top_pages(date_range: str = "last_28_days", limit: int = 10) -> str:
     """Get the top pages by page views from Google Analytics 4.
 
     Args:
@@ -61,33 +84,62 @@ def ga4_top_pages(date_range: str = "last_28_days", limit: int = 10) -> str:
         limit: Max rows to return (1-100)
     """
     limit = max(1, min(limit, MAX_LIMIT))
-    client = get_ga4_client()
+    client = get_async_ga4_client()
     cache = get_query_cache()
     try:
-        rows = ga4_service.get_top_pages(client, date_range, limit, cache=cache)
+        rows = await ga4_service.get_top_pages_async(client, date_range, limit, cache=cache)
     except (ValidationError, ValueError) as exc:
         return f"Invalid input: {exc}"
     return format_table(rows)
 
 
 @mcp.tool()
-def ga4_traffic_summary(date_range: str = "last_28_days") -> str:
+@_flag_stale
+async def ga4_traffic_summary(date_range: str = "last_28_days") -> str:
     """Get a traffic summary by source from Google Analytics 4.
 
     Args:
         date_range: Named range (last_7_days, last_28_days, last_90_days) or YYYY-MM-DD,YYYY-MM-DD
     """
-    client = get_ga4_client()
+    client = get_async_ga4_client()
     cache = get_query_cache()
     try:
-        rows = ga4_service.get_traffic_summary(client, date_range, cache=cache)
+        rows = await ga4_service.get_traffic_summary_async(client, date_range, cache=cache)
     except (ValidationError, ValueError) as exc:
         return f"Invalid input: {exc}"
     return format_table(rows)
 
 
 @mcp.tool()
-def ga4_realtime(
+@_flag_stale
+async def ga4_batch(reports: list[dict]) -> str:
+    """Run up to five Google Analytics 4 reports in one request.
+
+    Args:
+        reports: List of report specs. Each has "report" (report, top_pages, or
+            traffic_summary), "date_range", and optionally "limit" (1-100); custom
+            "report" specs also take "metrics" and "dimensions" (comma-separated)
+    """
+    client = get_async_ga4_client()
+    cache = get_query_cache()
+    try:
+        specs = [
+            {**spec, "limit": max(1, min(int(spec.get("limit", 10)), MAX_LIMIT))}
+            for spec in reports
+        ]
+        results = await ga4_service.batch_reports_async(client, specs, cache=cache)
+    except (ValidationError, ValueError) as exc:
+        return f"Invalid input: {exc}"
+    parts = []
+    for spec, rows in zip(specs, results):
+        parts.append(f"{spec.get('report', 'report')} ({len(rows)} rows):")
+        parts.append(format_table(rows))
+        parts.append("")
+    return "\n".join(parts).rstrip()
+
+
+@mcp.tool()
+async def ga4_realtime(
     metrics: str = "activeUsers",
     dimensions: str = "",
 ) -> str:
@@ -97,19 +149,23 @@ def ga4_realtime(
         metrics: Comma-separated GA4 realtime metrics (e.g. activeUsers,screenPageViews)
         dimensions: Comma-separated dimensions (e.g. unifiedScreenName,country) — optional
     """
-    client = get_ga4_client()
+    client = get_async_ga4_client()
+    cache = get_realtime_cache()
     try:
-        rows = ga4_service.get_realtime_report(client, metrics, dimensions)
+        snapshot = await ga4_service.get_realtime_snapshot_async(
+            client, metrics, dimensions, cache=cache
+        )
     except (ValidationError, ValueError) as exc:
         return f"Invalid input: {exc}"
-    return format_table(rows)
+    return f"{format_table(snapshot['rows'])}\n\nAs of {snapshot['as_of']}"
 
 
 # --- Search Console Tools ---
 
 
 @mcp.tool()
-def search_console_query(
+@_flag_stale
+async def search_console_query(
     dimensions: str = "query",
     date_range: str = "last_28_days",
     row_limit: int = 10,
@@ -123,10 +179,16 @@ def search_console_query(
     """
     row_limit = max(1, min(row_limit, MAX_ROW_LIMIT))
     client = get_search_console_client()
+    executor = get_blocking_executor()
     cache = get_query_cache()
     try:
-        rows = search_console_service.get_search_analytics(
-            client, dimensions, date_range, row_limit, cache=cache
+        rows = await executor.run(
+            search_console_service.get_search_analytics,
+            client,
+            dimensions,
+            date_range,
+            row_limit,
+            cache=cache,
         )
     except (ValidationError, ValueError) as exc:
         return f"Invalid input: {exc}"
@@ -134,7 +196,8 @@ def search_console_query(
 
 
 @mcp.tool()
-def search_console_top_queries(date_range: str = "last_28_days", limit: int = 10) -> str:
+@_flag_stale
+async def search_console_top_queries(date_range: str = "last_28_days", limit: int = 10) -> str:
     """Get top search queries from Google Search Console.
 
     Args:
@@ -143,16 +206,20 @@ def search_console_top_queries(date_range: str = "last_28_days", limit: int = 10
     """
     limit = max(1, min(limit, MAX_LIMIT))
     client = get_search_console_client()
+    executor = get_blocking_executor()
     cache = get_query_cache()
     try:
-        rows = search_console_service.get_top_queries(client, date_range, limit, cache=cache)
+        rows = await executor.run(
+            search_console_service.get_top_queries, client, date_range, limit, cache=cache
+        )
     except (ValidationError, ValueError) as exc:
         return f"Invalid input: {exc}"
     return format_table(rows)
 
 
 @mcp.tool()
-def search_console_top_pages(date_range: str = "last_28_days", limit: int = 10) -> str:
+@_flag_stale
+async def search_console_top_pages(date_range: str = "last_28_days", limit: int = 10) -> str:
     """Get top pages from Google Search Console by clicks.
 
     Args:
@@ -161,47 +228,56 @@ def search_console_top_pages(date_range: str = "last_28_days", limit: int = 10)
     """
     limit = max(1, min(limit, MAX_LIMIT))
     client = get_search_console_client()
+    executor = get_blocking_executor()
     cache = get_query_cache()
     try:
-        rows = search_console_service.get_top_pages(client, date_range, limit, cache=cache)
+        rows = await executor.run(
+            search_console_service.get_top_pages, client, date_range, limit, cache=cache
+        )
     except (ValidationError, ValueError) as exc:
         return f"Invalid input: {exc}"
     return format_table(rows)
 
 
 @mcp.tool()
-def search_console_summary(date_range: str = "last_28_days") -> str:
+@_flag_stale
+async def search_console_summary(date_range: str = "last_28_days") -> str:
     """Get overall search performance summary from Google Search Console.
 
     Args:
         date_range: Named range (last_7_days, last_28_days, last_90_days) or YYYY-MM-DD,YYYY-MM-DD
     """
     client = get_search_console_client()
+    executor = get_blocking_executor()
     cache = get_query_cache()
     try:
-        rows = search_console_service.get_performance_summary(client, date_range, cache=cache)
+        rows = await executor.run(
+            search_console_service.get_performance_summary, client, date_range, cache=cache
+        )
     except (ValidationError, ValueError) as exc:
         return f"Invalid input: {exc}"
     return format_table(rows)
 
 
 @mcp.tool()
-def search_console_sitemaps() -> str:
+async def search_console_sitemaps() -> str:
     """List all sitemaps submitted to Google Search Console."""
     client = get_search_console_client()
-    rows = search_console_service.get_sitemaps(client)
+    executor = get_blocking_executor()
+    rows = await executor.run(search_console_service.get_sitemaps, client)
     return format_table(rows)
 
 
 @mcp.tool()
-def search_console_sitemap_details(feedpath: str) -> str:
+async def search_console_sitemap_details(feedpath: str) -> str:
     """Get details for a specific sitemap from Google Search Console.
 
     Args:
         feedpath: The sitemap URL (e.g. "https://example.com/sitemap.xml")
     """
     client = get_search_console_client()
-    details = search_console_service.get_sitemap_details(client, feedpath)
+    executor = get_blocking_executor()
+    details = await executor.run(search_console_service.get_sitemap_details, client, feedpath)
     parts = [
         f"Path: {details['path']}",
         f"Type: {details['type']}",
@@ -219,15 +295,39 @@ def search_console_sitemap_details(feedpath: str) -> str:
 # --- Cache Tools ---
 
 
+def _cache_summary(label: str, status: dict) -> list[str]:
+    ratio = status["hit_ratio"]
+    return [
+        f"{label}: {status['active_entries']}/{status['max_entries']} active entries, "
+        f"TTL {status['ttl_seconds']}s",
+        f"Hits: {status['hits']}, misses: {status['misses']}, hit ratio: "
+        + ("n/a" if ratio is None else f"{ratio:.1%}"),
+    ]
+
+
 @mcp.tool()
 def cache_status() -> str:
-    """Get the status of the query cache (entries, TTL, capacity)."""
-    cache = get_query_cache()
-    status = cache_service.get_cache_status(cache)
-    return (
-        f"Cache: {status['active_entries']}/{status['max_entries']} active entries, "
-        f"TTL {status['ttl_seconds']}s"
-    )
+    """Get the status of the query and realtime caches (entries, TTL, hit ratio by API)."""
+    status = cache_service.get_cache_status(get_query_cache(), get_realtime_cache())
+    realtime = status["realtime"]
+    parts = _cache_summary("Cache", status) + _cache_summary("Realtime cache", realtime)
+    by_api = {**status["by_api"], **realtime["by_api"]}
+    if by_api:
+        rows = [
+            {
+                "api": api,
+                "hits": stats["hits"],
+                "misses": stats["misses"],
+                "stale": stats["stale_served"],
+                "evictions": stats["evictions"],
+                "expirations": stats["expirations"],
+                "bytes": stats["bytes"],
+                "saved_s": stats["fetch_seconds_saved"],
+            }
+            for api, stats in by_api.items()
+        ]
+        parts.append(f"\n{format_table(rows)}")
+    return "\n".join(parts)
 
 
 @mcp.tool()
@@ -242,34 +342,41 @@ def clear_cache() -> str:
 
 
 @mcp.tool()
-def gtm_list_accounts() -> str:
+async def gtm_list_accounts() -> str:
     """List all Google Tag Manager accounts accessible by the service account."""
     client = get_tag_manager_client()
-    rows = tag_manager_service.get_accounts(client)
+    executor = get_blocking_executor()
+    rows = await executor.run(tag_manager_service.get_accounts, client)
     return format_table(rows)
 
 
 @mcp.tool()
-def gtm_list_containers(account_id: str) -> str:
+async def gtm_list_containers(account_id: str) -> str:
     """List containers for a Google Tag Manager account.
 
     Args:
         account_id: The GTM account ID (e.g. "123456")
     """
     client = get_tag_manager_client()
-    rows = tag_manager_service.get_containers(client, account_id)
+    executor = get_blocking_executor()
+    rows = await executor.run(tag_manager_service.get_containers, client, account_id)
     return format_table(rows)
 
 
 @mcp.tool()
-def gtm_container_setup(container_path: str) -> str:
+@_flag_stale
+async def gtm_container_setup(container_path: str) -> str:
     """Get a summary of tags, triggers, and variables in a GTM container.
 
     Args:
         container_path: The GTM container path (e.g. "accounts/123/containers/456")
     """
     client = get_tag_manager_client()
-    setup = tag_manager_service.get_container_setup(client, container_path)
+    executor = get_blocking_executor()
+    cache = get_query_cache()
+    setup = await executor.run(
+        tag_manager_service.get_container_setup, client, container_path, cache
+    )
     parts = [
         f"Tags ({setup['tag_count']}):",
         format_table(setup["tags"]) if setup["tags"] else "  (none)",
@@ -284,14 +391,15 @@ def gtm_container_setup(container_path: str) -> str:
 
 
 @mcp.tool()
-def gtm_list_tags(container_path: str) -> str:
+async def gtm_list_tags(container_path: str) -> str:
     """List all tags in a GTM container.
 
     Args:
         container_path: The GTM container path (e.g. "accounts/123/containers/456")
     """
     client = get_tag_manager_client()
-    rows = tag_manager_service.get_tags(client, container_path)
+    executor = get_blocking_executor()
+    rows = await executor.run(tag_manager_service.get_tags, client, container_path)
     return format_table(rows)
 
 
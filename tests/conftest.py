@@ -1,7 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 
-from anny.core.dependencies import get_query_cache, verify_api_key
+from anny.core.dependencies import get_query_cache, get_realtime_cache, verify_api_key
 from anny.core.logging import set_request_id
 from anny.main import _rate_limit_store, app
 
@@ -14,10 +14,12 @@ def _clear_rate_limit_store():
 
 @pytest.fixture(autouse=True)
 def _clear_query_cache():
-    """Clear cached QueryCache singleton between tests to prevent MagicMock leaks."""
+    """Clear cached QueryCache singletons between tests to prevent MagicMock leaks."""
     get_query_cache.cache_clear()
+    get_realtime_cache.cache_clear()
     yield
     get_query_cache.cache_clear()
+    get_realtime_cache.cache_clear()
 
 
 @pytest.fixture(autouse=True)
@@ -4,15 +4,16 @@ These tests verify the full request flow from HTTP endpoint through
 service layer to (mocked) client, without hitting real Google APIs.
 """
 
+from datetime import datetime, timezone
 from unittest.mock import MagicMock
 
 from fastapi.testclient import TestClient
 
-from anny.clients.ga4 import GA4Client
+from anny.clients.ga4 import AsyncGA4Client
 from anny.clients.search_console import SearchConsoleClient
 from anny.clients.tag_manager import TagManagerClient
 from anny.core.dependencies import (
-    get_ga4_client,
+    get_async_ga4_client,
     get_search_console_client,
     get_tag_manager_client,
     verify_api_key,
@@ -22,8 +23,8 @@ from anny.main import app
 
 class TestGA4FullStack:  # pylint: disable=attribute-defined-outside-init
     def setup_method(self):
-        self.mock_client = MagicMock(spec=GA4Client)
-        app.dependency_overrides[get_ga4_client] = lambda: self.mock_client
+        self.mock_client = MagicMock(spec=AsyncGA4Client)
+        app.dependency_overrides[get_async_ga4_client] = lambda: self.mock_client
         app.dependency_overrides[verify_api_key] = lambda: None
         self.tc = TestClient(app)
 
@@ -31,8 +32,9 @@ class TestGA4FullStack:  # pylint: disable=attribute-defined-outside-init
         app.dependency_overrides.clear()
 
     def test_report_flow(self):
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
         self.mock_client.run_report.return_value = [
-            {"date": "2024-01-01", "sessions": "500", "totalUsers": "200"}
+            {"date": today, "sessions": "500", "totalUsers": "200"}
         ]
         response = self.tc.post(
             "/api/ga4/report",
@@ -146,13 +148,11 @@ class TestTagManagerFullStack:  # pylint: disable=attribute-defined-outside-init
         assert response.json()["count"] == 1
 
     def test_container_setup_flow(self):
-        self.mock_client.list_tags.return_value = [{"tagId": "1", "name": "GA4", "type": "gaawc"}]
-        self.mock_client.list_triggers.return_value = [
-            {"triggerId": "1", "name": "All Pages", "type": "pageview"}
-        ]
-        self.mock_client.list_variables.return_value = [
-            {"variableId": "1", "name": "URL", "type": "u"}
-        ]
+        self.mock_client.list_container_setup.return_value = {
+            "tags": [{"tagId": "1", "name": "GA4", "type": "gaawc"}],
+            "triggers": [{"triggerId": "1", "name": "All Pages", "type": "pageview"}],
+            "variables": [{"variableId": "1", "name": "URL", "type": "u"}],
+        }
 
         response = self.tc.get(
             "/api/tag-manager/container-setup?container_path=accounts/123/containers/456"
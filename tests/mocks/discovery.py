@@ -0,0 +1,33 @@
+from googleapiclient.errors import HttpError
+
+
+class FakeBatch:
+    """Stand-in for BatchHttpRequest that executes each added request in order.
+
+    Records every batch created so tests can count HTTP round trips.
+    """
+
+    created: list["FakeBatch"] = []
+
+    def __init__(self, callback=None):
+        self._callback = callback
+        self.requests: list[tuple[str, object]] = []
+        FakeBatch.created.append(self)
+
+    def add(self, request, callback=None, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self, http=None):  # pylint: disable=unused-argument
+        for request_id, request in self.requests:
+            try:
+                response, exception = request.execute(), None
+            except HttpError as exc:
+                response, exception = None, exc
+            self._callback(request_id, response, exception)
+
+
+def use_fake_batches(service):
+    """Make service.new_batch_http_request() return FakeBatch objects."""
+    FakeBatch.created = []
+    service.new_batch_http_request.side_effect = lambda callback=None: FakeBatch(callback)
+    return FakeBatch.created
@@ -0,0 +1,98 @@
+import fnmatch
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            self.wfile.write(self.server.fake.execute(args))
+
+    def _read_command(self) -> list[bytes] | None:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeRedisServer:
+    """In-process RESP server implementing the handful of commands RedisBackend uses.
+
+    Use as a context manager; url points at the listening socket.
+    """
+
+    def __init__(self, password: str | None = None):
+        self.password = password
+        self.data: dict[bytes, tuple[bytes, float | None]] = {}
+        self.commands: list[list[bytes]] = []
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.fake = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}{host}:{port}/0"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _live(self, key: bytes) -> bytes | None:
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, args: list[bytes]) -> bytes:
+        with self._lock:
+            self.commands.append(args)
+            name = args[0].upper()
+            if name == b"PING":
+                return b"+PONG\r\n"
+            if name == b"AUTH":
+                if args[-1].decode() != self.password:
+                    return b"-WRONGPASS invalid password\r\n"
+                return b"+OK\r\n"
+            if name == b"SELECT":
+                return b"+OK\r\n"
+            if name == b"GET":
+                value = self._live(args[1])
+                return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+            if name == b"SET":
+                expires = None
+                if len(args) == 5 and args[3].upper() == b"PX":
+                    expires = time.time() + int(args[4]) / 1000
+                self.data[args[1]] = (args[2], expires)
+                return b"+OK\r\n"
+            if name == b"DEL":
+                removed = sum(1 for key in args[1:] if self.data.pop(key, None) is not None)
+                return b":%d\r\n" % removed
+            if name == b"SCAN":
+                pattern = args[args.index(b"MATCH") + 1].decode()
+                keys = [k for k in list(self.data) if fnmatch.fnmatchcase(k.decode(), pattern)]
+                body = b"".join(b"$%d\r\n%s\r\n" % (len(k), k) for k in keys)
+                return b"*2\r\n$1\r\n0\r\n*%d\r\n%s" % (len(keys), body)
+            return b"-ERR unknown command\r\n"
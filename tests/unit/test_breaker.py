@@ -0,0 +1,97 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from google.api_core.exceptions import InvalidArgument, ServiceUnavailable
+from googleapiclient.errors import HttpError
+
+from anny.core.breaker import CircuitBreaker, error_status, is_deterministic
+from anny.core.exceptions import APIError, CircuitOpenError
+
+
+def _http_error(status):
+    return HttpError(MagicMock(status=status, reason="error"), b"{}")
+
+
+def _api_error(cause):
+    try:
+        raise APIError("call failed", service="ga4") from cause
+    except APIError as exc:
+        return exc
+
+
+def test_error_status_reads_google_errors_behind_api_error():
+    assert error_status(_api_error(InvalidArgument("bad metric"))) == 400
+    assert error_status(_api_error(_http_error(503))) == 503
+    assert error_status(APIError("no cause")) is None
+    assert error_status(OSError("reset")) is None
+
+
+def test_is_deterministic():
+    assert is_deterministic(_api_error(InvalidArgument("bad metric")))
+    assert is_deterministic(_api_error(_http_error(403)))
+    assert not is_deterministic(_api_error(_http_error(429)))
+    assert not is_deterministic(_api_error(ServiceUnavailable("down")))
+    assert not is_deterministic(OSError("reset"))
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("ga4", failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record(ServiceUnavailable("down"))
+    assert breaker.state == "closed"
+
+    breaker.record(ServiceUnavailable("down"))
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_call()
+    assert info.value.service == "ga4"
+    assert 29 <= info.value.retry_after <= 30
+    assert breaker.status()["rejected"] == 1
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker("ga4", failure_threshold=2)
+    breaker.record(ServiceUnavailable("down"))
+    breaker.record()
+    breaker.record(ServiceUnavailable("down"))
+
+    assert breaker.state == "closed"
+
+
+def test_deterministic_errors_do_not_open():
+    breaker = CircuitBreaker("ga4", failure_threshold=1)
+    breaker.record(InvalidArgument("bad metric"))
+
+    assert breaker.state == "closed"
+
+
+def test_half_open_trial_success_closes():
+    breaker = CircuitBreaker("search_console", failure_threshold=1, reset_timeout=0.05)
+    breaker.record(_http_error(503))
+    time.sleep(0.06)
+
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # one trial at a time
+    breaker.record()
+
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_half_open_trial_failure_reopens():
+    breaker = CircuitBreaker("search_console", failure_threshold=5, reset_timeout=0.05)
+    for _ in range(5):
+        breaker.record(_http_error(500))
+    time.sleep(0.06)
+
+    breaker.before_call()
+    breaker.record(_http_error(500))
+
+    status = breaker.status()
+    assert status["state"] == "open"
+    assert status["opens"] == 2
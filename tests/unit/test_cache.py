@@ -1,7 +1,19 @@
+import asyncio
+import contextvars
 import threading
 import time
+import zlib
 
-from anny.core.cache import QueryCache
+import pytest
+from google.api_core.exceptions import InvalidArgument, ServiceUnavailable
+
+from anny.core.cache import QueryCache, Shape, measure_size, set_refresh_lead, track_stale
+from anny.core.cache_backends import CachedRecord, SQLiteBackend
+from anny.core.cache_policy import FreshnessRule, TTLPolicy
+from anny.core.exceptions import APIError, CircuitOpenError
+from anny.core.executor import BlockingExecutor
+from anny.core.quota import Priority, get_priority
+from anny.core.resultset import ResultSet
 
 
 def test_make_key_deterministic():
@@ -16,6 +28,13 @@ def test_make_key_different_params():
     assert k1 != k2
 
 
+def test_make_key_includes_schema_version(monkeypatch):
+    key = QueryCache.make_key("ga4", {"metrics": "sessions"})
+    monkeypatch.setattr("anny.core.cache.CACHE_SCHEMA_VERSION", 1)
+
+    assert QueryCache.make_key("ga4", {"metrics": "sessions"}) != key
+
+
 def test_put_and_get():
     cache = QueryCache(ttl=60)
     key = "test-key"
@@ -47,6 +66,86 @@ def test_eviction_when_full():
     assert cache.get("k1") is None
 
 
+def test_get_refreshes_lru_position():
+    cache = QueryCache(ttl=60, max_entries=2)
+    cache.put("k1", "v1")
+    cache.put("k2", "v2")
+    cache.get("k1")
+    cache.put("k3", "v3")
+    assert cache.get("k1") == "v1"
+    assert cache.get("k2") is None
+    assert cache.status()["evictions"] == 1
+
+
+def test_measure_size_counts_nested_rows():
+    small = measure_size([{"page": "/"}])
+    large = measure_size([{"page": f"/page/{i}", "views": i * 1000} for i in range(100)])
+    assert 0 < small < large
+    assert large > 100 * 100
+
+
+def test_byte_budget_evicts_least_recently_used():
+    row = [{"page": f"/page/{i}", "views": str(i)} for i in range(50)]
+    size = measure_size(row)
+    cache = QueryCache(ttl=60, max_entries=100, max_bytes=int(size * 2.5))
+    cache.put("k1", row)
+    cache.put("k2", [dict(r) for r in row])
+    cache.put("k3", [dict(r) for r in row])
+
+    status = cache.status()
+    assert cache.get("k1") is None
+    assert cache.get("k3") is not None
+    assert status["total_bytes"] <= status["max_bytes"]
+    assert status["evictions"] == 1
+
+
+def test_entry_larger_than_budget_is_not_cached():
+    cache = QueryCache(ttl=60, max_bytes=100)
+    cache.put("big", [{"page": f"/page/{i}"} for i in range(100)])
+    assert cache.get("big") is None
+    assert cache.status()["total_bytes"] == 0
+
+
+def test_replacing_key_updates_bytes():
+    cache = QueryCache(ttl=60)
+    cache.put("k", [{"a": "x" * 1000}])
+    cache.put("k", "small")
+    assert cache.status()["total_bytes"] == measure_size("small")
+
+
+def test_sweep_removes_expired_entries():
+    cache = QueryCache(ttl=0)
+    cache.put("k1", "v1")
+    cache.put("k2", "v2")
+    time.sleep(0.01)
+    assert cache.sweep() == 2
+    status = cache.status()
+    assert status["total_entries"] == 0
+    assert status["total_bytes"] == 0
+    assert status["expirations"] == 2
+
+
+def test_background_sweeper():
+    cache = QueryCache(ttl=0)
+    cache.put("k1", "v1")
+    cache.start_sweeper(interval=0.01)
+    try:
+        deadline = time.monotonic() + 1
+        while cache.status()["expirations"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        cache.stop_sweeper()
+    assert cache.status()["expirations"] == 1
+
+
+def test_expiry_heap_stays_bounded():
+    cache = QueryCache(ttl=60, max_entries=10)
+    for i in range(1000):
+        cache.put(f"k{i % 20}", i)
+    # pylint: disable=protected-access
+    assert len(cache._expiry) <= 2 * 10 + 64
+
+
 def test_clear():
     cache = QueryCache()
     cache.put("k1", "v1")
@@ -85,3 +184,804 @@ def test_thread_safety():
 
     assert not errors
     assert cache.status()["total_entries"] == 200
+
+
+def _slow_fetch(calls, result="rows", delay=0.1):
+    def fetch():
+        calls.append(1)
+        time.sleep(delay)
+        return result
+
+    return fetch
+
+
+def test_get_or_fetch_caches_result():
+    cache = QueryCache(ttl=60)
+    calls = []
+    assert cache.get_or_fetch("k", _slow_fetch(calls, delay=0), api="ga4") == "rows"
+    assert cache.get_or_fetch("k", _slow_fetch(calls, delay=0), api="ga4") == "rows"
+    assert len(calls) == 1
+
+
+def test_get_or_fetch_coalesces_concurrent_threads():
+    cache = QueryCache(ttl=60)
+    calls = []
+    fetch = _slow_fetch(calls)
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch("k", fetch)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == ["rows"] * 5
+
+
+def test_get_or_fetch_without_store_shares_but_does_not_cache():
+    cache = QueryCache(ttl=60)
+    calls = []
+    fetch = _slow_fetch(calls)
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch("k", fetch, store=False)))
+        for _ in range(3)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == ["rows"] * 3
+    assert cache.get("k") is None
+
+
+def test_get_without_miss_does_not_count_one():
+    cache = QueryCache(ttl=60)
+    cache.get("k", api="ga4", miss=False)
+
+    assert "ga4" not in cache.status()["by_api"]
+
+
+def test_get_or_fetch_shares_errors_and_does_not_cache_them():
+    cache = QueryCache(ttl=60)
+    calls = []
+
+    def fail():
+        calls.append(1)
+        time.sleep(0.1)
+        raise APIError("GA4 down", service="ga4")
+
+    errors = []
+
+    def worker():
+        try:
+            cache.get_or_fetch("k", fail)
+        except APIError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(errors) == 3
+    assert cache.get_or_fetch("k", lambda: "recovered") == "recovered"
+
+
+def test_get_or_fetch_async_coalesces_concurrent_tasks():
+    cache = QueryCache(ttl=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "rows"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_fetch_async("k", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["rows"] * 5
+    assert len(calls) == 1
+
+
+def test_async_caller_joins_threaded_fetch():
+    cache = QueryCache(ttl=60)
+    calls = []
+    leader = threading.Thread(target=cache.get_or_fetch, args=("k", _slow_fetch(calls, delay=0.2)))
+    leader.start()
+    time.sleep(0.05)
+
+    async def fetch():
+        calls.append("async")
+        return "other"
+
+    result = asyncio.run(cache.get_or_fetch_async("k", fetch))
+    leader.join()
+
+    assert result == "rows"
+    assert calls == [1]
+
+
+def test_cancelled_async_leader_lets_follower_retry():
+    cache = QueryCache(ttl=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.2 if len(calls) == 1 else 0)
+        return "rows"
+
+    async def main():
+        leader = asyncio.ensure_future(cache.get_or_fetch_async("k", fetch))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(cache.get_or_fetch_async("k", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == "rows"
+    assert len(calls) == 2
+
+
+def test_put_writes_through_to_l2(tmp_path):
+    l2 = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    cache = QueryCache(ttl=60, l2=l2)
+    cache.put("k", [{"a": 1}], api="ga4", summary="test")
+    l2.flush()
+    assert l2.get("k").result == [{"a": 1}]
+
+
+def test_restart_is_served_from_l2(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = QueryCache(ttl=60, l2=SQLiteBackend(path))
+    first.put("k", ["rows"], api="ga4", summary="test")
+    first._l2.flush()  # pylint: disable=protected-access
+
+    restarted = QueryCache(ttl=60, l2=SQLiteBackend(path))
+    calls = []
+    result = restarted.get_or_fetch("k", _slow_fetch(calls, delay=0))
+    assert result == ["rows"]
+    assert not calls
+    assert restarted.status()["total_entries"] == 1
+
+
+def test_l2_hit_keeps_original_expiry(tmp_path):
+    l2 = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    now = time.time()
+    l2.put("k", CachedRecord("rows", "ga4", "test", now - 50, now + 0.05))
+    l2.flush()
+
+    cache = QueryCache(ttl=3600, l2=l2)
+    assert cache.get("k") == "rows"
+    time.sleep(0.1)
+    assert cache.get("k") is None
+
+
+def test_async_miss_checks_l2(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    l2 = SQLiteBackend(path)
+    l2.put("k", CachedRecord("rows", "ga4", "test", time.time(), time.time() + 60))
+    l2.flush()
+    cache = QueryCache(ttl=60, l2=l2)
+
+    async def fetch():
+        raise AssertionError("should be served from l2")
+
+    assert asyncio.run(cache.get_or_fetch_async("k", fetch)) == "rows"
+
+
+class _BrokenL2(SQLiteBackend):
+    def get(self, key):
+        raise RuntimeError("unreadable")
+
+
+def test_l2_failure_is_a_miss_and_lands_the_flight(tmp_path):
+    cache = QueryCache(ttl=60, l2=_BrokenL2(str(tmp_path / "cache.sqlite3")))
+    calls = []
+
+    assert cache.get_or_fetch("k", _slow_fetch(calls, delay=0)) == "rows"
+    assert not cache._inflight  # pylint: disable=protected-access
+    assert cache.get_or_fetch("k", _slow_fetch(calls, delay=0)) == "rows"
+    assert len(calls) == 1
+
+
+def test_async_l2_failure_is_a_miss_and_lands_the_flight(tmp_path):
+    cache = QueryCache(ttl=60, l2=_BrokenL2(str(tmp_path / "cache.sqlite3")))
+
+    async def fetch():
+        return "rows"
+
+    assert asyncio.run(cache.get_or_fetch_async("k", fetch)) == "rows"
+    assert not cache._inflight  # pylint: disable=protected-access
+
+
+def test_clear_and_status_include_l2(tmp_path):
+    l2 = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    cache = QueryCache(ttl=60, l2=l2)
+    cache.put("k", "rows")
+    l2.flush()
+    assert cache.status()["l2"]["entries"] == 1
+
+    cache.clear()
+    l2.flush()
+    assert cache.get("k") is None
+    assert cache.status()["l2"]["entries"] == 0
+
+
+def test_policy_sets_ttl_from_api_and_end_date():
+    policy = TTLPolicy(
+        {"ga4": FreshnessRule(fresh_ttl=60, settled_ttl=86400, settle_days=3)}, default_ttl=5
+    )
+    cache = QueryCache(ttl=5, policy=policy)
+    now = time.time()
+    cache.put("settled", "rows", api="ga4", end_date="2020-01-01")
+    cache.put("fresh", "rows", api="ga4", end_date="2999-01-01")
+    cache.put("other", "rows", api="search_console")
+
+    # pylint: disable=protected-access
+    assert cache._store["settled"].expires - now >= 86400 - 1
+    assert cache._store["fresh"].expires - now < 61
+    assert cache._store["other"].expires - now < 6
+    assert cache.status()["ttl_policy"]["ga4"]["settled_ttl"] == 86400
+
+
+def test_get_or_fetch_passes_end_date_to_policy():
+    policy = TTLPolicy({"ga4": FreshnessRule(fresh_ttl=0, settled_ttl=60, settle_days=3)})
+    cache = QueryCache(ttl=0, policy=policy)
+    cache.get_or_fetch("k", lambda: "rows", api="ga4", end_date="2020-01-01")
+    time.sleep(0.01)
+    assert cache.get("k") == "rows"
+
+
+def _stale_cache(calls, result="fresh", delay=0.0):
+    cache = QueryCache(ttl=0, stale_ttl=60)
+    cache.put("k", "old", api="ga4", summary="test")
+    time.sleep(0.01)
+
+    def fetch():
+        calls.append(get_priority())
+        time.sleep(delay)
+        return result
+
+    return cache, fetch
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    calls = []
+    cache, fetch = _stale_cache(calls, delay=0.1)
+
+    assert cache.get_or_fetch("k", fetch) == "old"
+    assert cache.get_or_fetch("k", fetch) == "old"
+    assert cache.get("k") is None  # get() only returns fresh results
+    time.sleep(0.2)
+
+    assert calls == [Priority.LOW]
+    # pylint: disable=protected-access
+    assert cache._store["k"].result == "fresh"
+    status = cache.status()
+    assert status["stale_served"] == 2
+    assert status["background_refreshes"] == 1
+
+
+def test_failed_refresh_keeps_stale_entry():
+    cache = QueryCache(ttl=0, stale_ttl=60)
+    cache.put("k", "old")
+    time.sleep(0.01)
+
+    def fetch():
+        raise APIError("GA4 down", service="ga4")
+
+    assert cache.get_or_fetch("k", fetch) == "old"
+    time.sleep(0.05)
+    assert cache.get_or_fetch("k", fetch) == "old"
+    time.sleep(0.05)
+    assert cache.status()["refresh_failures"] == 2
+
+
+def test_entry_past_hard_ttl_is_fetched():
+    cache = QueryCache(ttl=0, stale_ttl=0)
+    cache.put("k", "old")
+    time.sleep(0.01)
+    assert cache.get_or_fetch("k", lambda: "new") == "new"
+    assert cache.status()["stale_served"] == 0
+
+
+def test_async_stale_entry_refreshes_in_background():
+    calls = []
+    cache = QueryCache(ttl=0, stale_ttl=60)
+    cache.put("k", "old")
+    time.sleep(0.01)
+
+    async def fetch():
+        calls.append(get_priority())
+        return "fresh"
+
+    async def main():
+        first = await cache.get_or_fetch_async("k", fetch)
+        await asyncio.sleep(0.01)
+        return first
+
+    assert asyncio.run(main()) == "old"
+    assert calls == [Priority.LOW]
+    assert cache._store["k"].result == "fresh"  # pylint: disable=protected-access
+
+
+def test_status_splits_active_and_stale_entries():
+    cache = QueryCache(ttl=60, stale_ttl=60)
+    cache.put("fresh", "rows")
+    cache._ttl = 0  # pylint: disable=protected-access
+    cache.put("stale", "rows")
+    time.sleep(0.01)
+    status = cache.status()
+    assert status["active_entries"] == 1
+    assert status["stale_entries"] == 1
+    assert status["total_entries"] == 2
+
+
+def test_stale_entry_count_follows_replacement_and_removal():
+    cache = QueryCache(ttl=0, stale_ttl=60)
+    cache.put("a", "rows")
+    cache.put("b", "rows")
+    time.sleep(0.01)
+    assert cache.status()["stale_entries"] == 2
+
+    cache._ttl = 60  # pylint: disable=protected-access
+    cache.put("a", "fresh")
+    assert cache.status()["stale_entries"] == 1
+    cache.clear()
+    assert cache.status()["stale_entries"] == 0
+
+
+def test_refreshes_run_on_the_executor():
+    executor = BlockingExecutor(max_workers=1, max_queue=4)
+    cache = QueryCache(ttl=0, stale_ttl=60, executor=executor)
+    cache.put("k", "old")
+    time.sleep(0.01)
+
+    assert cache.get_or_fetch("k", lambda: "fresh") == "old"
+    time.sleep(0.05)
+
+    assert executor.status()["completed"] == 1
+    assert cache._store["k"].result == "fresh"  # pylint: disable=protected-access
+
+
+def test_refresh_is_skipped_when_executor_is_full():
+    executor = BlockingExecutor(max_workers=1, max_queue=0)
+    cache = QueryCache(ttl=0, stale_ttl=60, executor=executor)
+    cache.put("k", "old")
+    time.sleep(0.01)
+    calls = []
+
+    for _ in range(2):
+        assert cache.get_or_fetch("k", lambda: calls.append(1) or "fresh") == "old"
+
+    assert not calls
+    assert executor.status()["rejected"] == 2
+
+
+def test_interrupted_refresh_lets_the_next_stale_hit_refresh():
+    cache = QueryCache(ttl=0, stale_ttl=60)
+    cache.put("k", "old")
+    time.sleep(0.01)
+
+    def interrupted():
+        raise SystemExit
+
+    assert cache.get_or_fetch("k", interrupted) == "old"
+    time.sleep(0.05)
+    calls = []
+    assert cache.get_or_fetch("k", lambda: calls.append(1) or "fresh") == "old"
+    time.sleep(0.05)
+
+    assert calls == [1]
+
+
+def _rows(n, metrics=("views",)):
+    return [{"page": f"/p{i}", **{m: str(n - i) for m in metrics}} for i in range(n)]
+
+
+def test_smaller_limit_is_sliced_from_ordered_result():
+    cache = QueryCache(ttl=60)
+    cache.put("k100", _rows(100), shape=Shape("fam", 100, ordered=True))
+
+    calls = []
+    result = cache.get_or_fetch("k10", _slow_fetch(calls), shape=Shape("fam", 10, ordered=True))
+
+    assert result == _rows(100)[:10]
+    assert not calls
+    assert cache.status()["contained_hits"] == 1
+
+
+def test_larger_limit_is_not_served_from_truncated_result():
+    cache = QueryCache(ttl=60)
+    cache.put("k10", _rows(10), shape=Shape("fam", 10, ordered=True))
+    assert cache.get("k100", Shape("fam", 100, ordered=True)) is None
+    assert cache.get("k5", Shape("other", 5, ordered=True)) is None
+
+
+def test_unordered_truncated_result_is_not_sliced():
+    cache = QueryCache(ttl=60)
+    cache.put("k100", _rows(100), shape=Shape("fam", 100))
+    assert cache.get("k10", Shape("fam", 10)) is None
+
+
+def test_complete_result_answers_any_limit_and_metric_subset():
+    cache = QueryCache(ttl=60)
+    rows = _rows(3, metrics=("sessions", "totalUsers", "bounceRate"))
+    cache.put(
+        "all", rows, shape=Shape("fam", 100, columns=("sessions", "totalUsers", "bounceRate"))
+    )
+
+    result = cache.get("sub", Shape("fam", 500, columns=("bounceRate", "sessions")))
+
+    assert result == [
+        {"page": r["page"], "bounceRate": r["bounceRate"], "sessions": r["sessions"]} for r in rows
+    ]
+    assert list(result[0]) == ["page", "bounceRate", "sessions"]
+    assert cache.get("other", Shape("fam", 500, columns=("newUsers",))) is None
+
+
+def test_evicted_entries_leave_the_containment_index():
+    cache = QueryCache(ttl=60, max_entries=1)
+    cache.put("k100", _rows(100), shape=Shape("fam", 100, ordered=True))
+    cache.put("unrelated", "rows")
+    assert cache.get("k10", Shape("fam", 10, ordered=True)) is None
+    assert not cache._families  # pylint: disable=protected-access
+
+
+def _with_lead(lead, fn):
+    def run():
+        set_refresh_lead(lead)
+        return fn()
+
+    return contextvars.copy_context().run(run)
+
+
+def test_refresh_lead_refetches_entries_about_to_expire():
+    cache = QueryCache(ttl=60)
+    cache.put("k", ["old"])
+
+    assert _with_lead(30, lambda: cache.get_or_fetch("k", lambda: ["x"])) == ["old"]
+    assert _with_lead(120, lambda: cache.get_or_fetch("k", lambda: ["new"])) == ["new"]
+    assert cache.get_or_fetch("k", lambda: ["unused"]) == ["new"]
+
+
+def test_refresh_lead_skips_containment():
+    cache = QueryCache(ttl=60)
+    cache.put("big", [{"a": 1}, {"a": 2}], shape=Shape("fam", 2, ordered=True))
+    small = Shape("fam", 1, ordered=True)
+
+    rows = _with_lead(1, lambda: cache.get_or_fetch("small", lambda: [{"a": 9}], shape=small))
+
+    assert rows == [{"a": 9}]
+
+
+def test_status_counts_lookups_by_api():
+    cache = QueryCache(ttl=60)
+    cache.get_or_fetch("a", lambda: [1], api="ga4")
+    cache.get_or_fetch("a", lambda: [1], api="ga4")
+    cache.get("a")
+    cache.get("b", api="search_console")
+
+    status = cache.status()
+
+    assert (status["hits"], status["misses"], status["hit_ratio"]) == (2, 2, 0.5)
+    ga4 = status["by_api"]["ga4"]
+    assert (ga4["hits"], ga4["misses"], ga4["fetches"], ga4["entries"]) == (2, 1, 1, 1)
+    assert ga4["bytes"] == status["total_bytes"]
+    assert status["by_api"]["search_console"]["misses"] == 1
+
+
+def test_status_estimates_fetch_latency_saved():
+    cache = QueryCache(ttl=60)
+
+    def slow():
+        time.sleep(0.05)
+        return [1]
+
+    cache.get_or_fetch("a", slow, api="ga4")
+    cache.get_or_fetch("a", slow, api="ga4")
+
+    ga4 = cache.status()["by_api"]["ga4"]
+    assert ga4["mean_fetch_seconds"] >= 0.05
+    assert ga4["fetch_seconds_saved"] == pytest.approx(ga4["mean_fetch_seconds"], abs=0.001)
+
+
+def test_fetch_seconds_saved_never_decreases():
+    cache = QueryCache(ttl=60)
+
+    def slow():
+        time.sleep(0.05)
+        return [1]
+
+    cache.get_or_fetch("a", slow, api="ga4")
+    cache.get_or_fetch("a", slow, api="ga4")
+    saved = cache.status()["by_api"]["ga4"]["fetch_seconds_saved"]
+    for key in "bcd":
+        cache.get_or_fetch(key, lambda: [1], api="ga4")  # fast fetches lower the mean
+
+    assert cache.status()["by_api"]["ga4"]["fetch_seconds_saved"] == saved
+
+
+def test_status_counts_evictions_and_expirations_by_api():
+    cache = QueryCache(ttl=60, max_entries=1)
+    cache.put("a", [1], api="ga4")
+    cache.put("b", [2], api="search_console")
+    cache.put("c", [3], api="search_console")
+    cache._store["c"].keep_until = 0  # pylint: disable=protected-access
+
+    assert cache.get("c") is None
+    status = cache.status()
+
+    assert status["by_api"]["ga4"]["evictions"] == 1
+    assert status["by_api"]["search_console"]["evictions"] == 1
+    assert status["by_api"]["search_console"]["expirations"] == 1
+    assert status["by_api"]["search_console"]["entries"] == 0
+
+
+def test_clear_resets_stored_bytes_by_api():
+    cache = QueryCache(ttl=60)
+    cache.put("a", [1], api="ga4")
+    cache.get("a")
+
+    cache.clear()
+
+    ga4 = cache.status()["by_api"]["ga4"]
+    assert (ga4["entries"], ga4["bytes"], ga4["hits"]) == (0, 0, 1)
+
+
+def _sc_rows(count):
+    return [
+        {"query": f"query {n}", "clicks": n, "impressions": 10 * n, "ctr": 1.5, "position": 2.0}
+        for n in range(count)
+    ]
+
+
+def test_large_entries_beyond_hot_set_are_compressed():
+    cache = QueryCache(ttl=60, compress_threshold=1024, hot_entries=1)
+    cache.put("a", _sc_rows(500))
+    raw = cache.status()["total_bytes"]
+    cache.put("b", _sc_rows(500))
+
+    compression = cache.status()["compression"]
+
+    assert compression["compressed_entries"] == 1
+    assert compression["hot_entries"] == 1
+    assert compression["ratio"] > 5
+    assert compression["compressions"] == 1
+    assert cache.status()["total_bytes"] < raw + raw / 5
+
+
+def test_compressed_entry_round_trips_into_hot_set():
+    cache = QueryCache(ttl=60, compress_threshold=1024, hot_entries=1)
+    cache.put("a", _sc_rows(500))
+    cache.put("b", _sc_rows(400))
+
+    assert cache.get("a") == _sc_rows(500)
+    compression = cache.status()["compression"]
+    assert compression["decompressions"] == 1
+    assert compression["compressed_entries"] == 1  # "b" was packed to make room
+    assert cache.get("b") == _sc_rows(400)
+
+
+def test_compressed_result_set_comes_back_columnar():
+    cache = QueryCache(ttl=60, compress_threshold=1024, hot_entries=1)
+    rows = ResultSet.from_rows(_sc_rows(500), dimensions=["query"])
+    cache.put("a", {"rows": rows})
+    cache.put("b", _sc_rows(400))
+
+    restored = cache.get("a")["rows"]
+    assert cache.status()["compression"]["decompressions"] == 1
+    assert isinstance(restored, ResultSet)
+    assert restored == rows
+    assert restored.schema == rows.schema
+
+
+def test_decompressing_get_stays_within_max_bytes():
+    max_bytes = measure_size(_sc_rows(500)) + 2048
+    cache = QueryCache(ttl=60, max_bytes=max_bytes, compress_threshold=1024, hot_entries=1)
+    cache.put("a", _sc_rows(500))
+    cache.put("b", _sc_rows(3))  # takes the hot slot, so "a" is compressed
+    small = "x" * 500
+    count = 0
+    while cache.status()["total_bytes"] + measure_size(small) <= max_bytes:
+        cache.put(f"small-{count}", small)
+        count += 1
+
+    assert cache.get("a") == _sc_rows(500)
+    status = cache.status()
+    assert status["total_bytes"] <= max_bytes
+    assert status["evictions"] > 0
+    assert cache.get("small-0") is None
+
+
+def test_small_entries_are_never_compressed():
+    cache = QueryCache(ttl=60, compress_threshold=1024 * 1024, hot_entries=0)
+    cache.put("a", _sc_rows(5))
+
+    assert cache.status()["compression"]["compressed_entries"] == 0
+    assert cache.get("a") == _sc_rows(5)
+
+
+def test_compressed_entry_serves_containment_and_stale_hits():
+    cache = QueryCache(ttl=60, stale_ttl=60, compress_threshold=1024, hot_entries=0)
+    cache.put("big", _sc_rows(300), shape=Shape("fam", 300, ordered=True))
+
+    assert cache.get("small", Shape("fam", 3, ordered=True)) == _sc_rows(3)
+    cache._store["big"].expires = 0  # pylint: disable=protected-access
+    assert cache.get_or_fetch("big", lambda: _sc_rows(300)) == _sc_rows(300)
+
+
+def test_containment_checks_do_not_decompress_candidates():
+    cache = QueryCache(ttl=60, compress_threshold=1024, hot_entries=0)
+    cache.put("big", _sc_rows(300), shape=Shape("fam", 300, ordered=True))
+
+    assert cache.get("bigger", Shape("fam", 500, ordered=True)) is None
+    assert cache.status()["compression"]["decompressions"] == 0
+    assert cache.get("small", Shape("fam", 3, ordered=True)) == _sc_rows(3)
+    assert cache.status()["compression"]["decompressions"] == 1
+
+
+def test_async_fetch_compresses_off_the_event_loop(monkeypatch):
+    cache = QueryCache(ttl=60, compress_threshold=1024, hot_entries=0)
+    threads = []
+    compress = zlib.compress
+
+    def recording_compress(data):
+        threads.append(threading.current_thread())
+        return compress(data)
+
+    monkeypatch.setattr(zlib, "compress", recording_compress)
+
+    async def fetch():
+        return _sc_rows(300)
+
+    async def main():
+        assert await cache.get_or_fetch_async("a", fetch) == _sc_rows(300)
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(main())
+
+    assert threads and loop_thread not in threads
+    assert cache.status()["compression"]["compressed_entries"] == 1
+
+
+def test_removing_compressed_entry_updates_stats():
+    cache = QueryCache(ttl=60, max_entries=1, compress_threshold=1024, hot_entries=0)
+    cache.put("a", _sc_rows(200))
+    cache.put("b", [1])
+
+    status = cache.status()
+    assert status["compression"]["compressed_entries"] == 0
+    assert status["compression"]["compressed_bytes"] == 0
+    assert status["total_bytes"] == measure_size([1])
+
+
+def test_compression_is_off_by_default():
+    assert "compression" not in QueryCache(ttl=60).status()
+
+
+def _google_error(cause):
+    def fetch():
+        raise APIError("GA4 report failed", service="ga4") from cause
+
+    return fetch
+
+
+def _expire(cache, key):
+    """Move key's entry past its hard TTL, keeping its fallback window."""
+    entry = cache._store[key]  # pylint: disable=protected-access
+    shift = entry.stale_until - time.time() + 1
+    entry.expires -= shift
+    entry.stale_until -= shift
+    entry.keep_until -= shift
+
+
+def test_deterministic_error_is_cached_briefly():
+    cache = QueryCache(ttl=60, negative_ttl=60)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return _google_error(InvalidArgument("bad metric"))()
+
+    for _ in range(3):
+        with pytest.raises(APIError) as info:
+            cache.get_or_fetch("k", fetch, api="ga4")
+        assert isinstance(info.value.__cause__, InvalidArgument)
+
+    assert len(calls) == 1
+    status = cache.status()
+    assert status["negative_entries"] == 1
+    assert status["by_api"]["ga4"]["negative_hits"] == 2
+
+
+def test_negative_entry_expires_and_is_replaced_by_a_result():
+    cache = QueryCache(ttl=60, negative_ttl=1)
+    with pytest.raises(APIError):
+        cache.get_or_fetch("k", _google_error(InvalidArgument("bad")))
+    cache._errors["k"] = (0, cache._errors["k"][1])  # pylint: disable=protected-access
+
+    assert cache.get_or_fetch("k", lambda: [1]) == [1]
+    assert cache.status()["negative_entries"] == 0
+
+
+def test_transient_errors_are_not_cached():
+    cache = QueryCache(ttl=60, negative_ttl=60)
+    with pytest.raises(APIError):
+        cache.get_or_fetch("k", _google_error(ServiceUnavailable("down")))
+
+    assert cache.get_or_fetch("k", lambda: [1]) == [1]
+
+
+def test_outage_serves_last_known_good_result_flagged_stale():
+    cache = QueryCache(ttl=60, fallback_ttl=3600)
+    cache.put("k", [1], api="ga4", summary="top pages")
+    _expire(cache, "k")
+
+    def fetch():
+        raise CircuitOpenError("ga4", 30)
+
+    with track_stale() as stale:
+        assert cache.get_or_fetch("k", fetch, api="ga4") == [1]
+
+    assert stale == ["ga4 top pages"]
+    assert cache.status()["by_api"]["ga4"]["fallbacks"] == 1
+
+
+def test_outage_without_fallback_raises():
+    cache = QueryCache(ttl=60)
+    cache.put("k", [1])
+    _expire(cache, "k")
+
+    with pytest.raises(APIError):
+        cache.get_or_fetch("k", _google_error(ServiceUnavailable("down")))
+
+
+def test_deterministic_error_does_not_fall_back():
+    cache = QueryCache(ttl=60, fallback_ttl=3600)
+    cache.put("k", [1])
+    _expire(cache, "k")
+
+    with pytest.raises(APIError):
+        cache.get_or_fetch("k", _google_error(InvalidArgument("bad")))
+
+
+def test_fallback_entries_are_not_served_while_google_answers():
+    cache = QueryCache(ttl=60, fallback_ttl=3600)
+    cache.put("k", [1])
+    _expire(cache, "k")
+
+    assert cache.get("k") is None
+    assert cache.get_or_fetch("k", lambda: [2]) == [2]
+
+
+def test_async_followers_get_the_fallback():
+    cache = QueryCache(ttl=60, fallback_ttl=3600)
+    cache.put("k", [1])
+    _expire(cache, "k")
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        raise CircuitOpenError("ga4", 30)
+
+    async def poll():
+        with track_stale() as stale:
+            result = await cache.get_or_fetch_async("k", fetch)
+        return result, stale
+
+    async def main():
+        return await asyncio.gather(*(poll() for _ in range(3)))
+
+    for result, stale in asyncio.run(main()):
+        assert result == [1]
+        assert len(stale) == 1
@@ -0,0 +1,215 @@
+import os
+import sqlite3
+import stat
+import time
+
+import pytest
+
+from anny.core.cache import QueryCache
+from anny.core.cache_backends import CachedRecord, RedisBackend, SQLiteBackend
+from anny.core.resultset import ResultSet
+from tests.mocks.redis_server import FakeRedisServer
+
+
+def _record(result, ttl=60):
+    now = time.time()
+    return CachedRecord(result, "ga4", "report", now, now + ttl)
+
+
+def test_put_is_written_by_background_writer(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    backend.put("k", _record([{"date": "20260101", "sessions": "5"}]))
+    backend.flush()
+
+    record = backend.get("k")
+    assert record.result == [{"date": "20260101", "sessions": "5"}]
+    assert record.api == "ga4"
+    assert record.summary == "report"
+
+
+def test_result_set_survives_the_round_trip(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    rows = ResultSet.from_rows([{"pagePath": "/", "sessions": 5}], dimensions=["pagePath"])
+    backend.put("k", _record({"rows": rows}))
+    backend.flush()
+
+    result = backend.get("k").result["rows"]
+    assert isinstance(result, ResultSet)
+    assert result == rows
+    assert result.dimensions == ("pagePath",)
+
+
+def test_get_missing_key(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    assert backend.get("nope") is None
+
+
+def test_expired_record_is_not_returned(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    backend.put("k", _record("rows", ttl=-1))
+    backend.flush()
+    assert backend.get("k") is None
+
+
+@pytest.mark.parametrize("value", ["not json", '{"__resultset__": 1}'])
+def test_unreadable_value_is_a_miss(tmp_path, value):
+    path = str(tmp_path / "cache.sqlite3")
+    backend = SQLiteBackend(path)
+    backend.put("k", _record("rows"))
+    backend.flush()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE entries SET value = ? WHERE key = 'k'", (value,))
+
+    assert backend.get("k") is None
+
+
+def test_records_survive_reopen(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = SQLiteBackend(path)
+    first.put("k", _record(["rows"]))
+    first.flush()
+
+    assert SQLiteBackend(path).get("k").result == ["rows"]
+
+
+def test_creates_parent_directory_with_private_file(tmp_path):
+    path = tmp_path / "nested" / "cache.sqlite3"
+    SQLiteBackend(str(path))
+    assert path.exists()
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_byte_budget_drops_least_recently_used(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_bytes=250)
+    backend.put("old", _record("x" * 100))
+    backend.flush()
+    backend.put("mid", _record("y" * 100))
+    backend.flush()
+    backend.get("old")
+    backend.flush()
+    backend.put("new", _record("z" * 100))
+    backend.flush()
+
+    assert backend.get("mid") is None
+    assert backend.get("old") is not None
+    assert backend.get("new") is not None
+
+
+def test_full_queue_drops_writes(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_queue=1)
+    backend._writer = object()  # pylint: disable=protected-access  # hold the writer off
+    backend.put("a", _record("rows"))
+    backend.put("b", _record("rows"))
+    assert backend.status()["dropped_writes"] == 1
+    assert backend.status()["pending_writes"] == 1
+
+
+def test_clear_and_status(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_bytes=1000)
+    backend.put("k", _record("rows"))
+    backend.flush()
+    status = backend.status()
+    assert status["backend"] == "sqlite"
+    assert status["entries"] == 1
+    assert status["bytes"] == len('"rows"')
+    assert status["max_bytes"] == 1000
+
+    backend.clear()
+    backend.flush()
+    assert backend.status()["entries"] == 0
+
+
+def test_redis_put_and_get():
+    with FakeRedisServer() as server:
+        backend = RedisBackend(server.url)
+        backend.put("k", _record([{"query": "anny", "clicks": 3}]))
+        backend.flush()
+
+        record = backend.get("k")
+        assert record.result == [{"query": "anny", "clicks": 3}]
+        assert record.api == "ga4"
+        assert b"anny:cache:k" in server.data
+
+
+def test_redis_sets_expiry_from_record():
+    with FakeRedisServer() as server:
+        backend = RedisBackend(server.url)
+        backend.put("k", _record("rows", ttl=30))
+        backend.put("gone", _record("rows", ttl=-1))
+        backend.flush()
+
+        sets = [c for c in server.commands if c[0] == b"SET"]
+        assert len(sets) == 1
+        assert sets[0][3] == b"PX"
+        assert 29000 < int(sets[0][4]) <= 30000
+
+
+def test_redis_is_shared_between_backends():
+    with FakeRedisServer() as server:
+        first = RedisBackend(server.url)
+        first.put("k", _record("rows"))
+        first.flush()
+        assert RedisBackend(server.url).get("k").result == "rows"
+
+
+def test_redis_authenticates():
+    with FakeRedisServer(password="s3cret") as server:
+        backend = RedisBackend(server.url)
+        assert backend.get("missing") is None
+        assert server.commands[0] == [b"AUTH", b"s3cret"]
+        assert "s3cret" not in backend.url
+
+
+def test_redis_clear_removes_only_prefixed_keys():
+    with FakeRedisServer() as server:
+        server.data[b"other"] = (b"keep", None)
+        backend = RedisBackend(server.url)
+        backend.put("a", _record("rows"))
+        backend.put("b", _record("rows"))
+        backend.clear()
+        backend.flush()
+        assert list(server.data) == [b"other"]
+
+
+@pytest.mark.parametrize(
+    "value",
+    [b"not json", b'"a string"', b'{"result": "rows"}', b'{"expires": "soon", "result": 1}'],
+)
+def test_redis_unreadable_value_is_a_miss(value):
+    with FakeRedisServer() as server:
+        server.data[b"anny:cache:k"] = (value, None)
+        assert RedisBackend(server.url).get("k") is None
+
+
+def test_redis_unreachable_is_a_miss():
+    with FakeRedisServer() as server:
+        url = server.url
+    backend = RedisBackend(url, timeout=0.2)
+    assert backend.get("k") is None
+    assert backend.status()["connected"] is False
+
+
+def test_redis_status():
+    with FakeRedisServer() as server:
+        status = RedisBackend(server.url).status()
+        assert status["backend"] == "redis"
+        assert status["connected"] is True
+        assert status["key_prefix"] == "anny:cache:"
+
+
+def test_redis_rejects_other_schemes():
+    with pytest.raises(ValueError):
+        RedisBackend("memcached://localhost:11211")
+
+
+def test_workers_share_hits_through_redis():
+    with FakeRedisServer() as server:
+        worker_a = QueryCache(ttl=60, l2=RedisBackend(server.url))
+        worker_b = QueryCache(ttl=60, l2=RedisBackend(server.url))
+        worker_a.get_or_fetch("k", lambda: ["rows"])
+        worker_a._l2.flush()  # pylint: disable=protected-access
+
+        def fetch():
+            raise AssertionError("should be served by the other worker's entry")
+
+        assert worker_b.get_or_fetch("k", fetch) == ["rows"]
@@ -0,0 +1,181 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+from google.api_core.exceptions import InvalidArgument
+
+from anny.core.cache import CacheRequest, QueryCache, track_stale
+from anny.core.cache_backends import CachedRecord, SQLiteBackend
+from anny.core.exceptions import APIError, CircuitOpenError
+
+
+def _expire(cache, key):
+    """Move key's entry past its hard TTL, keeping its fallback window."""
+    entry = cache._store[key]  # pylint: disable=protected-access
+    shift = entry.stale_until - time.time() + 1
+    entry.expires -= shift
+    entry.stale_until -= shift
+    entry.keep_until -= shift
+
+
+def _google_error(cause):
+    def fetch():
+        raise APIError("GA4 report failed", service="ga4") from cause
+
+    return fetch
+
+
+def _requests(*keys):
+    return [CacheRequest(key, api="ga4") for key in keys]
+
+
+def test_get_or_fetch_many_fetches_only_misses_in_one_call():
+    cache = QueryCache(ttl=60)
+    cache.put("a", [1], api="ga4")
+    calls = []
+
+    def fetch(indices):
+        calls.append(indices)
+        return [[i] for i in indices]
+
+    assert cache.get_or_fetch_many(_requests("a", "b", "c"), fetch) == [[1], [1], [2]]
+    assert calls == [[1, 2]]
+    assert cache.get("c") == [2]
+    ga4 = cache.status()["by_api"]["ga4"]
+    assert (ga4["hits"], ga4["misses"], ga4["fetches"]) == (2, 2, 2)
+
+
+def test_get_or_fetch_many_shares_a_flight_with_get_or_fetch():
+    cache = QueryCache(ttl=60)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return [0]
+
+    single = threading.Thread(target=cache.get_or_fetch, args=("a", fetch))
+    single.start()
+    time.sleep(0.02)
+
+    results = cache.get_or_fetch_many(_requests("a", "b"), lambda indices: [[9]] * len(indices))
+    single.join()
+
+    assert results == [[0], [9]]
+    assert len(calls) == 1
+
+
+def test_get_or_fetch_many_refreshes_stale_results_with_the_misses():
+    cache = QueryCache(ttl=60, stale_ttl=60)
+    cache.put("a", [1])
+    cache._store["a"].expires = 0  # pylint: disable=protected-access
+    calls = []
+
+    def fetch(indices):
+        calls.append(indices)
+        return [[2]] * len(indices)
+
+    assert cache.get_or_fetch_many(_requests("a", "b"), fetch) == [[2], [2]]
+    assert calls == [[1, 0]]
+    assert cache.get("a") == [2]
+
+
+def test_get_or_fetch_many_refreshes_stale_results_in_the_background():
+    cache = QueryCache(ttl=60, stale_ttl=60)
+    cache.put("a", [1])
+    cache._store["a"].expires = 0  # pylint: disable=protected-access
+    refreshed = threading.Event()
+
+    def fetch(indices):
+        refreshed.set()
+        return [[2]] * len(indices)
+
+    assert cache.get_or_fetch_many(_requests("a"), fetch) == [[1]]
+    assert refreshed.wait(1)
+    time.sleep(0.02)
+    assert cache.get("a") == [2]
+
+
+def test_get_or_fetch_many_falls_back_when_google_is_down():
+    cache = QueryCache(ttl=60, fallback_ttl=3600)
+    for key in ("a", "b"):
+        cache.put(key, [key], api="ga4", summary=key)
+        _expire(cache, key)
+
+    def fetch(_):
+        raise CircuitOpenError("ga4", 30)
+
+    with track_stale() as stale:
+        assert cache.get_or_fetch_many(_requests("a", "b"), fetch) == [["a"], ["b"]]
+
+    assert stale == ["ga4 a", "ga4 b"]
+
+
+def test_get_or_fetch_many_raises_when_a_miss_has_no_fallback():
+    cache = QueryCache(ttl=60, fallback_ttl=3600)
+    cache.put("a", [1])
+    _expire(cache, "a")
+
+    def fetch(_):
+        raise CircuitOpenError("ga4", 30)
+
+    with pytest.raises(CircuitOpenError):
+        cache.get_or_fetch_many(_requests("a", "b"), fetch)
+    assert cache.get_or_fetch_many(_requests("a", "b"), lambda _: [[2], [3]]) == [[2], [3]]
+
+
+def test_get_or_fetch_many_remembers_errors_of_single_fetches_only():
+    cache = QueryCache(ttl=60, negative_ttl=60)
+    bad = _google_error(InvalidArgument("bad"))
+
+    with pytest.raises(APIError):
+        cache.get_or_fetch_many(_requests("a", "b"), lambda _: bad())
+    with pytest.raises(APIError):
+        cache.get_or_fetch_many(_requests("a"), lambda _: bad())
+
+    with pytest.raises(APIError):  # remembered, without a call, and "b" is released
+        cache.get_or_fetch_many(_requests("b", "a"), lambda _: pytest.fail("fetched"))
+    assert cache.get_or_fetch_many(_requests("b"), lambda _: [[2]]) == [[2]]
+
+
+def test_get_or_fetch_many_async_fetches_misses_and_stores_off_the_loop():
+    cache = QueryCache(ttl=60)
+    cache.put("a", [1])
+
+    async def fetch(indices):
+        return [[2]] * len(indices)
+
+    async def main():
+        return await cache.get_or_fetch_many_async(_requests("a", "b"), fetch)
+
+    assert asyncio.run(main()) == [[1], [2]]
+    assert cache.get("b") == [2]
+
+
+def test_get_or_fetch_many_async_falls_back_when_google_is_down():
+    cache = QueryCache(ttl=60, fallback_ttl=3600)
+    cache.put("a", [1])
+    _expire(cache, "a")
+
+    async def fetch(_):
+        raise CircuitOpenError("ga4", 30)
+
+    assert asyncio.run(cache.get_or_fetch_many_async(_requests("a"), fetch)) == [[1]]
+
+
+def test_get_or_fetch_many_fetches_what_an_unreadable_l2_holds(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    l2 = SQLiteBackend(path)
+    cache = QueryCache(ttl=60, l2=l2)
+    l2.put("b", CachedRecord([0], "ga4", "", time.time(), time.time() + 60))
+    l2.flush()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE entries SET value = 'not json' WHERE key = 'b'")
+
+    assert cache.get_or_fetch_many(_requests("a", "b"), lambda indices: [[i] for i in indices]) == [
+        [0],
+        [1],
+    ]
+    assert not cache._inflight  # pylint: disable=protected-access
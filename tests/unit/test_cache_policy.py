@@ -0,0 +1,52 @@
+from datetime import date
+
+from anny.core.cache_policy import FreshnessRule, TTLPolicy
+
+TODAY = date(2026, 3, 10)
+
+
+def _policy():
+    return TTLPolicy(
+        {
+            "ga4": FreshnessRule(fresh_ttl=900, settled_ttl=604800, settle_days=3),
+            "search_console": FreshnessRule(fresh_ttl=3600, settled_ttl=604800, settle_days=4),
+            "tag_manager": FreshnessRule(fresh_ttl=600, settled_ttl=600, settle_days=0),
+        },
+        default_ttl=1234,
+    )
+
+
+def test_ranges_ending_today_or_yesterday_are_fresh():
+    policy = _policy()
+    assert policy.ttl_for("ga4", "2026-03-10", today=TODAY) == 900
+    assert policy.ttl_for("ga4", "2026-03-09", today=TODAY) == 900
+
+
+def test_settled_end_date_gets_long_ttl():
+    policy = _policy()
+    assert policy.ttl_for("ga4", "2026-03-07", today=TODAY) == 604800
+    assert policy.ttl_for("ga4", "2025-12-31", today=TODAY) == 604800
+
+
+def test_search_console_lag_keeps_recent_days_fresh():
+    policy = _policy()
+    # Settled for GA4 but still inside Search Console's reporting lag
+    assert policy.ttl_for("ga4", "2026-03-07", today=TODAY) == 604800
+    assert policy.ttl_for("search_console", "2026-03-07", today=TODAY) == 3600
+    assert policy.ttl_for("search_console", "2026-03-06", today=TODAY) == 604800
+
+
+def test_no_date_range_uses_fresh_ttl():
+    assert _policy().ttl_for("tag_manager") == 600
+
+
+def test_unknown_api_and_bad_date_fall_back():
+    policy = _policy()
+    assert policy.ttl_for("other", "2020-01-01", today=TODAY) == 1234
+    assert policy.ttl_for("ga4", "not-a-date", today=TODAY) == 900
+
+
+def test_status():
+    status = _policy().status()
+    assert status["default_ttl"] == 1234
+    assert status["ga4"] == {"fresh_ttl": 900, "settled_ttl": 604800, "settle_days": 3}
@@ -44,3 +44,41 @@ def test_clear_cache_endpoint():
 
     assert response.status_code == 200
     assert response.json()["cleared"] == 2
+
+
+def test_cache_status_reports_counters_by_api():
+    cache = QueryCache(ttl=60)
+    cache.get_or_fetch("k1", lambda: ["rows"], api="ga4")
+    cache.get_or_fetch("k1", lambda: ["rows"], api="ga4")
+    cache.get("missing", api="search_console")
+    _setup(cache)
+
+    tc = TestClient(app)
+    data = tc.get("/api/cache/status").json()
+
+    _teardown()
+
+    assert data["hits"] == 1
+    assert data["misses"] == 2
+    assert data["by_api"]["ga4"]["hit_ratio"] == 0.5
+    assert data["by_api"]["ga4"]["entries"] == 1
+    assert data["by_api"]["search_console"]["misses"] == 1
+
+
+def test_cache_metrics_endpoint_is_prometheus_text():
+    cache = QueryCache(ttl=60)
+    cache.get_or_fetch("k1", lambda: ["rows"], api="ga4")
+    cache.get("k1")
+    _setup(cache)
+
+    tc = TestClient(app)
+    response = tc.get("/api/cache/metrics")
+
+    _teardown()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE anny_cache_hits_total counter" in response.text
+    assert 'anny_cache_hits_total{api="ga4"} 1' in response.text
+    assert 'anny_cache_misses_total{api="ga4"} 1' in response.text
+    assert "anny_cache_max_entries 500" in response.text
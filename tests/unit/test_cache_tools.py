@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+from anny.core.cache import QueryCache
+from anny.mcp_server import mcp
+
+
+def _tool(name):
+    # pylint: disable=protected-access
+    return next(t for t in mcp._tool_manager._tools.values() if t.name == name)
+
+
+def test_cache_status_tool_reports_hit_ratio_by_api():
+    cache = QueryCache(ttl=60)
+    cache.get_or_fetch("k", lambda: [1], api="ga4")
+    cache.get_or_fetch("k", lambda: [1], api="ga4")
+
+    with (
+        patch("anny.mcp_server.get_query_cache", return_value=cache),
+        patch("anny.mcp_server.get_realtime_cache", return_value=QueryCache(ttl=15)),
+    ):
+        result = _tool("cache_status").fn()
+
+    assert "Cache: 1/500 active entries, TTL 60s" in result
+    assert "Hits: 1, misses: 1, hit ratio: 50.0%" in result
+    assert "ga4" in result
+
+
+def test_cache_status_tool_reports_realtime_cache():
+    realtime = QueryCache(ttl=15)
+    realtime.get_or_fetch("k", lambda: [1], api="ga4_realtime")
+
+    with (
+        patch("anny.mcp_server.get_query_cache", return_value=QueryCache(ttl=60)),
+        patch("anny.mcp_server.get_realtime_cache", return_value=realtime),
+    ):
+        result = _tool("cache_status").fn()
+
+    assert "Realtime cache: 1/500 active entries, TTL 15s" in result
+    assert "ga4_realtime" in result
+
+
+def test_cache_status_tool_with_no_lookups():
+    with (
+        patch("anny.mcp_server.get_query_cache", return_value=QueryCache(ttl=60)),
+        patch("anny.mcp_server.get_realtime_cache", return_value=QueryCache(ttl=15)),
+    ):
+        result = _tool("cache_status").fn()
+
+    assert "hit ratio: n/a" in result
@@ -0,0 +1,77 @@
+import contextvars
+import threading
+import time
+
+import pytest
+
+from anny.core.concurrency import fan_out
+from anny.core.exceptions import APIError
+
+
+def test_fan_out_returns_results_by_name():
+    results = fan_out({"a": lambda: 1, "b": lambda: 2})
+    assert results == {"a": 1, "b": 2}
+
+
+def test_fan_out_empty():
+    assert not fan_out({})
+
+
+def test_fan_out_runs_calls_concurrently():
+    start = time.monotonic()
+    fan_out({name: lambda: time.sleep(0.1) for name in ("a", "b", "c")})
+    assert time.monotonic() - start < 0.25
+
+
+def test_fan_out_respects_max_concurrency():
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def call():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    fan_out({str(i): call for i in range(6)}, max_concurrency=2)
+    assert peak[0] == 2
+
+
+def test_fan_out_reraises_single_failure():
+    def fail():
+        raise APIError("GTM list tags failed", service="tag_manager")
+
+    with pytest.raises(APIError, match="GTM list tags failed"):
+        fan_out({"tags": fail, "triggers": lambda: []})
+
+
+def test_fan_out_aggregates_multiple_failures():
+    finished = []
+
+    def fail(name):
+        def call():
+            raise APIError(f"{name} failed", service="tag_manager")
+
+        return call
+
+    def slow_ok():
+        time.sleep(0.05)
+        finished.append(True)
+
+    with pytest.raises(APIError) as exc_info:
+        fan_out({"tags": fail("tags"), "triggers": fail("triggers"), "ok": slow_ok}, service="x")
+
+    assert "2 of 3 calls failed" in exc_info.value.message
+    assert "tags: tags failed" in exc_info.value.message
+    assert "triggers: triggers failed" in exc_info.value.message
+    assert exc_info.value.service == "x"
+    assert finished == [True]
+
+
+def test_fan_out_propagates_context_vars():
+    var = contextvars.ContextVar("var", default="")
+    var.set("req-1")
+    assert fan_out({"a": var.get}) == {"a": "req-1"}
@@ -0,0 +1,121 @@
+from unittest.mock import MagicMock
+
+import pytest
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+
+from anny.clients.discovery import DiscoveryClient
+from anny.core.exceptions import APIError, CapacityError
+from anny.core.quota import QuotaScheduler
+from tests.mocks.discovery import use_fake_batches
+
+
+def _request(response=None, status=None):
+    request = MagicMock()
+    if status:
+        request.execute.side_effect = HttpError(Response({"status": str(status)}), b"error")
+    else:
+        request.execute.return_value = response
+    return request
+
+
+class _Client(DiscoveryClient):
+    service_name = "tag_manager"
+
+
+def test_execute_batch_sends_one_round_trip():
+    service = MagicMock()
+    batches = use_fake_batches(service)
+    client = _Client(service)
+
+    results = client._execute_batch(  # pylint: disable=protected-access
+        {"a": _request({"n": 1}), "b": _request({"n": 2})}, "GTM lookup"
+    )
+
+    assert results == {"a": {"n": 1}, "b": {"n": 2}}
+    assert len(batches) == 1
+
+
+def test_execute_batch_maps_item_errors_to_api_error():
+    service = MagicMock()
+    use_fake_batches(service)
+    scheduler = QuotaScheduler()
+    client = _Client(service, scheduler=scheduler)
+
+    results = client._execute_batch(  # pylint: disable=protected-access
+        {"ok": _request({"n": 1}), "bad": _request(status=429)}, "GTM lookup"
+    )
+
+    assert results["ok"] == {"n": 1}
+    assert isinstance(results["bad"], APIError)
+    assert results["bad"].service == "tag_manager"
+    assert isinstance(results["bad"].__cause__, HttpError)
+    assert scheduler.status()["tag_manager"]["project"]["exhausted"]
+
+
+def test_execute_batch_chunks_large_batches(monkeypatch):
+    monkeypatch.setattr("anny.clients.discovery.DISCOVERY_BATCH_MAX_REQUESTS", 2)
+    service = MagicMock()
+    batches = use_fake_batches(service)
+    client = _Client(service)
+
+    results = client._execute_batch(  # pylint: disable=protected-access
+        {str(i): _request({"n": i}) for i in range(5)}, "GTM lookup"
+    )
+
+    assert len(results) == 5
+    assert [len(b.requests) for b in batches] == [2, 2, 1]
+
+
+def test_execute_batch_whole_call_failure():
+    service = MagicMock()
+    service.new_batch_http_request().execute.side_effect = HttpError(
+        Response({"status": "503"}), b"unavailable"
+    )
+    client = _Client(service)
+
+    with pytest.raises(APIError, match="GTM lookup failed"):
+        client._execute_batch(  # pylint: disable=protected-access
+            {"a": _request({}), "b": _request({})}, "GTM lookup"
+        )
+
+
+def test_execute_all_aggregates_failures():
+    service = MagicMock()
+    use_fake_batches(service)
+    client = _Client(service)
+
+    with pytest.raises(APIError, match="2 of 3 calls failed") as exc_info:
+        client._execute_all(  # pylint: disable=protected-access
+            {"a": _request(status=500), "b": _request(status=404), "c": _request({})},
+            "GTM lookup",
+        )
+
+    assert exc_info.value.service == "tag_manager"
+
+
+def test_execute_all_single_request_skips_batch():
+    service = MagicMock()
+    batches = use_fake_batches(service)
+    client = _Client(service)
+
+    results = client._execute_all(  # pylint: disable=protected-access
+        {"a": _request({"n": 1})}, "GTM lookup"
+    )
+
+    assert results == {"a": {"n": 1}}
+    assert not batches
+
+
+def test_batch_counts_each_request_against_qpm():
+    class _SearchConsole(DiscoveryClient):
+        service_name = "search_console"
+
+    scheduler = QuotaScheduler(search_console_qpm=3, max_wait=0.1, normal_priority_reserve=0)
+    client = _SearchConsole(MagicMock(), scheduler=scheduler)
+
+    with client._slot(cost=3):  # pylint: disable=protected-access
+        pass
+    with pytest.raises(CapacityError):
+        with client._slot():  # pylint: disable=protected-access
+            pass
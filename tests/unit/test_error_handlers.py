@@ -2,27 +2,33 @@ from unittest.mock import MagicMock
 
 from fastapi.testclient import TestClient
 
-from anny.clients.ga4 import GA4Client
+from anny.clients.ga4 import AsyncGA4Client
 from anny.core.cache import QueryCache
-from anny.core.dependencies import get_ga4_client, get_query_cache, verify_api_key
-from anny.core.exceptions import APIError, AuthError, ValidationError
+from anny.core.dependencies import get_async_ga4_client, get_query_cache, verify_api_key
+from anny.core.exceptions import (
+    APIError,
+    AuthError,
+    CapacityError,
+    CircuitOpenError,
+    ValidationError,
+)
 from anny.main import app
 
 
 def _setup_overrides(mock_client):
-    app.dependency_overrides[get_ga4_client] = lambda: mock_client
+    app.dependency_overrides[get_async_ga4_client] = lambda: mock_client
     app.dependency_overrides[verify_api_key] = lambda: None
-    app.dependency_overrides[get_query_cache] = QueryCache
+    app.dependency_overrides[get_query_cache] = lambda: QueryCache(ttl=60)
 
 
 def _teardown_overrides():
-    app.dependency_overrides.pop(get_ga4_client, None)
+    app.dependency_overrides.pop(get_async_ga4_client, None)
     app.dependency_overrides.pop(verify_api_key, None)
     app.dependency_overrides.pop(get_query_cache, None)
 
 
 def test_auth_error_returns_401():
-    mock_client = MagicMock(spec=GA4Client)
+    mock_client = MagicMock(spec=AsyncGA4Client)
     mock_client.run_report.side_effect = AuthError("bad creds")
     _setup_overrides(mock_client)
 
@@ -36,7 +42,7 @@ def test_auth_error_returns_401():
 
 
 def test_api_error_returns_502():
-    mock_client = MagicMock(spec=GA4Client)
+    mock_client = MagicMock(spec=AsyncGA4Client)
     mock_client.run_report.side_effect = APIError("GA4 down", service="ga4")
     _setup_overrides(mock_client)
 
@@ -50,7 +56,7 @@ def test_api_error_returns_502():
 
 
 def test_validation_error_returns_400():
-    mock_client = MagicMock(spec=GA4Client)
+    mock_client = MagicMock(spec=AsyncGA4Client)
     mock_client.run_report.side_effect = ValidationError("bad date range")
     _setup_overrides(mock_client)
 
@@ -61,3 +67,32 @@ def test_validation_error_returns_400():
 
     assert response.status_code == 400
     assert response.json()["error"] == "bad date range"
+
+
+def test_capacity_error_returns_503():
+    mock_client = MagicMock(spec=AsyncGA4Client)
+    mock_client.run_report.side_effect = CapacityError("Server is busy")
+    _setup_overrides(mock_client)
+
+    tc = TestClient(app, raise_server_exceptions=False)
+    response = tc.get("/api/ga4/top-pages")
+
+    _teardown_overrides()
+
+    assert response.status_code == 503
+    assert response.json()["error"] == "Server is busy"
+
+
+def test_circuit_open_error_returns_503_with_retry_after():
+    mock_client = MagicMock(spec=AsyncGA4Client)
+    mock_client.run_report.side_effect = CircuitOpenError("ga4", retry_after=12.3)
+    _setup_overrides(mock_client)
+
+    tc = TestClient(app, raise_server_exceptions=False)
+    response = tc.get("/api/ga4/top-pages")
+
+    _teardown_overrides()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "13"
+    assert "ga4 is failing" in response.json()["error"]
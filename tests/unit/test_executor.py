@@ -0,0 +1,93 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from anny.core.exceptions import APIError, CapacityError
+from anny.core.executor import BlockingExecutor
+
+
+def test_run_returns_result():
+    executor = BlockingExecutor(max_workers=2)
+    assert asyncio.run(executor.run(lambda a, b=0: a + b, 1, b=2)) == 3
+
+
+def test_run_propagates_exceptions():
+    executor = BlockingExecutor(max_workers=2)
+
+    def fail():
+        raise APIError("GA4 down", service="ga4")
+
+    with pytest.raises(APIError, match="GA4 down"):
+        asyncio.run(executor.run(fail))
+
+
+def test_run_preserves_context_vars():
+    var = contextvars.ContextVar("var", default="")
+    executor = BlockingExecutor(max_workers=1)
+
+    async def main():
+        var.set("request-123")
+        return await executor.run(var.get)
+
+    assert asyncio.run(main()) == "request-123"
+
+
+def test_blocking_calls_overlap():
+    executor = BlockingExecutor(max_workers=4)
+
+    async def main():
+        start = time.monotonic()
+        await asyncio.gather(*(executor.run(time.sleep, 0.2) for _ in range(4)))
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) < 0.6
+
+
+def test_event_loop_stays_responsive():
+    executor = BlockingExecutor(max_workers=1)
+
+    async def main():
+        slow = asyncio.ensure_future(executor.run(time.sleep, 0.3))
+        start = time.monotonic()
+        await asyncio.sleep(0.01)
+        elapsed = time.monotonic() - start
+        await slow
+        return elapsed
+
+    assert asyncio.run(main()) < 0.2
+
+
+def test_queue_full_raises_capacity_error():
+    executor = BlockingExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)  # let the first call occupy the only worker
+        queued = asyncio.ensure_future(executor.run(lambda: None))
+        await asyncio.sleep(0)
+        with pytest.raises(CapacityError):
+            await executor.run(lambda: None)
+        release.set()
+        await asyncio.gather(running, queued)
+
+    asyncio.run(main())
+    assert executor.status()["rejected"] == 1
+
+
+def test_status_tracks_completed_and_wait():
+    executor = BlockingExecutor(max_workers=1, max_queue=10)
+
+    async def main():
+        await asyncio.gather(*(executor.run(time.sleep, 0.05) for _ in range(3)))
+
+    asyncio.run(main())
+    status = executor.status()
+    assert status["completed"] == 3
+    assert status["queue_depth"] == 0
+    assert status["active"] == 0
+    assert status["wait_seconds_max"] >= 0.05
+    assert status["max_workers"] == 1
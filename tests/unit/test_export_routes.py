@@ -2,14 +2,15 @@ from unittest.mock import MagicMock, patch
 
 from fastapi.testclient import TestClient
 
-from anny.clients.ga4 import GA4Client
+from anny.clients.ga4 import AsyncGA4Client
 from anny.clients.search_console import SearchConsoleClient
-from anny.core.dependencies import get_ga4_client, get_search_console_client, verify_api_key
+from anny.core.dependencies import get_async_ga4_client, get_search_console_client, verify_api_key
+from anny.core.exceptions import APIError
 from anny.main import app
 
 
 def _setup_ga4(mock_client):
-    app.dependency_overrides[get_ga4_client] = lambda: mock_client
+    app.dependency_overrides[get_async_ga4_client] = lambda: mock_client
     app.dependency_overrides[verify_api_key] = lambda: None
 
 
@@ -19,13 +20,13 @@ def _setup_sc(mock_client):
 
 
 def _teardown():
-    app.dependency_overrides.pop(get_ga4_client, None)
+    app.dependency_overrides.pop(get_async_ga4_client, None)
     app.dependency_overrides.pop(get_search_console_client, None)
     app.dependency_overrides.pop(verify_api_key, None)
 
 
 def test_export_ga4_top_pages_csv():
-    mock_client = MagicMock(spec=GA4Client)
+    mock_client = MagicMock(spec=AsyncGA4Client)
     _setup_ga4(mock_client)
 
     with patch(
@@ -44,7 +45,7 @@ def test_export_ga4_top_pages_csv():
 
 
 def test_export_ga4_top_pages_json():
-    mock_client = MagicMock(spec=GA4Client)
+    mock_client = MagicMock(spec=AsyncGA4Client)
     _setup_ga4(mock_client)
 
     with patch(
@@ -82,7 +83,7 @@ def test_export_sc_top_queries_csv():
 
 
 def test_export_invalid_format_422():
-    mock_client = MagicMock(spec=GA4Client)
+    mock_client = MagicMock(spec=AsyncGA4Client)
     _setup_ga4(mock_client)
 
     tc = TestClient(app)
@@ -94,7 +95,7 @@ def test_export_invalid_format_422():
 
 
 def test_export_content_disposition_quoted_filename():
-    mock_client = MagicMock(spec=GA4Client)
+    mock_client = MagicMock(spec=AsyncGA4Client)
     _setup_ga4(mock_client)
 
     with patch(
@@ -112,7 +113,7 @@ def test_export_content_disposition_quoted_filename():
 
 
 def test_export_limit_clamped():
-    mock_client = MagicMock(spec=GA4Client)
+    mock_client = MagicMock(spec=AsyncGA4Client)
     _setup_ga4(mock_client)
 
     tc = TestClient(app)
@@ -122,3 +123,95 @@ def test_export_limit_clamped():
     _teardown()
 
     assert response.status_code == 422
+
+
+def test_export_ga4_report_all_rows_streams_pages():
+    async def rows():
+        for i in range(3):
+            yield {"pagePath": f"/p{i}", "sessions": str(i)}
+
+    mock_client = MagicMock(spec=AsyncGA4Client)
+    mock_client.iter_report.return_value = rows()
+    _setup_ga4(mock_client)
+
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        tc = TestClient(app)
+        response = tc.get(
+            "/api/export/ga4/report?metrics=sessions&dimensions=pagePath&all_rows=true"
+        )
+
+    _teardown()
+
+    assert response.status_code == 200
+    lines = response.content.decode("utf-8-sig").strip().splitlines()
+    assert lines == ["pagePath,sessions", "/p0,0", "/p1,1", "/p2,2"]
+    mock_client.run_report.assert_not_called()
+
+
+def test_export_ga4_top_pages_all_rows_first_page_error():
+    async def rows():
+        raise APIError("GA4 report failed", service="ga4")
+        yield  # pylint: disable=unreachable
+
+    mock_client = MagicMock(spec=AsyncGA4Client)
+    mock_client.iter_report.return_value = rows()
+    _setup_ga4(mock_client)
+
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        tc = TestClient(app)
+        response = tc.get("/api/export/ga4/top-pages?format=json&all_rows=true")
+
+    _teardown()
+
+    assert response.status_code == 502
+
+
+def test_export_sc_query_all_rows_streams_pages():
+    pages_closed = []
+
+    def pages():
+        try:
+            yield [{"query": "a", "clicks": 3}, {"query": "b", "clicks": 2}]
+            yield [{"query": "c", "clicks": 1}]
+        finally:
+            pages_closed.append(True)
+
+    mock_client = MagicMock(spec=SearchConsoleClient)
+    mock_client.iter_query_pages.return_value = pages()
+    _setup_sc(mock_client)
+
+    with patch(
+        "anny.core.services.search_console_service.parse_date_range",
+        return_value=("2024-01-01", "2024-01-28"),
+    ):
+        tc = TestClient(app)
+        response = tc.get("/api/export/search-console/query?format=json&all_rows=true")
+
+    _teardown()
+
+    assert response.status_code == 200
+    assert [r["query"] for r in response.json()] == ["a", "b", "c"]
+    assert pages_closed == [True]
+    mock_client.query.assert_not_called()
+
+
+def test_export_sc_top_pages_all_rows_uses_page_dimension():
+    mock_client = MagicMock(spec=SearchConsoleClient)
+    mock_client.iter_query_pages.return_value = iter([[{"page": "/", "clicks": 1}]])
+    _setup_sc(mock_client)
+
+    with patch(
+        "anny.core.services.search_console_service.parse_date_range",
+        return_value=("2024-01-01", "2024-01-28"),
+    ):
+        tc = TestClient(app)
+        response = tc.get("/api/export/search-console/top-pages?all_rows=true")
+
+    _teardown()
+
+    assert response.status_code == 200
+    assert mock_client.iter_query_pages.call_args[0][2] == ["page"]
@@ -1,5 +1,7 @@
+import asyncio
 import json
 
+from anny.core.resultset import ResultSet
 from anny.core.services import export_service
 
 
@@ -77,3 +79,101 @@ def test_to_csv_safe_values_unchanged():
     text = result.decode("utf-8-sig")
     lines = text.strip().splitlines()
     assert lines[1] == "hello,42"
+
+
+async def _aiter(rows):
+    for row in rows:
+        yield row
+
+
+def _collect(chunks):
+    async def run():
+        return [chunk async for chunk in chunks]
+
+    return asyncio.run(run())
+
+
+def test_stream_csv_matches_to_csv():
+    rows = [{"name": "Alice", "score": 10}, {"name": "=CMD()", "score": 20}]
+    chunks = _collect(export_service.stream_csv(_aiter(rows), chunk_size=1))
+    assert len(chunks) == 2
+    assert b"".join(chunks) == export_service.to_csv(rows)
+    assert _collect(export_service.stream_csv(_aiter(rows))) == [export_service.to_csv(rows)]
+
+
+def test_stream_csv_empty():
+    assert _collect(export_service.stream_csv(_aiter([]))) == [b"\xef\xbb\xbf"]
+
+
+def test_stream_json_matches_to_json():
+    rows = [{"name": "Alice", "score": 10}, {"name": "Bob", "nested": {"a": 1}}]
+    data = b"".join(_collect(export_service.stream_json(_aiter(rows))))
+    assert json.loads(data) == rows
+    assert data == export_service.to_json(rows)
+
+
+def test_stream_json_empty():
+    data = b"".join(_collect(export_service.stream_json(_aiter([]))))
+    assert data == export_service.to_json([])
+
+
+def test_stream_chunks_stay_near_chunk_size():
+    rows = [{"page": f"/page/{i}", "views": i} for i in range(5000)]
+    chunks = _collect(export_service.stream_csv(_aiter(rows), chunk_size=4096))
+
+    assert len(chunks) > 10
+    assert max(len(c) for c in chunks) < 4096 + 200
+    assert b"".join(chunks) == export_service.to_csv(rows)
+
+
+def test_stream_pulls_rows_only_as_chunks_are_consumed():
+    pulled = []
+
+    async def source():
+        for i in range(100):
+            pulled.append(i)
+            yield {"n": i}
+
+    async def run():
+        chunks = export_service.stream_json(source(), chunk_size=1)
+        await anext(chunks)
+        first = len(pulled)
+        await anext(chunks)
+        await chunks.aclose()
+        return first, len(pulled)
+
+    assert asyncio.run(run()) == (1, 2)
+
+
+def test_to_csv_result_set_matches_row_dicts():
+    rows = [{"page": "/a", "views": 3}, {"page": "=cmd", "views": 1}]
+
+    assert export_service.to_csv(ResultSet.from_rows(rows, ["page"])) == export_service.to_csv(rows)
+    assert export_service.to_json(ResultSet.from_rows(rows)) == export_service.to_json(rows)
+
+
+def test_to_json_writes_typed_metrics_as_numbers():
+    rows = ResultSet.from_columns({"page": ["/a"], "views": [3], "rate": [0.5]}, ["page"])
+
+    assert json.loads(export_service.to_json(rows)) == [{"page": "/a", "views": 3, "rate": 0.5}]
+
+
+def test_stream_csv_writes_result_set_from_columns(monkeypatch):
+    rows = [{"page": "/a", "views": 3}, {"page": "=cmd", "views": 1}]
+    result_set = ResultSet.from_rows(rows, ["page"])
+
+    def no_row_dicts(_):
+        raise AssertionError("row dicts built")
+
+    monkeypatch.setattr(ResultSet, "__iter__", no_row_dicts)
+    monkeypatch.setattr(ResultSet, "__getitem__", no_row_dicts)
+
+    assert b"".join(_collect(export_service.stream_csv(result_set))) == export_service.to_csv(rows)
+    assert _collect(export_service.stream_csv(ResultSet.from_rows([]))) == [b"\xef\xbb\xbf"]
+
+
+def test_stream_accepts_rows_in_memory():
+    rows = [{"name": "Alice", "score": 10}]
+
+    assert b"".join(_collect(export_service.stream_csv(rows))) == export_service.to_csv(rows)
+    assert b"".join(_collect(export_service.stream_json(rows))) == export_service.to_json(rows)
@@ -1,10 +1,14 @@
-from unittest.mock import MagicMock
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from google.api_core.exceptions import GoogleAPICallError
+from google.analytics.data_v1beta.types import MetricType
+from google.api_core.exceptions import GoogleAPICallError, ResourceExhausted
 
-from anny.clients.ga4 import GA4Client
+from anny.clients.ga4 import AsyncGA4Client, GA4Client
 from anny.core.exceptions import APIError
+from anny.core.quota import QuotaScheduler
+from anny.core.resultset import ResultSet
 
 
 def _make_mock_response(rows_data):
@@ -44,6 +48,63 @@ def test_run_report_flattens_response():
     assert len(rows) == 2
     assert rows[0] == {"date": "2024-01-01", "sessions": "100", "totalUsers": "50"}
     assert rows[1] == {"date": "2024-01-02", "sessions": "200", "totalUsers": "75"}
+    assert isinstance(rows, ResultSet)
+    assert rows.dimensions == ("date",)
+
+
+def _typed(response, *types):
+    response.metric_headers = [MagicMock(type_=t) for t in types]
+    return response
+
+
+def test_run_report_decodes_metrics_by_header_type():
+    mock_api = MagicMock()
+    mock_api.run_report.return_value = _typed(
+        _make_mock_response(
+            [
+                (["/a"], ["100", "0.25", "12.5", "3.99", "x"]),
+                (["/b"], ["7", "1", "60", "0", "y"]),
+            ]
+        ),
+        MetricType.TYPE_INTEGER,
+        MetricType.TYPE_FLOAT,
+        MetricType.TYPE_SECONDS,
+        MetricType.TYPE_CURRENCY,
+        MetricType.METRIC_TYPE_UNSPECIFIED,
+    )
+
+    client = GA4Client(mock_api, "123456")
+    rows = client.run_report(
+        metrics=["sessions", "bounceRate", "averageSessionDuration", "totalRevenue", "other"],
+        dimensions=["pagePath"],
+        start_date="2024-01-01",
+        end_date="2024-01-02",
+    )
+
+    assert rows[0] == {
+        "pagePath": "/a",
+        "sessions": 100,
+        "bounceRate": 0.25,
+        "averageSessionDuration": 12.5,
+        "totalRevenue": 3.99,
+        "other": "x",
+    }
+    assert [c.type for c in rows.schema] == ["str", "int", "float", "float", "float", "any"]
+
+
+def test_metric_column_that_does_not_parse_stays_strings():
+    mock_api = MagicMock()
+    mock_api.run_report.return_value = _typed(
+        _make_mock_response([(["/a"], ["5"]), (["/b"], ["(not set)"])]),
+        MetricType.TYPE_INTEGER,
+    )
+
+    client = GA4Client(mock_api, "123456")
+    rows = client.run_report(
+        metrics=["sessions"], dimensions=["pagePath"], start_date="a", end_date="b"
+    )
+
+    assert rows.column("sessions") == ["5", "(not set)"]
 
 
 def test_run_report_empty_response():
@@ -149,3 +210,251 @@ def test_property_id_strips_prefix():
 
     call_args = mock_api.run_report.call_args[0][0]
     assert call_args.property == "properties/123456"
+
+
+def test_async_run_report_flattens_response():
+    mock_api = MagicMock()
+    mock_api.run_report = AsyncMock(
+        return_value=_make_mock_response([(["2024-01-01"], ["100", "50"])])
+    )
+
+    client = AsyncGA4Client(mock_api, "properties/123456")
+    rows = asyncio.run(
+        client.run_report(
+            metrics=["sessions", "totalUsers"],
+            dimensions=["date"],
+            start_date="2024-01-01",
+            end_date="2024-01-01",
+        )
+    )
+
+    assert rows == [{"date": "2024-01-01", "sessions": "100", "totalUsers": "50"}]
+    assert mock_api.run_report.call_args[0][0].property == "properties/123456"
+
+
+def test_async_run_report_api_failure():
+    mock_api = MagicMock()
+    mock_api.run_report = AsyncMock(side_effect=GoogleAPICallError("connection failed"))
+
+    client = AsyncGA4Client(mock_api, "123456")
+    with pytest.raises(APIError, match="GA4 report failed"):
+        asyncio.run(
+            client.run_report(
+                metrics=["sessions"],
+                dimensions=["date"],
+                start_date="2024-01-01",
+                end_date="2024-01-01",
+            )
+        )
+
+
+def test_async_run_realtime_report():
+    mock_api = MagicMock()
+    mock_api.run_realtime_report = AsyncMock(return_value=_make_mock_response([(["US"], ["42"])]))
+
+    client = AsyncGA4Client(mock_api, "123456")
+    rows = asyncio.run(client.run_realtime_report(metrics=["activeUsers"], dimensions=["country"]))
+
+    assert rows == [{"country": "US", "activeUsers": "42"}]
+
+
+def test_run_report_requests_and_records_property_quota():
+    mock_api = MagicMock()
+    response = MagicMock(rows=[])
+    response.__contains__.side_effect = lambda field: field == "property_quota"
+    mock_api.run_report.return_value = response
+    scheduler = MagicMock(spec=QuotaScheduler)
+
+    client = GA4Client(mock_api, "123456", scheduler=scheduler)
+    client.run_report(
+        metrics=["sessions"], dimensions=["date"], start_date="2024-01-01", end_date="2024-01-01"
+    )
+
+    assert mock_api.run_report.call_args[0][0].return_property_quota is True
+    scheduler.slot.assert_called_once_with("ga4", "properties/123456")
+    scheduler.record_ga4_quota.assert_called_once_with("properties/123456", response.property_quota)
+
+
+def test_run_report_resource_exhausted_marks_lane():
+    mock_api = MagicMock()
+    mock_api.run_report.side_effect = ResourceExhausted("quota")
+    scheduler = QuotaScheduler()
+
+    client = GA4Client(mock_api, "123456", scheduler=scheduler)
+    with pytest.raises(APIError):
+        client.run_report(
+            metrics=["sessions"],
+            dimensions=["date"],
+            start_date="2024-01-01",
+            end_date="2024-01-01",
+        )
+
+    lane = scheduler.status()["ga4"]["properties/123456"]
+    assert lane["exhausted"]
+    assert lane["in_flight"] == 0
+
+
+def test_batch_run_reports_sends_one_call():
+    mock_api = MagicMock()
+    mock_api.batch_run_reports.return_value = MagicMock(
+        reports=[
+            _make_mock_response([(["2024-01-01"], ["100"])]),
+            _make_mock_response([(["/home"], ["500"])]),
+        ]
+    )
+
+    client = GA4Client(mock_api, "123456")
+    results = client.batch_run_reports(
+        [
+            {
+                "metrics": ["sessions"],
+                "dimensions": ["date"],
+                "start_date": "2024-01-01",
+                "end_date": "2024-01-01",
+            },
+            {
+                "metrics": ["screenPageViews"],
+                "dimensions": ["pagePath"],
+                "start_date": "2024-01-01",
+                "end_date": "2024-01-28",
+                "limit": 5,
+            },
+        ]
+    )
+
+    assert results == [
+        [{"date": "2024-01-01", "sessions": "100"}],
+        [{"pagePath": "/home", "screenPageViews": "500"}],
+    ]
+    request = mock_api.batch_run_reports.call_args[0][0]
+    assert request.property == "properties/123456"
+    assert [r.limit for r in request.requests] == [10, 5]
+
+
+def test_async_batch_run_reports_api_failure():
+    mock_api = MagicMock()
+    mock_api.batch_run_reports = AsyncMock(side_effect=GoogleAPICallError("boom"))
+
+    client = AsyncGA4Client(mock_api, "123456")
+    with pytest.raises(APIError, match="GA4 batch report failed"):
+        asyncio.run(
+            client.batch_run_reports(
+                [
+                    {
+                        "metrics": ["sessions"],
+                        "dimensions": ["date"],
+                        "start_date": "2024-01-01",
+                        "end_date": "2024-01-01",
+                    }
+                ]
+            )
+        )
+
+
+def _paged_responses(total, page_size):
+    pages = []
+    for offset in range(0, total, page_size):
+        count = min(page_size, total - offset)
+        page = _make_mock_response([([f"/p{offset + i}"], [str(offset + i)]) for i in range(count)])
+        page.row_count = total
+        pages.append(page)
+    return pages
+
+
+def test_iter_report_follows_row_count_with_offsets():
+    mock_api = MagicMock()
+    mock_api.run_report.side_effect = _paged_responses(total=4, page_size=2)
+
+    client = GA4Client(mock_api, "123456")
+    rows = list(
+        client.iter_report(
+            metrics=["screenPageViews"],
+            dimensions=["pagePath"],
+            start_date="2024-01-01",
+            end_date="2024-01-28",
+            page_size=2,
+        )
+    )
+
+    assert [r["pagePath"] for r in rows] == ["/p0", "/p1", "/p2", "/p3"]
+    requests = [c[0][0] for c in mock_api.run_report.call_args_list]
+    assert [(r.offset, r.limit) for r in requests] == [(0, 2), (2, 2)]
+
+
+def test_iter_report_yields_typed_metrics():
+    mock_api = MagicMock()
+    mock_api.run_report.return_value = _typed(
+        _make_mock_response([(["/a"], ["42"])]), MetricType.TYPE_INTEGER
+    )
+
+    client = GA4Client(mock_api, "123456")
+    rows = list(
+        client.iter_report(
+            metrics=["screenPageViews"],
+            dimensions=["pagePath"],
+            start_date="2024-01-01",
+            end_date="2024-01-28",
+        )
+    )
+
+    assert rows == [{"pagePath": "/a", "screenPageViews": 42}]
+
+
+def test_iter_report_fetches_next_page_lazily():
+    mock_api = MagicMock()
+    mock_api.run_report.side_effect = _paged_responses(total=3, page_size=2)
+
+    client = GA4Client(mock_api, "123456")
+    rows = client.iter_report(
+        metrics=["screenPageViews"],
+        dimensions=["pagePath"],
+        start_date="2024-01-01",
+        end_date="2024-01-28",
+        page_size=2,
+    )
+    next(rows)
+    next(rows)
+    assert mock_api.run_report.call_count == 1
+    assert next(rows)["pagePath"] == "/p2"
+    assert mock_api.run_report.call_count == 2
+
+
+def test_async_iter_report_pages_and_errors():
+    first = _paged_responses(total=4, page_size=2)[0]
+    mock_api = MagicMock()
+    mock_api.run_report = AsyncMock(side_effect=[first, GoogleAPICallError("boom")])
+
+    client = AsyncGA4Client(mock_api, "123456")
+    seen = []
+
+    async def consume():
+        async for row in client.iter_report(
+            metrics=["screenPageViews"],
+            dimensions=["pagePath"],
+            start_date="2024-01-01",
+            end_date="2024-01-28",
+            page_size=2,
+        ):
+            seen.append(row["pagePath"])
+
+    with pytest.raises(APIError, match="GA4 report failed"):
+        asyncio.run(consume())
+    assert seen == ["/p0", "/p1"]
+
+
+def test_run_report_order_by_sorts_descending():
+    mock_api = MagicMock()
+    mock_api.run_report.return_value = MagicMock(rows=[])
+
+    client = GA4Client(mock_api, "123456")
+    client.run_report(
+        metrics=["screenPageViews"],
+        dimensions=["pagePath"],
+        start_date="2024-01-01",
+        end_date="2024-01-28",
+        order_by="screenPageViews",
+    )
+
+    order = mock_api.run_report.call_args[0][0].order_bys[0]
+    assert order.metric.metric_name == "screenPageViews"
+    assert order.desc is True
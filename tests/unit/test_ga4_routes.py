@@ -1,23 +1,31 @@
+import time
 from unittest.mock import MagicMock, patch
 
 from fastapi.testclient import TestClient
 
-from anny.clients.ga4 import GA4Client
-from anny.core.dependencies import get_ga4_client, verify_api_key
+from anny.clients.ga4 import AsyncGA4Client
+from anny.core.cache import QueryCache
+from anny.core.dependencies import (
+    get_async_ga4_client,
+    get_query_cache,
+    get_realtime_cache,
+    verify_api_key,
+)
+from anny.core.exceptions import CircuitOpenError
 from anny.main import app
 
 
 def _mock_ga4_client():
-    return MagicMock(spec=GA4Client)
+    return MagicMock(spec=AsyncGA4Client)
 
 
 def _setup_overrides(mock_client):
-    app.dependency_overrides[get_ga4_client] = lambda: mock_client
+    app.dependency_overrides[get_async_ga4_client] = lambda: mock_client
     app.dependency_overrides[verify_api_key] = lambda: None
 
 
 def _teardown_overrides():
-    app.dependency_overrides.pop(get_ga4_client, None)
+    app.dependency_overrides.pop(get_async_ga4_client, None)
     app.dependency_overrides.pop(verify_api_key, None)
 
 
@@ -92,3 +100,98 @@ def test_realtime_endpoint():
     data = response.json()
     assert data["row_count"] == 1
     assert data["rows"][0]["activeUsers"] == "42"
+    assert data["as_of"]
+
+
+def test_realtime_polls_share_one_call():
+    mock_client = _mock_ga4_client()
+    _setup_overrides(mock_client)
+
+    mock_client.run_realtime_report.return_value = [{"activeUsers": "42"}]
+    tc = TestClient(app)
+    first = tc.get("/api/ga4/realtime").json()
+    second = tc.get("/api/ga4/realtime").json()
+
+    _teardown_overrides()
+
+    assert mock_client.run_realtime_report.await_count == 1
+    assert first["as_of"] == second["as_of"]
+
+
+@patch("anny.core.dependencies.settings")
+def test_realtime_cache_ttl_is_clamped(mock_settings):
+    mock_settings.cache_realtime_max_entries = 8
+    for configured, expected in ((1, 5), (10, 10), (300, 30)):
+        mock_settings.cache_realtime_ttl = configured
+        get_realtime_cache.cache_clear()
+        assert get_realtime_cache().status()["ttl_seconds"] == expected
+
+
+def test_batch_endpoint():
+    mock_client = _mock_ga4_client()
+    _setup_overrides(mock_client)
+
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        mock_client.batch_run_reports.return_value = [
+            [{"pagePath": "/", "screenPageViews": "500"}],
+            [{"sessionSource": "google", "sessions": "300"}],
+        ]
+        tc = TestClient(app)
+        response = tc.post(
+            "/api/ga4/batch",
+            json={"reports": [{"report": "top_pages", "limit": 5}, {"report": "traffic_summary"}]},
+        )
+
+    _teardown_overrides()
+
+    assert response.status_code == 200
+    reports = response.json()["reports"]
+    assert [r["row_count"] for r in reports] == [1, 1]
+    assert reports[1]["rows"][0]["sessionSource"] == "google"
+    mock_client.batch_run_reports.assert_awaited_once()
+
+
+def test_batch_endpoint_rejects_more_than_five_reports():
+    mock_client = _mock_ga4_client()
+    _setup_overrides(mock_client)
+
+    tc = TestClient(app)
+    response = tc.post("/api/ga4/batch", json={"reports": [{"report": "top_pages"}] * 6})
+
+    _teardown_overrides()
+
+    assert response.status_code == 422
+    mock_client.batch_run_reports.assert_not_called()
+
+
+def test_outage_serves_cached_report_flagged_stale():
+    mock_client = _mock_ga4_client()
+    _setup_overrides(mock_client)
+    cache = QueryCache(ttl=60, fallback_ttl=3600)
+    app.dependency_overrides[get_query_cache] = lambda: cache
+
+    mock_client.run_report.return_value = [{"pagePath": "/home", "screenPageViews": "5"}]
+    tc = TestClient(app)
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        fresh = tc.get("/api/ga4/top-pages")
+        # pylint: disable=protected-access
+        for entry in cache._store.values():
+            shift = entry.stale_until - time.time() + 1
+            entry.expires -= shift
+            entry.stale_until -= shift
+            entry.keep_until -= shift
+        mock_client.run_report.side_effect = CircuitOpenError("ga4", 30)
+        stale = tc.get("/api/ga4/top-pages")
+
+    app.dependency_overrides.pop(get_query_cache, None)
+    _teardown_overrides()
+
+    assert "Warning" not in fresh.headers
+    assert stale.status_code == 200
+    assert stale.json()["rows"][0]["pagePath"] == "/home"
+    assert stale.headers["X-Anny-Stale"] == "true"
+    assert stale.headers["Warning"].startswith("110")
@@ -1,8 +1,13 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from anny.core.exceptions import ValidationError
+from anny.core.cache import QueryCache, track_stale
+from anny.core.exceptions import CircuitOpenError, ValidationError
 from anny.core.services import ga4_service
 
 
@@ -113,3 +118,535 @@ def test_get_report_rejects_empty_dimensions():
     mock_client = MagicMock()
     with pytest.raises(ValidationError, match="dimension"):
         ga4_service.get_report(mock_client, metrics="sessions", dimensions="")
+
+
+def test_get_report_async_calls_client():
+    mock_client = MagicMock()
+    mock_client.run_report = AsyncMock(return_value=[{"date": "2024-01-01", "sessions": "100"}])
+
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        rows = asyncio.run(
+            ga4_service.get_report_async(mock_client, metrics="sessions", dimensions="date")
+        )
+
+    mock_client.run_report.assert_awaited_once_with(
+        metrics=["sessions"],
+        dimensions=["date"],
+        start_date="2024-01-01",
+        end_date="2024-01-28",
+        limit=10,
+    )
+    assert len(rows) == 1
+
+
+def test_get_top_pages_async_shares_cache_with_sync():
+    cache = QueryCache()
+    sync_client = MagicMock()
+    sync_client.run_report.return_value = [{"pagePath": "/", "screenPageViews": "500"}]
+    async_client = MagicMock()
+    async_client.run_report = AsyncMock()
+
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        ga4_service.get_top_pages(sync_client, cache=cache)
+        rows = asyncio.run(ga4_service.get_top_pages_async(async_client, cache=cache))
+
+    async_client.run_report.assert_not_awaited()
+    assert rows == [{"pagePath": "/", "screenPageViews": "500"}]
+
+
+def test_get_traffic_summary_async():
+    mock_client = MagicMock()
+    mock_client.run_report = AsyncMock(return_value=[{"sessionSource": "google"}])
+
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        rows = asyncio.run(ga4_service.get_traffic_summary_async(mock_client))
+
+    assert mock_client.run_report.call_args.kwargs["dimensions"] == ["sessionSource"]
+    assert len(rows) == 1
+
+
+def test_get_realtime_report_async():
+    mock_client = MagicMock()
+    mock_client.run_realtime_report = AsyncMock(return_value=[{"activeUsers": "42"}])
+
+    rows = asyncio.run(ga4_service.get_realtime_report_async(mock_client))
+
+    mock_client.run_realtime_report.assert_awaited_once_with(
+        metrics=["activeUsers"], dimensions=None
+    )
+    assert len(rows) == 1
+
+
+def test_get_report_async_rejects_empty_metrics():
+    with pytest.raises(ValidationError, match="metric"):
+        asyncio.run(ga4_service.get_report_async(MagicMock(), metrics="", dimensions="date"))
+
+
+def test_batch_reports_only_fetches_misses():
+    cache = QueryCache()
+    client = MagicMock()
+    client.run_report.return_value = [{"pagePath": "/", "screenPageViews": "500"}]
+    client.batch_run_reports.return_value = [
+        [{"date": "2024-01-01", "sessions": "100"}],
+        [{"sessionSource": "google", "sessions": "300"}],
+    ]
+
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        ga4_service.get_top_pages(client, cache=cache)
+        results = ga4_service.batch_reports(
+            client,
+            [
+                {"report": "report", "metrics": "sessions", "dimensions": "date"},
+                {"report": "top_pages"},
+                {"report": "traffic_summary"},
+            ],
+            cache=cache,
+        )
+        # Sub-reports are cached individually, so single-report calls now hit
+        client.run_report.reset_mock()
+        summary = ga4_service.get_traffic_summary(client, cache=cache)
+
+    batched = client.batch_run_reports.call_args[0][0]
+    assert [args["dimensions"] for args in batched] == [["date"], ["sessionSource"]]
+    assert results[1] == [{"pagePath": "/", "screenPageViews": "500"}]
+    assert summary == [{"sessionSource": "google", "sessions": "300"}]
+    client.run_report.assert_not_called()
+
+
+def test_batch_reports_all_cached_skips_call():
+    cache = QueryCache()
+    client = MagicMock()
+    client.batch_run_reports.return_value = [[{"pagePath": "/"}]]
+
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        ga4_service.batch_reports(client, [{"report": "top_pages"}], cache=cache)
+        results = ga4_service.batch_reports(client, [{"report": "top_pages"}], cache=cache)
+
+    assert client.batch_run_reports.call_count == 1
+    assert results == [[{"pagePath": "/"}]]
+
+
+def test_batch_reports_dedupes_identical_specs():
+    client = MagicMock()
+    client.batch_run_reports = AsyncMock(return_value=[[{"pagePath": "/"}]])
+
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        results = asyncio.run(
+            ga4_service.batch_reports_async(
+                client, [{"report": "top_pages"}, {"report": "top_pages"}], cache=QueryCache()
+            )
+        )
+
+    assert len(client.batch_run_reports.call_args[0][0]) == 1
+    assert results == [[{"pagePath": "/"}], [{"pagePath": "/"}]]
+
+
+def test_batch_reports_async_uses_the_cache_off_the_event_loop():
+    class RecordingCache(QueryCache):
+        threads = []
+
+        def get(self, key, shape=None, api="", miss=True):
+            self.threads.append(threading.current_thread())
+            return super().get(key, shape, api, miss)
+
+        def put(self, key, result, api="", summary="", end_date=None, shape=None):
+            self.threads.append(threading.current_thread())
+            return super().put(key, result, api, summary, end_date, shape)
+
+    client = MagicMock()
+    client.batch_run_reports = AsyncMock(
+        return_value=[[{"date": "20240101", "sessions": "1"}], [{"pagePath": "/"}]]
+    )
+    cache = RecordingCache()
+
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-02")
+    ):
+        asyncio.run(
+            ga4_service.batch_reports_async(
+                client,
+                [{"report": "report", "metrics": "sessions"}, {"report": "top_pages"}],
+                cache=cache,
+            )
+        )
+
+    assert len(RecordingCache.threads) == 5  # 2 day lookups, 2 day puts, 1 report put
+    assert threading.main_thread() not in RecordingCache.threads
+
+
+@pytest.mark.parametrize(
+    "specs, match",
+    [
+        ([], "At least one"),
+        ([{"report": "top_pages"}] * 6, "At most 5"),
+        ([{"report": "funnel"}], "Unknown report type"),
+    ],
+)
+def test_batch_reports_rejects_bad_specs(specs, match):
+    with pytest.raises(ValidationError, match=match):
+        ga4_service.batch_reports(MagicMock(), specs)
+
+
+def test_iter_report_passes_args_without_limit():
+    mock_client = MagicMock()
+    mock_client.iter_report.return_value = iter([{"date": "2024-01-01"}])
+
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        rows = list(ga4_service.iter_report(mock_client, metrics="sessions", dimensions="date"))
+
+    mock_client.iter_report.assert_called_once_with(
+        metrics=["sessions"], dimensions=["date"], start_date="2024-01-01", end_date="2024-01-28"
+    )
+    assert rows == [{"date": "2024-01-01"}]
+
+
+def test_iter_report_async_validates_before_fetching():
+    mock_client = MagicMock()
+    with pytest.raises(ValidationError, match="metric"):
+        ga4_service.iter_report_async(mock_client, metrics="", dimensions="date")
+    mock_client.iter_report.assert_not_called()
+
+
+def test_iter_top_pages_async_uses_top_pages_metrics():
+    mock_client = MagicMock()
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        ga4_service.iter_top_pages_async(mock_client)
+
+    kwargs = mock_client.iter_report.call_args.kwargs
+    assert kwargs["metrics"] == ga4_service.TOP_PAGES_METRICS
+    assert kwargs["dimensions"] == ["pagePath"]
+
+
+def test_settled_report_is_cached_with_policy_ttl():
+    mock_client = MagicMock()
+    mock_client.run_report.return_value = [{"date": "20240101", "sessions": "1"}]
+    cache = MagicMock(spec=QueryCache)
+    cache.get_or_fetch.side_effect = lambda key, fetch, **kwargs: fetch()
+
+    ga4_service.get_report(
+        mock_client, dimensions="country", date_range="2024-01-01,2024-01-28", cache=cache
+    )
+
+    assert cache.get_or_fetch.call_args.kwargs["end_date"] == "2024-01-28"
+    assert cache.get_or_fetch.call_args.kwargs["api"] == "ga4"
+
+
+def test_top_pages_smaller_limit_is_served_from_cached_larger_limit():
+    mock_client = MagicMock()
+    mock_client.run_report.return_value = [
+        {"pagePath": f"/p{i}", "screenPageViews": str(100 - i)} for i in range(50)
+    ]
+    cache = QueryCache(ttl=60)
+
+    ga4_service.get_top_pages(
+        mock_client, date_range="2024-01-01,2024-01-28", limit=50, cache=cache
+    )
+    rows = ga4_service.get_top_pages(
+        mock_client, date_range="2024-01-01,2024-01-28", limit=5, cache=cache
+    )
+
+    assert [r["pagePath"] for r in rows] == ["/p0", "/p1", "/p2", "/p3", "/p4"]
+    mock_client.run_report.assert_called_once()
+    assert mock_client.run_report.call_args.kwargs["order_by"] == "screenPageViews"
+
+
+def test_report_metric_subset_is_projected_from_complete_result():
+    mock_client = MagicMock()
+    mock_client.run_report.return_value = [
+        {"country": "US", "sessions": "10", "totalUsers": "7"},
+    ]
+    cache = QueryCache(ttl=60)
+    date_range = "2024-01-01,2024-01-28"
+
+    ga4_service.get_report(mock_client, "sessions,totalUsers", "country", date_range, 10, cache)
+    rows = ga4_service.get_report(mock_client, "totalUsers", "country", date_range, 10, cache)
+
+    assert rows == [{"country": "US", "totalUsers": "7"}]
+    mock_client.run_report.assert_called_once()
+
+
+def test_date_report_fetches_only_missing_days():
+    mock_client = MagicMock()
+    mock_client.run_report.return_value = [
+        {"date": f"202401{d:02d}", "sessions": str(d)} for d in range(1, 6)
+    ]
+    cache = QueryCache(ttl=60)
+
+    first = ga4_service.get_report(
+        mock_client, "sessions", "date", "2024-01-01,2024-01-05", 10, cache
+    )
+    mock_client.run_report.return_value = [{"date": "20240106", "sessions": "6"}]
+    second = ga4_service.get_report(
+        mock_client, "sessions", "date", "2024-01-02,2024-01-06", 10, cache
+    )
+
+    assert [r["sessions"] for r in first] == ["1", "2", "3", "4", "5"]
+    assert [r["sessions"] for r in second] == ["2", "3", "4", "5", "6"]
+    assert mock_client.run_report.call_count == 2
+    span = mock_client.run_report.call_args.kwargs
+    assert (span["start_date"], span["end_date"], span["limit"]) == ("2024-01-06", "2024-01-06", 1)
+
+
+def test_date_report_caches_empty_days_and_applies_limit():
+    mock_client = MagicMock()
+    mock_client.run_report.return_value = [{"date": "20240102", "sessions": "2"}]
+    cache = QueryCache(ttl=60)
+
+    ga4_service.get_report(mock_client, "sessions", "date", "2024-01-01,2024-01-03", 10, cache)
+    rows = ga4_service.get_report(
+        mock_client, "sessions", "date", "2024-01-01,2024-01-03", 1, cache
+    )
+
+    assert rows == [{"date": "20240102", "sessions": "2"}]
+    mock_client.run_report.assert_called_once()
+
+
+def test_concurrent_date_reports_share_one_call():
+    mock_client = MagicMock()
+
+    def run_report(**_):
+        time.sleep(0.05)
+        return [{"date": "20240101", "sessions": "1"}]
+
+    mock_client.run_report.side_effect = run_report
+    cache = QueryCache(ttl=60)
+
+    def call():
+        return ga4_service.get_report(
+            mock_client, "sessions", "date", "2024-01-01,2024-01-01", 10, cache
+        )
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(lambda _: call(), range(5)))
+
+    assert mock_client.run_report.call_count == 1
+    assert all(rows == [{"date": "20240101", "sessions": "1"}] for rows in results)
+
+
+def test_long_date_report_is_cached_whole():
+    mock_client = MagicMock()
+    mock_client.run_report.return_value = [{"date": "20200101", "sessions": "1"}]
+    cache = QueryCache(ttl=60)
+
+    for _ in range(2):
+        ga4_service.get_report(mock_client, "sessions", "date", "2020-01-01,2024-12-31", 10, cache)
+
+    mock_client.run_report.assert_called_once()
+    assert mock_client.run_report.call_args.kwargs["start_date"] == "2020-01-01"
+    assert cache.status()["total_entries"] == 1
+
+
+def test_batch_and_single_date_reports_share_day_entries():
+    mock_client = MagicMock()
+    mock_client.run_report.return_value = [
+        {"date": "20240101", "sessions": "1"},
+        {"date": "20240102", "sessions": "2"},
+    ]
+    cache = QueryCache(ttl=60)
+    spec = {"report": "report", "metrics": "sessions", "date_range": "2024-01-01,2024-01-03"}
+
+    ga4_service.get_report(mock_client, "sessions", "date", "2024-01-01,2024-01-02", 10, cache)
+    mock_client.batch_run_reports.return_value = [[{"date": "20240103", "sessions": "3"}]]
+    batched = ga4_service.batch_reports(mock_client, [spec], cache=cache)
+    single = ga4_service.get_report(
+        mock_client, "sessions", "date", "2024-01-01,2024-01-03", 10, cache
+    )
+
+    span = mock_client.batch_run_reports.call_args[0][0][0]
+    assert (span["start_date"], span["end_date"], span["limit"]) == ("2024-01-03", "2024-01-03", 1)
+    assert [r["sessions"] for r in batched[0]] == ["1", "2", "3"]
+    assert single == batched[0]
+    mock_client.run_report.assert_called_once()
+
+
+def test_date_report_async_uses_partitions():
+    mock_client = MagicMock()
+    mock_client.run_report = AsyncMock(return_value=[{"date": "20240101", "sessions": "1"}])
+    cache = QueryCache(ttl=60)
+
+    async def main():
+        await ga4_service.get_report_async(
+            mock_client, "sessions", "date", "2024-01-01,2024-01-01", 10, cache
+        )
+        return await ga4_service.get_report_async(
+            mock_client, "sessions", "date", "2024-01-01,2024-01-01", 10, cache
+        )
+
+    assert asyncio.run(main()) == [{"date": "20240101", "sessions": "1"}]
+    mock_client.run_report.assert_awaited_once()
+
+
+def test_reordered_metrics_share_one_cache_entry():
+    mock_client = MagicMock()
+    mock_client.run_report.return_value = [
+        {"country": "US", "sessions": "10", "totalUsers": "7"},
+    ]
+    cache = QueryCache(ttl=60)
+
+    first = ga4_service.get_report(
+        mock_client, "sessions,totalUsers", "country", "2024-01-01,2024-01-31", 10, cache
+    )
+    second = ga4_service.get_report(
+        mock_client, "totalUsers,sessions", "country", "2024-01-01,2024-01-31", 10, cache
+    )
+
+    mock_client.run_report.assert_called_once()
+    assert list(first[0]) == ["country", "sessions", "totalUsers"]
+    assert list(second[0]) == ["country", "totalUsers", "sessions"]
+
+
+def test_traffic_summary_keeps_its_column_order():
+    mock_client = MagicMock()
+    mock_client.run_report.return_value = [
+        {
+            "sessionSource": "google",
+            "bounceRate": "0.4",
+            "screenPageViews": "30",
+            "sessions": "10",
+            "totalUsers": "7",
+        }
+    ]
+
+    rows = ga4_service.get_traffic_summary(mock_client, "2024-01-01,2024-01-31", QueryCache(ttl=60))
+
+    assert list(rows[0]) == ["sessionSource", *ga4_service.TRAFFIC_SUMMARY_METRICS]
+    assert mock_client.run_report.call_args.kwargs["metrics"] == sorted(
+        ga4_service.TRAFFIC_SUMMARY_METRICS
+    )
+
+
+def test_batch_fetches_equivalent_reports_once():
+    mock_client = MagicMock()
+    mock_client.batch_run_reports.return_value = [
+        [{"country": "US", "sessions": "10", "totalUsers": "7"}]
+    ]
+    specs = [
+        {
+            "metrics": "sessions,totalUsers",
+            "dimensions": "country",
+            "date_range": "2024-01-01,2024-01-31",
+        },
+        {
+            "metrics": "totalUsers,sessions",
+            "dimensions": "country",
+            "date_range": "2024-01-01,2024-01-31",
+        },
+    ]
+
+    first, second = ga4_service.batch_reports(mock_client, specs, QueryCache(ttl=60))
+
+    assert len(mock_client.batch_run_reports.call_args.args[0]) == 1
+    assert list(first[0]) == ["country", "sessions", "totalUsers"]
+    assert list(second[0]) == ["country", "totalUsers", "sessions"]
+
+
+def test_batch_falls_back_to_last_known_good_reports():
+    cache = QueryCache(ttl=60, fallback_ttl=3600)
+    mock_client = MagicMock()
+    mock_client.batch_run_reports.return_value = [
+        [{"date": "20240101", "sessions": "1"}],
+        [{"pagePath": "/"}],
+    ]
+    specs = [
+        {"metrics": "sessions", "dimensions": "date", "date_range": "2024-01-01,2024-01-01"},
+        {"report": "top_pages", "date_range": "2024-01-01,2024-01-01"},
+    ]
+    first = ga4_service.batch_reports(mock_client, specs, cache)
+    for entry in cache._store.values():  # pylint: disable=protected-access
+        entry.expires = entry.stale_until = 0
+    mock_client.batch_run_reports.side_effect = CircuitOpenError("ga4", 30)
+
+    with track_stale() as stale:
+        assert ga4_service.batch_reports(mock_client, specs, cache) == first
+
+    assert len(stale) == 2
+
+
+def test_batch_shares_a_call_with_a_concurrent_single_report():
+    cache = QueryCache(ttl=60)
+    mock_client = MagicMock()
+
+    def run_report(**_):
+        time.sleep(0.1)
+        return [{"pagePath": "/"}]
+
+    mock_client.run_report.side_effect = run_report
+    mock_client.batch_run_reports.return_value = [[{"sessionSource": "google"}]]
+
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            single = pool.submit(ga4_service.get_top_pages, mock_client, cache=cache)
+            time.sleep(0.02)
+            batched = ga4_service.batch_reports(
+                mock_client, [{"report": "top_pages"}, {"report": "traffic_summary"}], cache
+            )
+
+    assert batched[0] == single.result()
+    assert len(mock_client.batch_run_reports.call_args.args[0]) == 1
+    mock_client.run_report.assert_called_once()
+
+
+def test_realtime_snapshot_is_cached_with_as_of():
+    mock_client = MagicMock()
+    mock_client.run_realtime_report.return_value = [{"country": "US", "activeUsers": "42"}]
+    cache = QueryCache(ttl=10)
+
+    first = ga4_service.get_realtime_snapshot(mock_client, "activeUsers", "country", cache)
+    second = ga4_service.get_realtime_snapshot(mock_client, "activeUsers", "country", cache)
+
+    mock_client.run_realtime_report.assert_called_once_with(
+        metrics=["activeUsers"], dimensions=["country"]
+    )
+    assert first == second
+    assert first["as_of"].endswith("+00:00")
+
+
+def test_realtime_reordered_metrics_share_one_call():
+    mock_client = MagicMock()
+    mock_client.run_realtime_report.return_value = [{"activeUsers": "4", "screenPageViews": "9"}]
+    cache = QueryCache(ttl=10)
+
+    ga4_service.get_realtime_report(mock_client, "activeUsers,screenPageViews", cache=cache)
+    rows = ga4_service.get_realtime_report(mock_client, "screenPageViews,activeUsers", cache=cache)
+
+    mock_client.run_realtime_report.assert_called_once()
+    assert list(rows[0]) == ["screenPageViews", "activeUsers"]
+
+
+def test_realtime_async_pollers_are_coalesced():
+    mock_client = MagicMock()
+
+    async def run_realtime_report(**_kwargs):
+        await asyncio.sleep(0.05)
+        return [{"activeUsers": "42"}]
+
+    mock_client.run_realtime_report = AsyncMock(side_effect=run_realtime_report)
+    cache = QueryCache(ttl=10)
+
+    async def main():
+        return await asyncio.gather(
+            *(ga4_service.get_realtime_snapshot_async(mock_client, cache=cache) for _ in range(10))
+        )
+
+    snapshots = asyncio.run(main())
+
+    assert mock_client.run_realtime_report.await_count == 1
+    assert len({s["as_of"] for s in snapshots}) == 1
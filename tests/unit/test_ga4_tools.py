@@ -1,5 +1,9 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 
+from anny.core.cache import QueryCache
+from anny.core.exceptions import CircuitOpenError
 from anny.core.formatting import format_table
 from anny.core.services import ga4_service
 from anny.mcp_server import mcp
@@ -68,7 +72,7 @@ def test_ga4_report_no_data():
 
 
 @patch("anny.mcp_server.get_query_cache")
-@patch("anny.mcp_server.get_ga4_client")
+@patch("anny.mcp_server.get_async_ga4_client")
 def test_ga4_report_tool_bad_date_range(mock_get_client, mock_get_cache):
     """MCP tool should return a friendly error for an invalid date range."""
     mock_get_client.return_value = MagicMock()
@@ -82,5 +86,63 @@ def test_ga4_report_tool_bad_date_range(mock_get_client, mock_get_cache):
             tool = t
             break
     assert tool is not None, "ga4_report tool not found"
-    result = tool.fn(date_range="not_a_range")
+    result = asyncio.run(tool.fn(date_range="not_a_range"))
     assert "Invalid input" in result
+
+
+@patch("anny.mcp_server.get_query_cache")
+@patch("anny.mcp_server.get_async_ga4_client")
+def test_ga4_batch_tool(mock_get_client, mock_get_cache):
+    mock_client = MagicMock()
+    mock_client.batch_run_reports = AsyncMock(
+        return_value=[[{"pagePath": "/home", "screenPageViews": "500"}], []]
+    )
+    mock_get_client.return_value = mock_client
+    mock_get_cache.return_value = None
+
+    # pylint: disable=protected-access
+    tool = next(t for t in mcp._tool_manager._tools.values() if t.name == "ga4_batch")
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        result = asyncio.run(
+            tool.fn(reports=[{"report": "top_pages", "limit": 500}, {"report": "traffic_summary"}])
+        )
+
+    assert "top_pages (1 rows):" in result
+    assert "/home" in result
+    assert "traffic_summary (0 rows):" in result
+    assert mock_client.batch_run_reports.call_args[0][0][0]["limit"] == 100
+
+
+def _expire_all(cache):
+    # pylint: disable=protected-access
+    for entry in cache._store.values():
+        shift = entry.stale_until - time.time() + 1
+        entry.expires -= shift
+        entry.stale_until -= shift
+        entry.keep_until -= shift
+
+
+@patch("anny.mcp_server.get_query_cache")
+@patch("anny.mcp_server.get_async_ga4_client")
+def test_ga4_top_pages_tool_notes_stale_fallback(mock_get_client, mock_get_cache):
+    mock_client = MagicMock()
+    mock_client.run_report = AsyncMock(return_value=[{"pagePath": "/home", "screenPageViews": "5"}])
+    mock_get_client.return_value = mock_client
+    cache = QueryCache(ttl=60, fallback_ttl=3600)
+    mock_get_cache.return_value = cache
+
+    # pylint: disable=protected-access
+    tool = next(t for t in mcp._tool_manager._tools.values() if t.name == "ga4_top_pages")
+    with patch(
+        "anny.core.services.ga4_service.parse_date_range", return_value=("2024-01-01", "2024-01-28")
+    ):
+        fresh = asyncio.run(tool.fn())
+        _expire_all(cache)
+        mock_client.run_report.side_effect = CircuitOpenError("ga4", 30)
+        stale = asyncio.run(tool.fn())
+
+    assert "stale" not in fresh
+    assert "/home" in stale
+    assert "last cached copy" in stale
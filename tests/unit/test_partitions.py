@@ -0,0 +1,103 @@
+import pytest
+
+from anny.core.cache import QueryCache, track_stale
+from anny.core.cache_policy import FreshnessRule, TTLPolicy
+from anny.core.exceptions import CircuitOpenError
+from anny.core.partitions import DayPartitions, iter_days, partitionable
+
+
+def test_iter_days_is_inclusive():
+    assert iter_days("2024-02-28", "2024-03-01") == ["2024-02-28", "2024-02-29", "2024-03-01"]
+
+
+def test_partitionable_caps_range_length():
+    assert partitionable("2024-01-01", "2024-12-31")
+    assert not partitionable("2020-01-01", "2024-12-31")
+    assert not partitionable("2024-01-02", "2024-01-01")
+
+
+def test_span_covers_first_to_last_missing_day():
+    cache = QueryCache(ttl=60)
+    cache.put(cache.make_key("t", {"day": "2024-01-02"}), [])
+    parts = DayPartitions(cache, "t", {}, "2024-01-01", "2024-01-04")
+    cache.put(cache.make_key("t", {"day": "2024-01-04"}), [])
+
+    assert parts.span == ("2024-01-01", "2024-01-04")
+    assert parts.span_days == 4
+    assert DayPartitions(cache, "t", {}, "2024-01-02", "2024-01-02").span is None
+
+
+def test_store_caches_each_day_with_its_own_ttl():
+    policy = TTLPolicy({"ga4": FreshnessRule(fresh_ttl=1, settled_ttl=999, settle_days=3)})
+    cache = QueryCache(ttl=60, policy=policy)
+    parts = DayPartitions(cache, "t", {}, "2024-01-01", "2024-01-02", api="ga4")
+
+    rows = [{"d": "2024-01-02", "v": 2}, {"d": "1999-01-01"}]
+    parts.store(rows, lambda r: r["d"], "t")
+    parts.fill(rows, lambda r: r["d"])
+
+    assert parts.rows() == [{"d": "2024-01-02", "v": 2}]
+    assert cache.get(cache.make_key("t", {"day": "2024-01-01"})) == []
+    status = cache.status()
+    assert status["total_entries"] == 2
+
+
+def test_fetch_goes_through_get_or_fetch_and_caches_days():
+    cache = QueryCache(ttl=60)
+    calls = []
+
+    def fetch_span(start, end, days):
+        calls.append((start, end, days))
+        return [{"d": "2024-01-01", "v": 1}]
+
+    parts = DayPartitions(cache, "t", {}, "2024-01-01", "2024-01-02")
+    parts.fetch(fetch_span, lambda r: r["d"], "t")
+
+    assert calls == [("2024-01-01", "2024-01-02", 2)]
+    assert parts.rows() == [{"d": "2024-01-01", "v": 1}]
+    assert DayPartitions(cache, "t", {}, "2024-01-01", "2024-01-02").span is None
+    assert cache.status()["by_api"]["other"]["fetches"] == 1
+
+
+def test_fetch_caches_days_only_and_counts_one_miss():
+    cache = QueryCache(ttl=60)
+    parts = DayPartitions(cache, "t", {}, "2024-01-01", "2024-01-03", api="ga4")
+    parts.fetch(lambda *span: [{"d": "2024-01-02", "v": 2}], lambda r: r["d"], "t")
+
+    status = cache.status()
+    assert status["total_entries"] == 3
+    assert status["by_api"]["ga4"]["misses"] == 1
+
+
+def _cache_expired_day(cache, day, rows):
+    key = cache.make_key("t", {"day": day})
+    cache.put(key, rows, api="ga4")
+    cache._store[key].expires = 0  # pylint: disable=protected-access
+
+
+def test_fetch_falls_back_to_last_known_good_days():
+    cache = QueryCache(ttl=60, fallback_ttl=3600)
+    _cache_expired_day(cache, "2024-01-01", [{"d": "2024-01-01"}])
+    _cache_expired_day(cache, "2024-01-02", [{"d": "2024-01-02"}])
+
+    def fetch_span(*_):
+        raise CircuitOpenError("ga4", 30)
+
+    parts = DayPartitions(cache, "t", {}, "2024-01-01", "2024-01-02", api="ga4")
+    with track_stale() as stale:
+        parts.fetch(fetch_span, lambda r: r["d"], "t")
+
+    assert parts.rows() == [{"d": "2024-01-01"}, {"d": "2024-01-02"}]
+    assert len(stale) == 2
+
+
+def test_fetch_raises_when_a_missing_day_has_no_fallback():
+    cache = QueryCache(ttl=60, fallback_ttl=3600)
+    _cache_expired_day(cache, "2024-01-01", [])
+
+    def fetch_span(*_):
+        raise CircuitOpenError("ga4", 30)
+
+    parts = DayPartitions(cache, "t", {}, "2024-01-01", "2024-01-02", api="ga4")
+    with pytest.raises(CircuitOpenError):
+        parts.fetch(fetch_span, lambda r: r["d"], "t")
@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+
+from anny.core.exceptions import APIError, CapacityError
+from anny.core.prefetch import Prefetcher
+from anny.core.quota import Priority, get_priority
+
+
+def _prefetcher(jobs, **kwargs):
+    return Prefetcher(lambda: jobs, spacing=0, jitter=0, **kwargs)
+
+
+def test_run_pass_runs_jobs_at_low_priority():
+    seen = []
+    prefetcher = _prefetcher([("a", lambda: seen.append(get_priority())), ("b", lambda: None)])
+
+    assert prefetcher.run_pass() == 2
+    assert seen == [Priority.LOW]
+    assert get_priority() == Priority.NORMAL
+    status = prefetcher.status()
+    assert status["passes"] == 1
+    assert status["jobs_run"] == 2
+    assert status["last_pass"] is not None
+
+
+def test_run_pass_counts_failures_and_continues():
+    def fail():
+        raise APIError("boom", service="ga4")
+
+    prefetcher = _prefetcher([("bad", fail), ("good", lambda: None)])
+
+    assert prefetcher.run_pass() == 1
+    assert prefetcher.status()["failures"] == 1
+
+
+def test_run_pass_stops_when_shed():
+    calls = []
+
+    def shed():
+        raise CapacityError("quota")
+
+    prefetcher = _prefetcher([("first", shed), ("second", lambda: calls.append(1))])
+
+    assert prefetcher.run_pass() == 0
+    assert not calls
+    assert prefetcher.status()["shed"] == 1
+
+
+def test_jobs_are_resolved_every_pass():
+    batches = iter([[("a", lambda: None)], [("a", lambda: None), ("b", lambda: None)]])
+    prefetcher = Prefetcher(lambda: next(batches), spacing=0)
+
+    assert prefetcher.run_pass() == 1
+    assert prefetcher.run_pass() == 2
+
+
+def test_run_pass_survives_job_list_errors():
+    def jobs():
+        raise FileNotFoundError("service account key")
+
+    prefetcher = Prefetcher(jobs)
+
+    assert prefetcher.run_pass() == 0
+    assert prefetcher.status()["failures"] == 1
+    assert prefetcher.status()["passes"] == 1
+
+
+def test_next_delay_uses_interval_or_rollover():
+    prefetcher = _prefetcher([], interval=300, rollover_delay=120)
+
+    midday = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    late = datetime(2024, 1, 1, 23, 59, tzinfo=timezone.utc)
+    assert prefetcher.next_delay(midday) == 300
+    assert prefetcher.next_delay(late) == 180
+
+
+def test_next_delay_adds_jitter():
+    prefetcher = Prefetcher(lambda: [], interval=300, jitter=30)
+
+    delays = [
+        prefetcher.next_delay(datetime(2024, 1, 1, 12, tzinfo=timezone.utc)) for _ in range(20)
+    ]
+    assert all(300 <= d <= 330 for d in delays)
+
+
+def test_start_and_stop():
+    prefetcher = _prefetcher([], initial_delay=3600)
+
+    prefetcher.start()
+    assert prefetcher.status()["running"] is True
+    assert prefetcher.status()["next_pass"] is not None
+    prefetcher.stop()
+    assert prefetcher.status()["running"] is False
@@ -0,0 +1,48 @@
+from unittest.mock import MagicMock
+
+from anny.core.cache import QueryCache
+from anny.core.services import prefetch_service
+
+
+def _names(jobs):
+    return [name for name, _ in jobs]
+
+
+def test_canonical_jobs_cover_default_tools():
+    store = MagicMock()
+    store.list_watchlist.return_value = []
+
+    jobs = prefetch_service.canonical_jobs(QueryCache(ttl=60), MagicMock(), MagicMock(), store)
+
+    assert _names(jobs) == [
+        "ga4_top_pages",
+        "ga4_traffic_summary",
+        "search_console_summary",
+        "search_console_top_queries",
+    ]
+
+
+def test_canonical_jobs_add_watchlist_pages():
+    store = MagicMock()
+    store.list_watchlist.return_value = [{"page_path": "/pricing"}]
+
+    jobs = prefetch_service.canonical_jobs(QueryCache(ttl=60), MagicMock(), None, store)
+
+    assert _names(jobs) == ["ga4_top_pages", "ga4_traffic_summary", "ga4_watchlist_pages"]
+
+
+def test_watchlist_job_answers_smaller_top_pages():
+    ga4_client = MagicMock()
+    ga4_client.run_report.return_value = [
+        {"pagePath": f"/p{n}", "screenPageViews": str(100 - n)} for n in range(50)
+    ]
+    store = MagicMock()
+    store.list_watchlist.return_value = [{"page_path": "/p3"}]
+    cache = QueryCache(ttl=60)
+
+    jobs = dict(prefetch_service.canonical_jobs(cache, ga4_client, None, store, limit=5))
+    jobs["ga4_watchlist_pages"]()
+    ga4_client.run_report.reset_mock()
+    jobs["ga4_top_pages"]()
+
+    ga4_client.run_report.assert_not_called()
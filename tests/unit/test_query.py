@@ -0,0 +1,72 @@
+from anny.core.query import ReportQuery, reproject
+
+
+def _query(metrics=("sessions", "totalUsers"), dimensions=("date",), limit=10, **kwargs):
+    return ReportQuery.build(
+        "ga4", metrics, dimensions, "2024-01-01", "2024-01-31", limit, **kwargs
+    )
+
+
+def test_build_sorts_and_dedupes_columns():
+    query = _query(metrics=["totalUsers", "sessions", "sessions"], dimensions=["date", "country"])
+
+    assert query.metrics == ("sessions", "totalUsers")
+    assert query.dimensions == ("country", "date")
+
+
+def test_equivalent_queries_are_equal_and_share_a_key():
+    a = _query(metrics=["sessions", "totalUsers"])
+    b = _query(metrics=["totalUsers", "sessions"])
+
+    assert a == b
+    assert hash(a) == hash(b)
+    assert a.key == b.key
+    assert len({a: 1, b: 2}) == 1
+
+
+def test_key_depends_on_every_field():
+    base = _query()
+
+    assert base.key != _query(limit=20).key
+    assert base.key != _query(metrics=["sessions"]).key
+    assert base.key != _query(order_by="sessions").key
+    assert (
+        base.key
+        != ReportQuery.build(
+            "search_console", base.metrics, base.dimensions, "2024-01-01", "2024-01-31", 10
+        ).key
+    )
+
+
+def test_family_ignores_limit_and_metrics():
+    assert _query(limit=10).family == _query(limit=50, metrics=["sessions"]).family
+    assert _query().family != _query(dimensions=["country"]).family
+    assert _query().family != _query(order_by="sessions").family
+
+
+def test_shape_and_run_args():
+    ordered = _query(order_by="sessions")
+
+    assert ordered.shape().ordered is True
+    assert ordered.shape().columns == ("sessions", "totalUsers")
+    assert _query().shape().ordered is False
+    assert ordered.run_args()["order_by"] == "sessions"
+    assert "order_by" not in _query().run_args()
+    assert _query().run_args()["metrics"] == ["sessions", "totalUsers"]
+
+
+def test_reproject_moves_requested_columns_first():
+    rows = [{"date": "20240101", "sessions": "1", "totalUsers": "2"}]
+
+    result = reproject(rows, ["date", "totalUsers", "sessions"])
+
+    assert list(result[0]) == ["date", "totalUsers", "sessions"]
+    assert result[0] == rows[0]
+    assert list(rows[0]) == ["date", "sessions", "totalUsers"]
+
+
+def test_reproject_returns_rows_already_in_order():
+    rows = [{"date": "20240101", "sessions": "1"}]
+
+    assert reproject(rows, ["date", "sessions"]) is rows
+    assert reproject([], ["date"]) == []
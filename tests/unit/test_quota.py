@@ -0,0 +1,247 @@
+import asyncio
+import contextvars
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.api_core.exceptions import ServiceUnavailable
+
+from anny.core.exceptions import CapacityError, CircuitOpenError
+from anny.core.quota import Priority, QuotaScheduler, get_priority, set_priority
+
+
+def _quota(consumed, remaining):
+    status = SimpleNamespace(consumed=consumed, remaining=remaining)
+    return SimpleNamespace(
+        tokens_per_day=status,
+        tokens_per_hour=status,
+        concurrent_requests=SimpleNamespace(consumed=0, remaining=10),
+    )
+
+
+def _with_priority(priority, fn):
+    def call():
+        set_priority(priority)
+        return fn()
+
+    return contextvars.copy_context().run(call)
+
+
+def test_default_priority_is_normal():
+    assert get_priority() == Priority.NORMAL
+
+
+def test_slot_admits_and_releases():
+    scheduler = QuotaScheduler()
+    with scheduler.slot("ga4", "properties/1"):
+        assert scheduler.status()["ga4"]["properties/1"]["in_flight"] == 1
+    lane = scheduler.status()["ga4"]["properties/1"]
+    assert lane["in_flight"] == 0
+    assert lane["admitted"] == 1
+
+
+def test_slot_limits_concurrency():
+    scheduler = QuotaScheduler(limits={"ga4": 2})
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def call():
+        with scheduler.slot("ga4", "properties/1"):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak[0] == 2
+    assert scheduler.status()["ga4"]["properties/1"]["admitted"] == 6
+
+
+def test_slot_times_out_when_full():
+    scheduler = QuotaScheduler(limits={"ga4": 1}, max_wait=0.1)
+    with scheduler.slot("ga4", "properties/1"):
+        with pytest.raises(CapacityError, match="concurrent"):
+            with scheduler.slot("ga4", "properties/1"):
+                pass
+    assert scheduler.status()["ga4"]["properties/1"]["shed"] == 1
+
+
+def test_low_priority_shed_before_normal():
+    scheduler = QuotaScheduler(low_priority_reserve=0.25, normal_priority_reserve=0.05)
+    scheduler.record_ga4_quota("properties/1", _quota(consumed=900, remaining=100))
+
+    def low_call():
+        with scheduler.slot("ga4", "properties/1"):
+            pass
+
+    with pytest.raises(CapacityError, match="nearly exhausted"):
+        _with_priority(Priority.LOW, low_call)
+
+    with scheduler.slot("ga4", "properties/1"):
+        pass
+
+    lane = scheduler.status()["ga4"]["properties/1"]
+    assert lane["headroom"] == 0.1
+    assert lane["quota"]["tokens_per_hour"] == {"consumed": 900, "remaining": 100}
+
+
+def test_exhausted_sheds_only_low_priority():
+    scheduler = QuotaScheduler()
+    scheduler.record_exhausted("ga4", "properties/1")
+
+    def low_call():
+        with scheduler.slot("ga4", "properties/1"):
+            pass
+
+    with pytest.raises(CapacityError, match="exhausted"):
+        _with_priority(Priority.LOW, low_call)
+
+    with scheduler.slot("ga4", "properties/1"):
+        pass
+    assert scheduler.status()["ga4"]["properties/1"]["exhausted"]
+
+
+def test_search_console_qpm_budget():
+    scheduler = QuotaScheduler(search_console_qpm=2, max_wait=0.1, normal_priority_reserve=0)
+    for _ in range(2):
+        with scheduler.slot("search_console", "https://example.com"):
+            pass
+    with pytest.raises(CapacityError):
+        with scheduler.slot("search_console", "https://example.com"):
+            pass
+
+
+def test_high_priority_waiter_goes_first():
+    scheduler = QuotaScheduler(limits={"ga4": 1})
+    order = []
+    release = threading.Event()
+
+    def holder():
+        with scheduler.slot("ga4", "p"):
+            release.wait()
+
+    def waiter(priority, name):
+        def call():
+            with scheduler.slot("ga4", "p"):
+                order.append(name)
+
+        _with_priority(priority, call)
+
+    first = threading.Thread(target=holder)
+    first.start()
+    time.sleep(0.05)
+    low = threading.Thread(target=waiter, args=(Priority.LOW, "low"))
+    low.start()
+    time.sleep(0.05)
+    high = threading.Thread(target=waiter, args=(Priority.HIGH, "high"))
+    high.start()
+    time.sleep(0.05)
+    release.set()
+    for t in (first, low, high):
+        t.join()
+
+    assert order == ["high", "low"]
+
+
+def test_slot_async_waits_for_free_slot():
+    scheduler = QuotaScheduler(limits={"ga4": 1})
+
+    async def call(results):
+        async with scheduler.slot_async("ga4", "p"):
+            results.append(scheduler.status()["ga4"]["p"]["in_flight"])
+            await asyncio.sleep(0.03)
+
+    async def main():
+        results = []
+        await asyncio.gather(call(results), call(results), call(results))
+        return results
+
+    assert asyncio.run(main()) == [1, 1, 1]
+
+
+def test_slot_async_is_woken_by_release_from_another_thread():
+    scheduler = QuotaScheduler(limits={"ga4": 1})
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with scheduler.slot("ga4", "p"):
+            held.set()
+            release.wait()
+
+    async def main():
+        async with scheduler.slot_async("ga4", "p"):
+            return time.monotonic()
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait()
+    threading.Timer(0.05, release.set).start()
+    started = time.monotonic()
+    admitted = asyncio.run(main())
+    thread.join()
+
+    assert 0.04 < admitted - started < 1
+    assert scheduler.status()["ga4"]["p"]["queued"] == 0
+
+
+def test_cancelled_async_waiter_leaves_queue():
+    scheduler = QuotaScheduler(limits={"ga4": 1})
+
+    async def wait_for_slot():
+        async with scheduler.slot_async("ga4", "p"):
+            pass
+
+    async def main():
+        async with scheduler.slot_async("ga4", "p"):
+            waiter = asyncio.ensure_future(wait_for_slot())
+            await asyncio.sleep(0.05)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        async with scheduler.slot_async("ga4", "p"):
+            return scheduler.status()["ga4"]["p"]["queued"]
+
+    assert asyncio.run(main()) == 0
+
+
+def test_slot_failures_open_the_service_breaker():
+    scheduler = QuotaScheduler(breaker_threshold=2, breaker_reset=30)
+    for _ in range(2):
+        with pytest.raises(ServiceUnavailable):
+            with scheduler.slot("ga4", "properties/1"):
+                raise ServiceUnavailable("down")
+
+    with pytest.raises(CircuitOpenError):
+        with scheduler.slot("ga4", "properties/2"):
+            pass
+    with scheduler.slot("search_console", "https://example.com"):
+        pass
+
+    breakers = scheduler.breaker_status()
+    assert breakers["ga4"]["state"] == "open"
+    assert breakers["search_console"]["state"] == "closed"
+    assert scheduler.status()["ga4"]["properties/1"]["in_flight"] == 0
+
+
+def test_async_slot_fails_fast_while_breaker_open():
+    scheduler = QuotaScheduler(breaker_threshold=1)
+
+    async def main():
+        with pytest.raises(ServiceUnavailable):
+            async with scheduler.slot_async("ga4", "properties/1"):
+                raise ServiceUnavailable("down")
+        with pytest.raises(CircuitOpenError):
+            async with scheduler.slot_async("ga4", "properties/1"):
+                pass
+
+    asyncio.run(main())
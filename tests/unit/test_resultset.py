@@ -0,0 +1,103 @@
+import json
+import sys
+from array import array
+
+import pytest
+
+from anny.api.models import GA4ReportResponse
+from anny.core.formatting import format_table
+from anny.core.resultset import Column, ResultSet, json_default, json_object_hook
+
+ROWS = [
+    {"country": "US", "clicks": 10, "ctr": 1.5},
+    {"country": "DE", "clicks": 4, "ctr": 0.5},
+    {"country": "US", "clicks": 2, "ctr": 2.0},
+]
+
+
+def _result():
+    return ResultSet.from_rows(ROWS, dimensions=["country"])
+
+
+def test_reads_back_as_row_dicts():
+    result = _result()
+
+    assert len(result) == 3
+    assert result[0] == {"country": "US", "clicks": 10, "ctr": 1.5}
+    assert result[-1]["clicks"] == 2
+    assert list(result) == ROWS
+    assert result == ROWS
+    assert result.to_list() == ROWS
+    with pytest.raises(IndexError):
+        result[3]  # pylint: disable=pointless-statement
+
+
+def test_schema_types_and_dictionary_encoding():
+    result = _result()
+
+    assert result.schema == (
+        Column("country", "str", True),
+        Column("clicks", "int", False),
+        Column("ctr", "float", False),
+    )
+    # pylint: disable=protected-access
+    country = result._stores["country"]
+    assert country.values == ["US", "DE"]
+    assert list(country.codes) == [0, 1, 0]
+    assert isinstance(result._stores["clicks"], array)
+
+
+def test_mixed_columns_are_kept_as_given():
+    result = ResultSet.from_rows([{"v": 1}, {"v": 2.5}, {"v": None}])
+
+    assert result.schema == (Column("v", "any", False),)
+    assert result.column("v") == [1, 2.5, None]
+
+
+def test_slice_project_and_take():
+    result = _result()
+
+    assert result[:2] == ROWS[:2]
+    assert isinstance(result[:2], ResultSet)
+    assert result.project(["ctr", "country"])[0] == {"ctr": 1.5, "country": "US"}
+    assert list(result.project(["ctr", "country"])[0]) == ["ctr", "country"]
+    assert result.take([2, 0]) == [ROWS[2], ROWS[0]]
+
+
+def test_concat_fills_missing_columns():
+    combined = ResultSet.concat([_result()[:1], [{"country": "FR", "clicks": 1}], []])
+
+    assert len(combined) == 2
+    assert combined[1] == {"country": "FR", "clicks": 1, "ctr": None}
+    assert combined.dimensions == ("country",)
+
+
+def test_json_round_trip_keeps_columns():
+    text = json.dumps({"rows": _result()}, default=json_default)
+    restored = json.loads(text, object_hook=json_object_hook)["rows"]
+
+    assert isinstance(restored, ResultSet)
+    assert restored == ROWS
+    assert restored.schema == _result().schema
+
+
+def test_smaller_than_row_dicts():
+    rows = [{"pagePath": f"/p{i % 50}", "views": i} for i in range(2000)]
+    result = ResultSet.from_rows(rows, dimensions=["pagePath"])
+
+    dict_size = sys.getsizeof(rows) + sum(sys.getsizeof(row) for row in rows)
+    assert sys.getsizeof(result) < dict_size / 4
+
+
+def test_format_table_matches_row_dicts():
+    assert format_table(_result()) == format_table(ROWS)
+    assert format_table(_result(), ["clicks", "country"]) == format_table(
+        ROWS, ["clicks", "country"]
+    )
+    assert format_table(ResultSet.from_rows([])) == "No data available."
+
+
+def test_response_model_accepts_result_set():
+    response = GA4ReportResponse(rows=_result(), row_count=3)
+
+    assert response.model_dump()["rows"] == ROWS
@@ -0,0 +1,84 @@
+from fastapi.testclient import TestClient
+
+from anny.core.dependencies import (
+    get_blocking_executor,
+    get_prefetcher,
+    get_quota_scheduler,
+    verify_api_key,
+)
+from anny.core.executor import BlockingExecutor
+from anny.core.prefetch import Prefetcher
+from anny.core.quota import QuotaScheduler
+from anny.main import app
+
+
+def test_executor_status_endpoint():
+    executor = BlockingExecutor(max_workers=3, max_queue=7)
+    app.dependency_overrides[get_blocking_executor] = lambda: executor
+    app.dependency_overrides[verify_api_key] = lambda: None
+
+    tc = TestClient(app)
+    response = tc.get("/api/runtime/executor")
+
+    app.dependency_overrides.pop(get_blocking_executor, None)
+    app.dependency_overrides.pop(verify_api_key, None)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["max_workers"] == 3
+    assert data["max_queue"] == 7
+    assert data["queue_depth"] == 0
+
+
+def test_quota_status_endpoint():
+    scheduler = QuotaScheduler()
+    with scheduler.slot("search_console", "https://example.com"):
+        pass
+    app.dependency_overrides[get_quota_scheduler] = lambda: scheduler
+    app.dependency_overrides[verify_api_key] = lambda: None
+
+    tc = TestClient(app)
+    response = tc.get("/api/runtime/quota")
+
+    app.dependency_overrides.pop(get_quota_scheduler, None)
+    app.dependency_overrides.pop(verify_api_key, None)
+
+    assert response.status_code == 200
+    lane = response.json()["search_console"]["https://example.com"]
+    assert lane["admitted"] == 1
+    assert lane["in_flight"] == 0
+
+
+def test_prefetch_status_endpoint():
+    prefetcher = Prefetcher(lambda: [], interval=120)
+    app.dependency_overrides[get_prefetcher] = lambda: prefetcher
+    app.dependency_overrides[verify_api_key] = lambda: None
+
+    tc = TestClient(app)
+    response = tc.get("/api/runtime/prefetch")
+
+    app.dependency_overrides.pop(get_prefetcher, None)
+    app.dependency_overrides.pop(verify_api_key, None)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["running"] is False
+    assert data["interval_seconds"] == 120
+    assert data["passes"] == 0
+
+
+def test_breaker_status_endpoint():
+    scheduler = QuotaScheduler()
+    with scheduler.slot("ga4", "properties/1"):
+        pass
+    app.dependency_overrides[get_quota_scheduler] = lambda: scheduler
+    app.dependency_overrides[verify_api_key] = lambda: None
+
+    tc = TestClient(app)
+    response = tc.get("/api/runtime/breakers")
+
+    app.dependency_overrides.pop(get_quota_scheduler, None)
+    app.dependency_overrides.pop(verify_api_key, None)
+
+    assert response.status_code == 200
+    assert response.json()["ga4"]["state"] == "closed"
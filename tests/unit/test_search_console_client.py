@@ -1,3 +1,4 @@
+import time
 from unittest.mock import MagicMock
 
 import pytest
@@ -6,6 +7,7 @@ from httplib2 import Response
 
 from anny.clients.search_console import SearchConsoleClient
 from anny.core.exceptions import APIError
+from tests.mocks.discovery import use_fake_batches
 
 
 def _make_mock_service(response):
@@ -43,6 +45,7 @@ def test_query_flattens_response():
     assert rows[0]["clicks"] == 150
     assert rows[0]["ctr"] == 5.0  # 0.05 * 100
     assert rows[0]["position"] == 4.2
+    assert [c.type for c in rows.schema] == ["str", "int", "int", "float", "float"]
 
 
 def test_query_empty_response():
@@ -159,3 +162,117 @@ def test_site_url_property():
     service = MagicMock()
     client = SearchConsoleClient(service, "https://example.com")
     assert client.site_url == "https://example.com"
+
+
+def _page(start, count):
+    return {"rows": [{"keys": [f"q{start + i}"], "clicks": 1} for i in range(count)]}
+
+
+def _paged_service(page_sizes, fail_at=None):
+    """Service whose query() returns pages of the given sizes keyed by startRow.
+
+    Queries past the end of page_sizes return empty pages.
+    """
+    service = MagicMock()
+    use_fake_batches(service)
+    starts = []
+
+    def query(siteUrl, body):  # pylint: disable=invalid-name,unused-argument
+        index = len(starts)
+        starts.append(body["startRow"])
+        request = MagicMock()
+        if index == fail_at:
+            request.execute.side_effect = HttpError(Response({"status": "500"}), b"error")
+        else:
+            size = page_sizes[index] if index < len(page_sizes) else 0
+            request.execute.return_value = _page(body["startRow"], size)
+        return request
+
+    service.searchanalytics().query.side_effect = query
+    return service, starts
+
+
+def test_iter_query_pages_follows_start_row():
+    service, starts = _paged_service([2, 2, 1])
+    client = SearchConsoleClient(service, "https://example.com")
+
+    pages = list(
+        client.iter_query_pages(
+            "2024-01-01", "2024-01-28", ["query"], page_size=2, pages_per_batch=2
+        )
+    )
+
+    assert starts == [0, 2, 4]
+    assert [[r["query"] for r in page] for page in pages] == [["q0", "q1"], ["q2", "q3"], ["q4"]]
+
+
+def test_iter_query_pages_stops_on_empty_page():
+    service, starts = _paged_service([2, 0])
+    client = SearchConsoleClient(service, "https://example.com")
+
+    pages = list(
+        client.iter_query_pages(
+            "2024-01-01", "2024-01-28", ["query"], page_size=2, pages_per_batch=2
+        )
+    )
+
+    assert starts == [0, 2, 4]
+    assert len(pages) == 1
+
+
+def test_iter_query_pages_batches_pages_after_the_first():
+    service, starts = _paged_service([2, 2, 2, 1])
+    batches = use_fake_batches(service)
+    client = SearchConsoleClient(service, "https://example.com")
+
+    pages = list(
+        client.iter_query_pages(
+            "2024-01-01", "2024-01-28", ["query"], page_size=2, pages_per_batch=3
+        )
+    )
+
+    assert starts == [0, 2, 4, 6]
+    assert len(batches) == 1
+    assert [request_id for request_id, _ in batches[0].requests] == ["2", "4", "6"]
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+
+
+def test_iter_query_pages_prefetches_next_page():
+    service, starts = _paged_service([2, 2, 1])
+    client = SearchConsoleClient(service, "https://example.com")
+
+    pages = client.iter_query_pages(
+        "2024-01-01", "2024-01-28", ["query"], page_size=2, pages_per_batch=2
+    )
+    next(pages)
+    deadline = time.monotonic() + 1
+    while len(starts) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert starts == [0, 2, 4]
+    pages.close()
+
+
+def test_iter_query_pages_without_prefetch_waits_for_consumer():
+    service, starts = _paged_service([2, 2, 1])
+    client = SearchConsoleClient(service, "https://example.com")
+
+    pages = client.iter_query_pages(
+        "2024-01-01", "2024-01-28", ["query"], page_size=2, prefetch=False
+    )
+    next(pages)
+    time.sleep(0.05)
+
+    assert starts == [0]
+    pages.close()
+
+
+def test_iter_query_page_failure_raises_api_error():
+    service, _ = _paged_service([2, 2], fail_at=1)
+    client = SearchConsoleClient(service, "https://example.com")
+
+    pages = client.iter_query_pages("2024-01-01", "2024-01-28", ["query"], page_size=2)
+
+    assert [r["query"] for r in next(pages)] == ["q0", "q1"]
+    with pytest.raises(APIError, match="Search Console query failed"):
+        next(pages)
@@ -1,7 +1,10 @@
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from anny.core.cache import QueryCache
 from anny.core.exceptions import ValidationError
 from anny.core.services import search_console_service
 
@@ -112,3 +115,110 @@ def test_get_search_analytics_rejects_empty_dimensions():
     mock_client = MagicMock()
     with pytest.raises(ValidationError, match="dimension"):
         search_console_service.get_search_analytics(mock_client, dimensions="")
+
+
+def test_concurrent_identical_queries_call_google_once():
+    cache = QueryCache()
+    mock_client = MagicMock()
+
+    def slow_query(**_kwargs):
+        time.sleep(0.1)
+        return [{"query": "test", "clicks": 100}]
+
+    mock_client.query.side_effect = slow_query
+
+    with patch(
+        "anny.core.services.search_console_service.parse_date_range",
+        return_value=("2024-01-01", "2024-01-28"),
+    ):
+        threads = [
+            threading.Thread(
+                target=search_console_service.get_top_queries,
+                args=(mock_client,),
+                kwargs={"cache": cache},
+            )
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert mock_client.query.call_count == 1
+
+
+def test_iter_search_analytics_returns_client_pages():
+    mock_client = MagicMock()
+    mock_client.iter_query_pages.return_value = iter([[{"query": "a"}], [{"query": "b"}]])
+
+    with patch(
+        "anny.core.services.search_console_service.parse_date_range",
+        return_value=("2024-01-01", "2024-01-28"),
+    ):
+        pages = search_console_service.iter_search_analytics(mock_client, "query, page")
+
+    mock_client.iter_query_pages.assert_called_once_with(
+        "2024-01-01", "2024-01-28", ["query", "page"]
+    )
+    assert list(pages) == [[{"query": "a"}], [{"query": "b"}]]
+
+
+def test_iter_search_analytics_validates_before_fetching():
+    mock_client = MagicMock()
+    with pytest.raises(ValidationError, match="dimension"):
+        search_console_service.iter_search_analytics(mock_client, dimensions="")
+    mock_client.iter_query_pages.assert_not_called()
+
+
+def test_top_queries_served_from_larger_search_analytics_result():
+    mock_client = MagicMock()
+    mock_client.query.return_value = [{"query": f"q{i}", "clicks": 100 - i} for i in range(20)]
+    cache = QueryCache(ttl=60)
+
+    search_console_service.get_search_analytics(
+        mock_client, "query", "2024-01-01,2024-01-28", row_limit=20, cache=cache
+    )
+    rows = search_console_service.get_top_queries(
+        mock_client, "2024-01-01,2024-01-28", limit=3, cache=cache
+    )
+
+    assert [r["query"] for r in rows] == ["q0", "q1", "q2"]
+    mock_client.query.assert_called_once()
+
+
+def test_date_query_uses_day_partitions():
+    mock_client = MagicMock()
+    mock_client.query.return_value = [
+        {"date": "2024-01-01", "clicks": 1},
+        {"date": "2024-01-02", "clicks": 2},
+    ]
+    cache = QueryCache(ttl=60)
+
+    search_console_service.get_search_analytics(
+        mock_client, "date", "2024-01-01,2024-01-02", row_limit=10, cache=cache
+    )
+    mock_client.query.return_value = [{"date": "2024-01-03", "clicks": 3}]
+    rows = search_console_service.get_search_analytics(
+        mock_client, "date", "2024-01-01,2024-01-03", row_limit=10, cache=cache
+    )
+
+    assert [r["clicks"] for r in rows] == [1, 2, 3]
+    mock_client.query.assert_called_with(
+        start_date="2024-01-03", end_date="2024-01-03", dimensions=["date"], row_limit=1
+    )
+
+
+def test_reordered_dimensions_share_one_cache_entry():
+    mock_client = MagicMock()
+    mock_client.query.return_value = [{"page": "/a", "query": "anny", "clicks": 3}]
+    cache = QueryCache(ttl=60)
+
+    search_console_service.get_search_analytics(
+        mock_client, "page,query", "2024-01-01,2024-01-31", row_limit=10, cache=cache
+    )
+    rows = search_console_service.get_search_analytics(
+        mock_client, "query,page", "2024-01-01,2024-01-31", row_limit=10, cache=cache
+    )
+
+    mock_client.query.assert_called_once()
+    assert list(rows[0]) == ["query", "page", "clicks"]
@@ -6,6 +6,7 @@ from httplib2 import Response
 
 from anny.clients.tag_manager import TagManagerClient
 from anny.core.exceptions import APIError
+from tests.mocks.discovery import use_fake_batches
 
 
 def test_list_accounts():
@@ -140,3 +141,41 @@ def test_validate_container_path_accepts_valid():
     # pylint: disable=protected-access
     TagManagerClient._validate_container_path("accounts/123/containers/456")
     TagManagerClient._validate_container_path("accounts/123/containers/456/workspaces/default")
+
+
+def test_list_container_setup_uses_one_batch():
+    service = MagicMock()
+    batches = use_fake_batches(service)
+    workspaces = service.accounts().containers().workspaces()
+    workspaces.tags().list().execute.return_value = {"tag": [{"tagId": "1", "name": "GA4"}]}
+    workspaces.triggers().list().execute.return_value = {"trigger": []}
+    workspaces.variables().list().execute.return_value = {
+        "variable": [{"variableId": "7", "name": "URL", "type": "u"}]
+    }
+    client = TagManagerClient(service)
+
+    setup = client.list_container_setup("accounts/123/containers/456")
+
+    assert len(batches) == 1
+    assert setup["tags"] == [{"tagId": "1", "name": "GA4", "type": ""}]
+    assert setup["triggers"] == []
+    assert setup["variables"][0]["variableId"] == "7"
+
+
+def test_list_container_setup_item_failure():
+    service = MagicMock()
+    use_fake_batches(service)
+    workspaces = service.accounts().containers().workspaces()
+    workspaces.tags().list().execute.side_effect = HttpError(Response({"status": "403"}), b"no")
+    workspaces.triggers().list().execute.return_value = {}
+    workspaces.variables().list().execute.return_value = {}
+    client = TagManagerClient(service)
+
+    with pytest.raises(APIError, match="GTM container setup failed"):
+        client.list_container_setup("accounts/123/containers/456")
+
+
+def test_list_container_setup_validates_path():
+    client = TagManagerClient(MagicMock())
+    with pytest.raises(APIError, match="Invalid container path"):
+        client.list_container_setup("../etc")
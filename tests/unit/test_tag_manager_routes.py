@@ -95,9 +95,11 @@ def test_variables_endpoint():
 def test_container_setup_endpoint():
     mock_client = _mock_gtm_client()
     _setup_overrides(mock_client)
-    mock_client.list_tags.return_value = [{"tagId": "1", "name": "GA4"}]
-    mock_client.list_triggers.return_value = []
-    mock_client.list_variables.return_value = []
+    mock_client.list_container_setup.return_value = {
+        "tags": [{"tagId": "1", "name": "GA4"}],
+        "triggers": [],
+        "variables": [],
+    }
 
     tc = TestClient(app)
     response = tc.get("/api/tag-manager/container-setup?container_path=accounts/123/containers/456")
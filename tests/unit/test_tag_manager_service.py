@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock
 
+from anny.core.cache import QueryCache
 from anny.core.services import tag_manager_service
 
 
@@ -25,18 +26,34 @@ def test_get_containers():
 
 def test_get_container_setup():
     mock_client = MagicMock()
-    mock_client.list_tags.return_value = [{"tagId": "1", "name": "GA4"}]
-    mock_client.list_triggers.return_value = [{"triggerId": "1", "name": "All Pages"}]
-    mock_client.list_variables.return_value = [
-        {"variableId": "1", "name": "URL"},
-        {"variableId": "2", "name": "Click"},
-    ]
+    mock_client.list_container_setup.return_value = {
+        "tags": [{"tagId": "1", "name": "GA4"}],
+        "triggers": [{"triggerId": "1", "name": "All Pages"}],
+        "variables": [
+            {"variableId": "1", "name": "URL"},
+            {"variableId": "2", "name": "Click"},
+        ],
+    }
 
     result = tag_manager_service.get_container_setup(mock_client, "accounts/123/containers/456")
 
+    mock_client.list_container_setup.assert_called_once_with("accounts/123/containers/456")
     assert result["tag_count"] == 1
     assert result["trigger_count"] == 1
     assert result["variable_count"] == 2
     assert len(result["tags"]) == 1
     assert len(result["triggers"]) == 1
     assert len(result["variables"]) == 2
+
+
+def test_get_container_setup_is_cached():
+    mock_client = MagicMock()
+    mock_client.list_container_setup.return_value = {"tags": [], "triggers": [], "variables": []}
+    cache = QueryCache(ttl=60)
+
+    tag_manager_service.get_container_setup(mock_client, "accounts/1/containers/2", cache)
+    result = tag_manager_service.get_container_setup(mock_client, "accounts/1/containers/2", cache)
+
+    assert result["tag_count"] == 0
+    mock_client.list_container_setup.assert_called_once()
+    assert cache.status()["total_entries"] == 1
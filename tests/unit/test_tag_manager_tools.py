@@ -35,11 +35,11 @@ def test_gtm_list_containers_tool_flow():
 
 def test_gtm_container_setup_tool_flow():
     mock_client = MagicMock()
-    mock_client.list_tags.return_value = [{"tagId": "1", "name": "GA4", "type": "gaawc"}]
-    mock_client.list_triggers.return_value = [
-        {"triggerId": "1", "name": "All Pages", "type": "pageview"}
-    ]
-    mock_client.list_variables.return_value = []
+    mock_client.list_container_setup.return_value = {
+        "tags": [{"tagId": "1", "name": "GA4", "type": "gaawc"}],
+        "triggers": [{"triggerId": "1", "name": "All Pages", "type": "pageview"}],
+        "variables": [],
+    }
 
     setup = tag_manager_service.get_container_setup(mock_client, "accounts/123/containers/456")
 